@@ -289,7 +289,7 @@ class TablePopup(wx.Menu):
                 self.MyAppend(item)
                 self.Bind(wx.EVT_MENU, self.OnRenameTab, item)
 
-        if len(self.ISel)==1:
+        if len(self.ISel)>0:
             item = wx.MenuItem(self, -1, "Export")
             self.MyAppend(item)
             self.Bind(wx.EVT_MENU, self.OnExportTab, item)
@@ -321,7 +321,7 @@ class TablePopup(wx.Menu):
             self.mainframe.renameTable(self.ISel[0],newName)
 
     def OnExportTab(self, event):
-        self.mainframe.exportTab(self.ISel[0]);
+        self.mainframe.exportTabs(self.ISel)
 
     def OnSort(self, event):
         self.mainframe.sortTabs()
@@ -783,7 +783,7 @@ class MaskToolPanel(GUIToolPanel):
             if len(errors)>0:
                 raise Exception('Error: The mask failed on some tables:\n\n'+'\n'.join(errors))
         else:
-            dfs, name = tabList.get(iSel-1).applyMaskString(maskString, bAdd=bAdd)
+            df, name = tabList.get(iSel-1).applyMaskString(maskString, bAdd=bAdd)
             if bAdd:
                 mainframe.load_df(df,name,bAdd=bAdd)
             else:
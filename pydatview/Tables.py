@@ -1,11 +1,26 @@
 import numpy as np
 import os.path
-from dateutil import parser
+import time
+import weakref
+import tempfile
+import warnings
 import pandas as pd
 try:
-    from .common import no_unit, ellude_common, getDt
+    from .common import no_unit, ellude_common, getDt, getTabCommonColIndices
+    from .columnstore import ColumnStore, GrowableColumnStore, ArrayColumnStore, ParquetColumnStore, DerivedColumnStore, columnSignature, sameValues
+    from .streaming import CSVStream, isStreamable, StreamNotSupportedError
+    from .headers import readDelimitedHeader, readDelimitedColumns, countRows, selectColumns, headersFromDfs, TableHeader
+    from .export import writeDataFrame, writeDataFrames, exportFileFormat, uniqueNames, ExportFormatError
+    from .session import writeSession, readSession
+    from .expressions import Expression, compileExpression
 except:
-    from common import no_unit, ellude_common, getDt
+    from common import no_unit, ellude_common, getDt, getTabCommonColIndices
+    from columnstore import ColumnStore, GrowableColumnStore, ArrayColumnStore, ParquetColumnStore, DerivedColumnStore, columnSignature, sameValues
+    from streaming import CSVStream, isStreamable, StreamNotSupportedError
+    from headers import readDelimitedHeader, readDelimitedColumns, countRows, selectColumns, headersFromDfs, TableHeader
+    from export import writeDataFrame, writeDataFrames, exportFileFormat, uniqueNames, ExportFormatError
+    from session import writeSession, readSession
+    from expressions import Expression, compileExpression
 try:
     import weio.weio as weio# File Formats and File Readers
 except:
@@ -20,6 +35,318 @@ except:
 
 
 
+# Extensions of delimited text files that can be reloaded incrementally (see Table.reloadTail)
+TAIL_EXTENSIONS = ['.out', '.csv', '.txt', '.dat']
+
+
+# --------------------------------------------------------------------------------}
+# --- File readers 
+# --------------------------------------------------------------------------------{
+def readFile(filename, fileformat=None, formatGuess=None, columns=None):
+    """ 
+    Read a file using weio and return its dataframe(s)
+    NOTE: module level function so that it can be sent to a process pool
+
+    formatGuess: fileformat likely to be the one of the file (see formatcache.py), used instead
+                 of the format detection when fileformat is None. The format is detected if the
+                 reader of this format fails.
+    columns: names of the columns to keep (see headers.selectColumns), None to keep all the columns.
+             Only these columns are parsed for simple delimited files.
+
+    returns: dfs, fileformat, warn
+       dfs: dataframe, dict of dataframes, or None if the reading failed
+       fileformat: the fileformat used (detected if it was None)
+       warn: warning/error message, empty if success
+    """
+    dfs=None
+    warn=''
+    if not os.path.isfile(filename):
+        warn = 'Error: File not found: `'+filename+'`\n'
+        return dfs, fileformat, warn
+    if columns is not None:
+        header = readDelimitedHeader(filename)
+        if header is not None:
+            ff = fileformat if fileformat is not None else fileFormatFromName(header['formatName'])
+            if ff is not None and ff.name==header['formatName']:
+                try:
+                    return readDelimitedColumns(filename, header, columns), ff, warn
+                except:
+                    pass # Using the regular reader
+    try:
+        #F = weio.read(filename, fileformat = fileformat)
+        # --- Expanded version of weio.read
+        F = None
+        if fileformat is None and formatGuess is not None:
+            try:
+                F = formatGuess.constructor(filename=filename)
+                dfs = F.toDataFrame()
+                fileformat = formatGuess
+            except MemoryError:
+                raise
+            except:
+                F   = None # Wrong guess, the format is detected
+                dfs = None
+        if fileformat is None:
+            # Files exported by pyDatView are read directly, other files are detected by weio
+            fileformat = exportFileFormat(filename=filename)
+        if fileformat is None:
+            fileformat, F = weio.detectFormat(filename)
+        if dfs is None:
+            # Reading the file with the appropriate class if necessary
+            if not isinstance(F, fileformat.constructor):
+                F=fileformat.constructor(filename=filename)
+            dfs = F.toDataFrame()
+    except weio.FileNotFoundError as e:
+        warn = 'Error: A file was not found!\n\n While opening:\n\n {}\n\n the following file was not found:\n\n {}\n'.format(filename, e.filename)
+    except IOError:
+        warn = 'Error: IO Error thrown while opening file: '+filename+'\n'
+    except MemoryError:
+        warn='Error: Insufficient memory!\n\nFile: '+filename+'\n\nTry closing and reopening the program, or use a 64 bit version of this program (i.e. of python).\n'
+    except weio.EmptyFileError:
+        warn='Error: File empty!\n\nFile is empty: '+filename+'\n\nOpen a different file.\n'
+    except weio.FormatNotDetectedError:
+        warn='Error: File format not detected!\n\nFile: '+filename+'\n\nUse an explicit file-format from the list\n'
+    except (weio.WrongFormatError, ExportFormatError) as e:
+        warn='Error: Wrong file format!\n\nFile: '+filename+'\n\n'   \
+                'The file parser for the selected format failed to open the file.\n\n'+   \
+                'The reported error was:\n'+e.args[0]+'\n\n' +   \
+                'Double-check your file format and report this error if you think it''s a bug.\n'
+    except weio.BrokenFormatError as e:
+        warn = 'Error: Inconsistency in the file format!\n\nFile: '+filename+'\n\n'   \
+               'The reported error was:\n\n'+e.args[0]+'\n\n' +   \
+               'Double-check your file format and report this error if you think it''s a bug.'
+    except:
+        raise
+    if len(warn)>0:
+        dfs=None
+    return selectColumns(dfs, columns), fileformat, warn
+
+def readHeader(filename, fileformat=None, formatGuess=None):
+    """ 
+    Read the columns and number of rows of the tables of a file, without parsing the data
+    for simple delimited files (see headers.py). Other files are read entirely.
+    NOTE: module level function so that it can be sent to a process pool
+
+    returns: headers, fileformat, warn, dfs
+       headers: list of (name, columns, nRows), one per table
+       dfs: dataframe(s) of the file if it had to be read, None otherwise
+    """
+    if os.path.isfile(filename):
+        header = readDelimitedHeader(filename)
+        if header is not None:
+            ff = fileformat if fileformat is not None else fileFormatFromName(header['formatName'])
+            if ff is not None and ff.name==header['formatName']:
+                try:
+                    return [('', header['columns'], countRows(filename, header['skiprows']))], ff, '', None
+                except (OSError, IOError):
+                    pass
+    dfs, fileformat, warn = readFile(filename, fileformat=fileformat, formatGuess=formatGuess)
+    return headersFromDfs(dfs), fileformat, warn, dfs
+
+_FILE_FORMATS=None
+def fileFormatFromName(formatName):
+    """ Return the weio fileformat that has a given name, None if not found """
+    global _FILE_FORMATS
+    if formatName is None:
+        return None
+    if _FILE_FORMATS is None:
+        _FILE_FORMATS, _ = weio.fileFormats(ignoreErrors=True, verbose=False)
+    for ff in _FILE_FORMATS:
+        if ff.name==formatName:
+            return ff
+    return exportFileFormat(name=formatName)
+
+def _readFileTuple(args):
+    return readFile(*args)
+
+def _readHeaderTuple(args):
+    return readHeader(*args)
+
+def _imap(func, argsList, nWorkers=1, parallel='thread'):
+    """ 
+    Apply func to a list of arguments, possibly concurrently, and yield the results in the input order
+      - nWorkers: number of workers. 1: serial, None: number of cpus
+      - parallel: 'thread' or 'process', type of pool used when nWorkers>1
+    """
+    argsList = list(argsList)
+    if nWorkers is None:
+        nWorkers = os.cpu_count() or 1
+    nWorkers = min(int(nWorkers), len(argsList))
+    if nWorkers<=1:
+        # Serial
+        for args in argsList:
+            yield func(args)
+        return
+    if parallel=='thread':
+        from concurrent.futures import ThreadPoolExecutor as Executor
+    elif parallel=='process':
+        from concurrent.futures import ProcessPoolExecutor as Executor
+    else:
+        raise Exception('Parallel loading method unknown: `{}`'.format(parallel))
+    executor = Executor(max_workers=nWorkers)
+    try:
+        # NOTE: map returns the results in the submission order
+        for res in executor.map(func, argsList):
+            yield res
+    finally:
+        # If the generator is closed early (e.g. loading cancelled), files not started are not read
+        try:
+            executor.shutdown(wait=True, cancel_futures=True)
+        except TypeError: # python<3.9
+            executor.shutdown(wait=True)
+
+def readFiles(files, nWorkers=1, parallel='thread'):
+    """ 
+    Read a list of files, possibly concurrently, and yield the results in the input order
+    INPUTS:
+      - files: list of tuples (filename, fileformat), (filename, fileformat, formatGuess)
+               or (filename, fileformat, formatGuess, columns) (see readFile)
+      - nWorkers: number of workers. 1: serial, None: number of cpus
+      - parallel: 'thread' or 'process', type of pool used when nWorkers>1
+    OUTPUTS (generator):
+      - filename, dfs, fileformat, warn  (see readFile)
+    """
+    files = list(files)
+    results = _imap(_readFileTuple, files, nWorkers=nWorkers, parallel=parallel)
+    try:
+        for args, (dfs, ff, warn) in zip(files, results):
+            yield args[0], dfs, ff, warn
+    finally:
+        results.close()
+
+def readHeaders(files, nWorkers=1, parallel='thread'):
+    """ 
+    Read the headers of a list of files, possibly concurrently (see readFiles and readHeader)
+    OUTPUTS (generator):
+      - filename, headers, fileformat, warn, dfs  (see readHeader)
+    """
+    files = list(files)
+    results = _imap(_readHeaderTuple, files, nWorkers=nWorkers, parallel=parallel)
+    try:
+        for args, (headers, ff, warn, dfs) in zip(files, results):
+            yield args[0], headers, ff, warn, dfs
+    finally:
+        results.close()
+
+
+# --------------------------------------------------------------------------------}
+# --- Memory 
+# --------------------------------------------------------------------------------{
+def _removeFile(filename):
+    try:
+        os.remove(filename)
+    except OSError:
+        pass
+
+def spillDataFrame(df, spillDir):
+    """ 
+    Write a dataframe to a parquet file in spillDir, and return a column store reading it back.
+    The file is removed when the store is garbage collected. Returns None if the dataframe cannot be written.
+    """
+    try:
+        os.makedirs(spillDir, exist_ok=True)
+        fd, filename = tempfile.mkstemp(suffix='.parquet', prefix='spill_', dir=spillDir)
+        os.close(fd)
+    except OSError:
+        return None
+    try:
+        df.to_parquet(filename)
+        store = ParquetColumnStore(filename, name=df.columns.name)
+        if store.names!=list(df.columns) or store.nRows!=len(df):
+            raise Exception('Columns not supported by parquet')
+    except Exception:
+        _removeFile(filename)
+        return None
+    weakref.finalize(store, _removeFile, filename)
+    return store
+
+
+# --------------------------------------------------------------------------------}
+# --- Compact storage 
+# --------------------------------------------------------------------------------{
+def isTimeColumn(name):
+    """ True for columns that are likely to be a time axis """
+    name = no_unit(str(name)).strip().lower()
+    return name=='t' or name.startswith('time')
+
+def compactValues(values, rtol=1e-6):
+    """ 
+    Return the values in single precision if the relative error introduced is below rtol,
+    otherwise return the values unchanged (only double precision arrays are converted)
+    """
+    if not isinstance(values, np.ndarray) or values.dtype!=np.float64:
+        return values
+    with np.errstate(over='ignore', under='ignore', invalid='ignore'):
+        v32 = values.astype(np.float32)
+        b = np.isfinite(values)
+        if not np.array_equal(b, np.isfinite(v32)):
+            return values # Overflow
+        if not np.all(np.abs(v32[b]-values[b]) <= rtol*np.abs(values[b])):
+            return values # Loss of precision (or underflow)
+    return v32
+
+def compactColumn(i, name, values, rtol=1e-6):
+    """ Compact storage of a column, the first column and time columns are kept in double precision """
+    if i==0 or isTimeColumn(name):
+        return values
+    return compactValues(values, rtol=rtol)
+
+
+# --------------------------------------------------------------------------------}
+# --- Type inference 
+# --------------------------------------------------------------------------------{
+def sampleIndices(n, sampleSize=100):
+    """ Indices of at most sampleSize rows evenly spread over n rows (all rows if sampleSize<=0) """
+    if sampleSize is None or sampleSize<=0 or n<=sampleSize:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n-1, sampleSize).astype(int))
+
+def inferColumnType(sample):
+    """ 
+    Type of an object column inferred from a sample of its values:
+      'numeric', 'datetime', 'string', or None (unknown, the column is left unchanged)
+    """
+    kind = pd.api.types.infer_dtype(sample, skipna=True)
+    if kind in ['floating', 'integer', 'mixed-integer-float', 'decimal', 'empty']:
+        return 'numeric'
+    if kind in ['datetime', 'datetime64', 'date']:
+        return 'datetime'
+    if kind=='string':
+        try:
+            pd.to_numeric(sample)
+            return 'numeric'
+        except (ValueError, TypeError):
+            pass
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                pd.to_datetime(sample)
+            return 'datetime'
+        except (ValueError, TypeError, OverflowError):
+            return 'string'
+    if kind in ['mixed', 'mixed-integer']:
+        return 'string'
+    return None
+
+def convertObjectColumn(values, kind, compact=False):
+    """ 
+    Convert the values of an object column to the type inferred (see inferColumnType)
+    returns: new values (None if unchanged), kind (string if the conversion failed)
+    """
+    try:
+        if kind=='numeric':
+            return pd.to_numeric(values), kind
+        if kind=='datetime':
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                return pd.to_datetime(values).values, kind
+    except (ValueError, TypeError, OverflowError):
+        kind = 'string' # e.g. a few values in the column are not numbers or dates
+    if kind=='string' and compact:
+        return pd.Categorical(values), kind
+    return None, kind
+
+
 # --------------------------------------------------------------------------------}
 # --- TabList 
 # --------------------------------------------------------------------------------{
@@ -27,6 +354,14 @@ class TableList(object): # todo inherit list
     def __init__(self,tabs=[]):
         self._tabs=tabs
         self.Naming='Ellude'
+        self.cache=None # Persistent cache of parsed files, see filecache.py
+        self.lazy=False # Tables read from the cache only load the columns that are used
+        self.formatCache=None # Formats detected for similar files, see formatcache.py
+        self.streamSizeMB=None # Delimited files larger than this are streamed, see streaming.py
+        self.streamChunkRows=200000
+        self._sharedColumns={} # Arrays shared between tables, signature -> list of weak references (see shareColumns)
+        self.memoryBudgetMB=None # Maximum memory used by the data of the tables, see enforceMemoryBudget
+        self.spillDir=None
 
     # --- behaves like a list...
     def __iter__(self):
@@ -55,70 +390,271 @@ class TableList(object): # todo inherit list
             if df is not None:
                 self.append(Table(data=df, name=name))
 
-    def load_tables_from_files(self, filenames=[], fileformats=None, bAdd=False):
-        """ load multiple files into table list"""
+    def load_tables_from_files(self, filenames=[], fileformats=None, bAdd=False, nWorkers=1, parallel='thread', columns=None):
+        """ load multiple files into table list
+
+        nWorkers: number of workers used to parse the files concurrently.
+                  1: serial loading, None: number of cpus
+        parallel: 'thread' or 'process', type of pool used when nWorkers>1
+        columns: names of the columns to load (e.g. selected after scanHeaders), None for all columns
+        """
         if not bAdd:
             self.clean() # TODO figure it out
 
+        # Loop through files, appending tables within files
+        warnList=[]
+        for f, tabs, warnloc, _ in self.iterLoadFiles(filenames, fileformats, nWorkers=nWorkers, parallel=parallel, columns=columns):
+            if len(warnloc)>0:
+                warnList.append(warnloc)
+            for t in tabs:
+                if t.isStreaming:
+                    t.readStream()
+            self.append(tabs)
+        
+        return warnList
+
+    def iterLoadFiles(self, filenames=[], fileformats=None, nWorkers=1, parallel='thread', cancel=None, columns=None):
+        """ 
+        Read multiple files and yield the tables of each file as soon as it is read.
+        The tables are not added to the table list (see load_tables_from_files).
+        Can be used from a background thread (see loader.py).
+
+        cancel: threading.Event, the reading stops when the event is set
+        columns: names of the columns to load, None for all columns (see load_tables_from_files)
+        yields: filename, tabs, warn, progress
+            progress: dict with keys 'nDone', 'nFiles', 'bytesDone', 'bytesTotal', 'current' (file being read)
+        Tables of streamed files only contain the first rows, the remaining rows are appended
+        by the consumer (see Table.isStreaming, Table.readStream and loader.py).
+        """
         if fileformats is None:
             fileformats=[None]*len(filenames)
         assert type(fileformats) ==list, 'fileformats must be a list'
 
-        # Loop through files, appending tables within files
-        warnList=[]
+        # Selecting the files that need to be read
+        toLoad=[]
+        opened=set(self.unique_filenames)
+        progress={'nDone':0, 'nFiles':0, 'bytesDone':0, 'bytesTotal':0, 'current':''}
         for f,ff in zip(filenames, fileformats):
-            if f in self.unique_filenames:
-                warnList.append('Warn: Cannot add a file already opened ' + f)
+            if f in opened:
+                yield f, [], 'Warn: Cannot add a file already opened ' + f, dict(progress)
             elif len(f)==0:
                 pass
                 #    warn+= 'Warn: an empty filename was skipped' +'\n'
             else:
-                tabs, warnloc = self._load_file_tabs(f,fileformat=ff) 
-                if len(warnloc)>0:
-                    warnList.append(warnloc)
-                self.append(tabs)
-        
-        return warnList
+                opened.add(f)
+                toLoad.append((f,ff))
+        sizes = []
+        for f,_ in toLoad:
+            try:
+                sizes.append(os.path.getsize(f))
+            except OSError:
+                sizes.append(0)
+        progress['nFiles']     = len(toLoad)
+        progress['bytesTotal'] = sum(sizes)
+        if len(toLoad)==0 or (cancel is not None and cancel.is_set()):
+            return
+
+        reader = self._readFiles(toLoad, nWorkers=nWorkers, parallel=parallel, columns=columns)
+        try:
+            for i, (f, dfs, ff, warn) in enumerate(reader):
+                tabs, warn = self._tabs_from_dfs(f, dfs, ff, warn)
+                progress['nDone']     = i+1
+                progress['bytesDone']+= sizes[i]
+                progress['current']   = toLoad[i+1][0] if i+1<len(toLoad) else ''
+                yield f, tabs, warn, dict(progress)
+                if cancel is not None and cancel.is_set():
+                    break
+        finally:
+            reader.close()
+
+    def _readFiles(self, files, nWorkers=1, parallel='thread', columns=None):
+        """ 
+        Read files, using the file and format caches when possible. Results are yielded in the input order 
+        columns: names of the columns to keep, None for all. Files read partially are not cached.
+        """
+        if self.cache is not None:
+            keys = [self.cache.lookup(f, None if ff is None else ff.name) for f,ff in files]
+        else:
+            keys = [None]*len(files)
+        streams = set([f for (f,ff),k in zip(files,keys) if k is None and columns is None and self._streamable(f, ff)])
+        misses = [(f,ff) for (f,ff),k in zip(files,keys) if k is None and f not in streams]
+        misses, done = self._guessFormats(misses)
+        if columns is not None:
+            misses = [(m[0], m[1], m[2] if len(m)>2 else None, columns) for m in misses]
+        reader = readFiles([m for m in misses if m[0] not in done], nWorkers=nWorkers, parallel=parallel)
+        try:
+            for (f,ff),k in zip(files,keys):
+                dfs = None
+                if k is not None:
+                    try:
+                        dfs, formatName = self.cache.load(k, lazy=self.lazy)
+                        dfs = selectColumns(dfs, columns)
+                        if ff is None:
+                            ff = fileFormatFromName(formatName)
+                    except:
+                        self.cache.remove(k)
+                        dfs = None
+                if dfs is not None and ff is not None:
+                    yield f, dfs, ff, ''
+                elif k is not None:
+                    # Cache entry could not be used
+                    dfs, ff, warn = readFile(f, fileformat=ff, columns=columns)
+                    yield f, dfs, ff, warn
+                elif f in streams:
+                    try:
+                        yield f, self._openStream(f), fileFormatFromName('CSV file'), ''
+                    except StreamNotSupportedError:
+                        dfs, ff, warn = readFile(f, fileformat=ff)
+                        yield f, dfs, ff, warn
+                else:
+                    if f in done:
+                        _, dfs, ff_read, warn = done[f]
+                        dfs = selectColumns(dfs, columns)
+                    else:
+                        _, dfs, ff_read, warn = next(reader)
+                    # NOTE: the format of files read partially is not detected (see readFile), and the data is not complete
+                    if len(warn)==0 and ff is None and columns is None and self.formatCache is not None:
+                        self.formatCache.update(f, ff_read.name)
+                    if len(warn)==0 and self.cache is not None and columns is None:
+                        formatName = None if ff is None else ff.name
+                        if self.cache.put(f, formatName, dfs, ff_read.name) and self.lazy:
+                            # Releasing the parsed data, columns will be read from the cache when needed
+                            try:
+                                dfs, _ = self.cache.load(self.cache.lookup(f, formatName), lazy=True)
+                            except:
+                                pass
+                    yield f, dfs, ff_read, warn
+        finally:
+            reader.close()
+            if self.cache is not None:
+                self.cache.flush() # Access times of the entries loaded
+
+    def _guessFormats(self, files):
+        """ 
+        Use the format cache to guess the format of the files with an unknown format.
+        Within files of the same directory with the same signature, the format is detected only 
+        once: the first file of the group is read, and the other files reuse its format.
+        returns:
+          - files: list of (filename, fileformat, formatGuess)
+          - done: dict of results of readFiles for the files already read
+        """
+        if self.formatCache is None:
+            return files, {}
+        sigs   = [self.formatCache.signature(f) if ff is None else None for f,ff in files]
+        groups = {}
+        for (f,ff),sig in zip(files,sigs):
+            if sig is not None:
+                groups.setdefault((os.path.dirname(f),sig), []).append(f)
+        out  = []
+        done = {}
+        for (f,ff),sig in zip(files,sigs):
+            guess = None
+            if sig is not None:
+                guess = fileFormatFromName(self.formatCache.get(sig))
+                group = groups[(os.path.dirname(f),sig)]
+                if guess is None and len(group)>1 and f==group[0]:
+                    dfs, ff_read, warn = readFile(f)
+                    done[f] = (f, dfs, ff_read, warn)
+                    if len(warn)==0:
+                        self.formatCache.update(f, ff_read.name)
+            out.append((f, ff, guess))
+        return out, done
+
+    def setFormatCache(self, formatCache):
+        """ formatCache: FormatCache object, or None to always detect the file formats """
+        self.formatCache=formatCache
+
+    def scanHeaders(self, filenames, fileformats=None, nWorkers=None, parallel='thread'):
+        """ 
+        Read the columns and number of rows of the tables of many files, without loading the data
+        when possible (simple delimited files and files in the cache, see headers.py).
+        The other files are read entirely, and stored in the cache if available so that loading
+        them afterwards is fast.
+        The column intersection can then be obtained with commonColumns, and the selected columns
+        loaded with load_tables_from_files(..., columns=...)
+        returns: headers (list of TableHeader, in the order of the files), warnList
+        """
+        if fileformats is None:
+            fileformats=[None]*len(filenames)
+        results = {}
+        misses  = []
+        for f,ff in zip(filenames, fileformats):
+            k = None if self.cache is None else self.cache.lookup(f, None if ff is None else ff.name)
+            if k is not None:
+                try:
+                    dfs, formatName = self.cache.load(k, lazy=True) # Column stores, the data is not read
+                    results[f] = (headersFromDfs(dfs), ff if ff is not None else fileFormatFromName(formatName), '')
+                    continue
+                except:
+                    self.cache.remove(k)
+            guess = None
+            if ff is None and self.formatCache is not None:
+                guess = fileFormatFromName(self.formatCache.get(self.formatCache.signature(f)))
+            misses.append((f, ff, guess))
+        for (f, ff, _), (_, hdrs, ff_read, warn, dfs) in zip(misses, readHeaders(misses, nWorkers=nWorkers, parallel=parallel)):
+            if dfs is not None and len(warn)==0:
+                if ff is None and self.formatCache is not None:
+                    self.formatCache.update(f, ff_read.name)
+                if self.cache is not None:
+                    self.cache.put(f, None if ff is None else ff.name, dfs, ff_read.name)
+            results[f] = (hdrs, ff_read, warn)
+        if self.cache is not None:
+            self.cache.flush()
+        headers  = []
+        warnList = []
+        for f in filenames:
+            hdrs, ff, warn = results[f]
+            if len(warn)>0:
+                warnList.append(warn)
+            headers += [TableHeader(f, name, cols, nRows, ff) for name, cols, nRows in hdrs]
+        return headers, warnList
+
+    @staticmethod
+    def commonColumns(tabs):
+        """ Columns present in all the tables (or table headers), in the order of the first table """
+        if len(tabs)==0:
+            return []
+        IKeepPerTab, _, _, _ = getTabCommonColIndices(tabs)
+        return [tabs[0].columns[i] for i in IKeepPerTab[0]]
+
+    def setStreaming(self, minSizeMB=200, chunkRows=200000):
+        """ 
+        minSizeMB: delimited text files larger than this are streamed, None to disable streaming
+        chunkRows: number of rows parsed at once when streaming
+        """
+        self.streamSizeMB=minSizeMB
+        self.streamChunkRows=chunkRows
+
+    def _streamable(self, filename, fileformat):
+        if self.streamSizeMB is None:
+            return False
+        return isStreamable(filename, None if fileformat is None else fileformat.name, self.streamSizeMB)
+
+    def _openStream(self, filename):
+        """ Parse the first rows of a file, and return a store to which the next rows will be appended """
+        stream = CSVStream(filename, chunkRows=self.streamChunkRows)
+        store  = GrowableColumnStore(stream.columns, stream.first.values, capacity=int(stream.estimateRows()*1.02))
+        store.stream = stream
+        stream.first = None
+        return store
+
+    def setCache(self, cache, lazy=False):
+        """ 
+        cache: FileCache object, or None to disable the cache
+        lazy: if True, tables are backed by the cache and columns are only read when used
+        """
+        self.cache=cache
+        self.lazy=lazy and cache is not None
 
     def _load_file_tabs(self, filename, fileformat=None):
         """ load a single file, adds table """
+        dfs, fileformat, warn = readFile(filename, fileformat=fileformat)
+        return self._tabs_from_dfs(filename, dfs, fileformat, warn)
+
+    def _tabs_from_dfs(self, filename, dfs, fileformat, warn=''):
+        """ Create the tables from the dataframe(s) returned by a file reader """
         # Returning a list of tables 
         tabs=[]
-        warn=''
-        if not os.path.isfile(filename):
-            warn = 'Error: File not found: `'+filename+'`\n'
-            return tabs, warn
-        try:
-            #F = weio.read(filename, fileformat = fileformat)
-            # --- Expanded version of weio.read
-            F = None
-            if fileformat is None:
-                fileformat, F = weio.detectFormat(filename)
-            # Reading the file with the appropriate class if necessary
-            if not isinstance(F, fileformat.constructor):
-                F=fileformat.constructor(filename=filename)
-            dfs = F.toDataFrame()
-        except weio.FileNotFoundError as e:
-            warn = 'Error: A file was not found!\n\n While opening:\n\n {}\n\n the following file was not found:\n\n {}\n'.format(filename, e.filename)
-        except IOError:
-            warn = 'Error: IO Error thrown while opening file: '+filename+'\n'
-        except MemoryError:
-            warn='Error: Insufficient memory!\n\nFile: '+filename+'\n\nTry closing and reopening the program, or use a 64 bit version of this program (i.e. of python).\n'
-        except weio.EmptyFileError:
-            warn='Error: File empty!\n\nFile is empty: '+filename+'\n\nOpen a different file.\n'
-        except weio.FormatNotDetectedError:
-            warn='Error: File format not detected!\n\nFile: '+filename+'\n\nUse an explicit file-format from the list\n'
-        except weio.WrongFormatError as e:
-            warn='Error: Wrong file format!\n\nFile: '+filename+'\n\n'   \
-                    'The file parser for the selected format failed to open the file.\n\n'+   \
-                    'The reported error was:\n'+e.args[0]+'\n\n' +   \
-                    'Double-check your file format and report this error if you think it''s a bug.\n'
-        except weio.BrokenFormatError as e:
-            warn = 'Error: Inconsistency in the file format!\n\nFile: '+filename+'\n\n'   \
-                   'The reported error was:\n\n'+e.args[0]+'\n\n' +   \
-                   'Double-check your file format and report this error if you think it''s a bug.'
-        except:
-            raise
         if len(warn)>0:
             return tabs, warn
 
@@ -127,6 +663,7 @@ class TableList(object): # todo inherit list
         elif not isinstance(dfs,dict):
             if len(dfs)>0:
                 tabs=[Table(data=dfs, filename=filename, fileformat=fileformat)]
+                tabs[0].initTail()
         else:
             for k in list(dfs.keys()):
                 if len(dfs[k])>0:
@@ -223,9 +760,228 @@ class TableList(object): # todo inherit list
         del self._tabs
         self._tabs=[]
 
+    # --- Memory budget
+    def setMemoryBudget(self, budgetMB=None, spillDir=None):
+        """ 
+        budgetMB: maximum memory used by the data of the tables, None for no limit
+        spillDir: directory where the data of tables that cannot be read again from the file cache 
+                  is written when they are evicted (see Table.evict), None: a temporary directory
+        """
+        self.memoryBudgetMB=budgetMB
+        self.spillDir=spillDir if spillDir is not None else os.path.join(tempfile.gettempdir(), 'pydatview_spill')
+
+    @property
+    def nbytes(self):
+        """ Memory used by the data of the tables, arrays shared between tables are counted once """
+        seen = set()
+        n = 0
+        for t in self._tabs:
+            if t._store is None:
+                n += t.nbytes
+                continue
+            for a in t._store.memoryArrays():
+                if id(a) not in seen:
+                    seen.add(id(a))
+                    n += a.nbytes
+        return n
+
+    def enforceMemoryBudget(self, keep=[]):
+        """ 
+        Evict the data of the least recently used tables (see Table.evict) until the memory used 
+        is within the budget. The data is read again when the tables are used.
+        keep: indices of the tables that are not evicted (e.g. the tables selected)
+        Returns the number of bytes released
+        """
+        if self.memoryBudgetMB is None:
+            return 0
+        budget = self.memoryBudgetMB*1024**2
+        used   = self.nbytes
+        released = 0
+        tabs = sorted([t for i,t in enumerate(self._tabs) if i not in keep], key=lambda t: t.lastUsed)
+        for t in tabs:
+            if used-released<=budget:
+                break
+            released += t.evict(self.spillDir)
+        return released
+
+    # --- Shared columns
+    def shareColumns(self, tabs=None, xOnly=False):
+        """ 
+        Find columns that are bitwise identical between tables (typically the time axis of
+        simulations), and store them once: the tables then use the same read-only array.
+        Columns are grouped by a hash of a sample of their values (see columnSignature), and the
+        values are compared within a group. Shared arrays are never modified: a table that modifies
+        a column, or accesses its dataframe (`Table.data`), gets its own values (copy-on-write).
+        tabs: tables to consider, all the tables by default. The arrays shared previously are reused.
+        xOnly: only the first column of the tables is considered
+        returns: the number of bytes saved
+        """
+        if tabs is None:
+            tabs = self._tabs
+        groups = {}
+        for t in tabs:
+            for i in t._shareableColumns(xOnly):
+                groups.setdefault(columnSignature(t._columnValues(i)), []).append((t, i))
+        nSaved = 0
+        for sig, cols in groups.items():
+            shared = [r() for r in self._sharedColumns.get(sig, [])]
+            shared = [s for s in shared if s is not None]
+            # Clusters of identical columns: [shared array or None, columns]
+            clusters = [[s, []] for s in shared]
+            for t, i in cols:
+                values = t._columnValues(i)
+                for c in clusters:
+                    ref = c[0] if c[0] is not None else c[1][0][0]._columnValues(c[1][0][1])
+                    if sameValues(values, ref):
+                        c[1].append((t, i))
+                        break
+                else:
+                    clusters.append([None, [(t, i)]])
+            for c in clusters:
+                canonical, members = c
+                if canonical is None:
+                    if len(members)<2:
+                        continue
+                    canonical = members[0][0]._columnValues(members[0][1]).copy()
+                    canonical.flags.writeable = False
+                    shared.append(canonical)
+                    nSaved -= canonical.nbytes
+                for t, i in members:
+                    values = t._columnValues(i)
+                    if values is not canonical:
+                        nSaved += values.nbytes
+                        del values
+                        t._shareColumn(i, canonical)
+            if len(shared)>0:
+                self._sharedColumns[sig] = [weakref.ref(s) for s in shared]
+        return nSaved
+
+    # --- Export
+    def exportTables(self, path, I=None, fmt=None, nWorkers=None):
+        """ 
+        Export several tables, in one multi-table file (npz), or in a directory with one file per table.
+        The files of a directory are written concurrently, using threads.
+          - path: npz file, or directory
+          - I: indices of the tables to export, None for all
+          - fmt: 'csv', 'parquet', 'feather' or 'npz', None: npz if path ends with .npz, parquet otherwise
+        returns: list of files written
+        """
+        if I is None:
+            I = list(range(len(self._tabs)))
+        if fmt is None:
+            fmt = 'npz' if path.lower().endswith('.npz') else 'parquet'
+        names = self.getDisplayTabNames()
+        dfs = dict(zip(uniqueNames([names[i] for i in I]), [self._tabs[i].exportFrame() for i in I]))
+        imap = lambda func, argsList, nWorkers: _imap(func, argsList, nWorkers=nWorkers, parallel='thread')
+        return writeDataFrames(dfs, path, fmt=fmt, nWorkers=nWorkers, imap=imap)
+
+    # --- Session
+    def saveSession(self, filename, gui=None, embedSources=False):
+        """ 
+        Save the tables to a session file (see session.py)
+          - gui: json serializable dict describing the state of the GUI, returned by loadSession
+          - embedSources: if True, the data of the tables read from files is stored as well
+        """
+        meta   = {'naming':self.Naming, 'tables':[], 'gui':gui}
+        arrays = {}
+        for k,t in enumerate(self._tabs):
+            embed = len(t.filename)==0 or embedSources
+            td = {'name':t.raw_name, 'active_name':t.active_name, 'filename':t.filename, 'fileformat':t.fileformat_name,
+                  'maskString':t.maskString, 'formulas':[dict(f) for f in t.formulas], 'embedded':embed}
+            if embed:
+                df = t.exportFrame()
+                td['columns'] = [str(c) for c in df.columns]
+                for j in range(df.shape[1]):
+                    arrays['{}/data/{}'.format(k,j)] = df.iloc[:,j].values
+            else:
+                for f in t.formulas:
+                    arrays['{}/formula/{}'.format(k,f['pos'])] = t._column(f['pos']-1).values
+            if t.mask is not None:
+                arrays['{}/mask'.format(k)] = np.asarray(t.mask)
+            meta['tables'].append(td)
+        writeSession(filename, meta, arrays)
+
+    def loadSession(self, filename, bAdd=False, nWorkers=1, parallel='thread'):
+        """ 
+        Load the tables of a session file (see saveSession).
+        Files are read again (using the file cache if enabled), the formula columns and masks
+        are restored from the session without being evaluated.
+        returns: gui, warnList
+        """
+        meta, arrays = readSession(filename)
+        if not bAdd:
+            self.clean()
+        warnList = []
+        # --- Reading the files of the tables that were not embedded
+        files = []
+        for td in meta['tables']:
+            if not td['embedded'] and td['filename'] not in [f for f,_ in files]:
+                files.append((td['filename'], fileFormatFromName(td['fileformat']) if len(td['fileformat'])>0 else None))
+        fileTabs = {}
+        if len(files)>0:
+            for f, tabs, warn, _ in self.iterLoadFiles([f for f,_ in files], [ff for _,ff in files], nWorkers=nWorkers, parallel=parallel):
+                if len(warn)>0:
+                    warnList.append(warn)
+                for t in tabs:
+                    if t.isStreaming:
+                        t.readStream()
+                    fileTabs[t.raw_name] = t
+        # --- Restoring the tables in the session order
+        tabs = []
+        for k, td in enumerate(meta['tables']):
+            if td['embedded']:
+                df = pd.DataFrame(dict([(j, arrays['{}/data/{}'.format(k,j)]) for j in range(len(td['columns']))]))
+                df.columns = td['columns']
+                ff = fileFormatFromName(td['fileformat']) if len(td['fileformat'])>0 else None
+                t = Table(data=df, filename=td['filename'], fileformat=ff)
+                t.formulas = [dict(f) for f in td['formulas']]
+            else:
+                t = fileTabs.get(td['name'], None)
+                if t is None:
+                    warnList.append('Warn: Table `{}` not found in file: {}\n'.format(td['name'], td['filename']))
+                    continue
+                for f in sorted(td['formulas'], key=lambda f: f['pos']):
+                    values = arrays.get('{}/formula/{}'.format(k,f['pos']), None)
+                    if values is not None and len(values)==t.nRows:
+                        t.addColumn(f['name'], values, f['pos']-1, f['formula'])
+                    else:
+                        t.addColumnByFormula(f['name'], f['formula'], f['pos']-1) # File changed since the session was saved
+            t.name        = td['name']
+            t.active_name = td['active_name']
+            mask = arrays.get('{}/mask'.format(k), None)
+            if mask is not None and len(mask)==t.nRows:
+                t.mask       = mask
+                t.maskString = td['maskString']
+            elif len(td['maskString'])>0:
+                try:
+                    t.applyMaskString(td['maskString'], bAdd=False)
+                except:
+                    warnList.append('Warn: Mask failed for table: {}\n'.format(td['name']))
+            tabs.append(t)
+        self.append(tabs)
+        self.setNaming(meta.get('naming', self.Naming))
+        return meta.get('gui', None), warnList
+
     def __repr__(self):
         return '\n'.join([t.__repr__() for t in self._tabs])
 
+    # --- Formulas
+    def applyFormulas(self, formulas, I=None, lazy=True):
+        """ 
+        Add the same formula columns to several tables (see Table.applyFormulas)
+          - formulas: list of dict with keys 'name', 'formula' and optionally 'pos'
+          - I: indices of the tables, None for all
+        Returns a list of errors
+        """
+        if I is None:
+            I = range(len(self._tabs))
+        errors = []
+        for i in I:
+            t = self._tabs[i]
+            for name in t.applyFormulas(formulas, lazy=lazy):
+                errors.append('Formula `{}` failed for table: {}'.format(name, t.active_name))
+        return errors
+
     # --- Mask related
     @property
     def maskStrings(self):
@@ -247,9 +1003,15 @@ class TableList(object): # todo inherit list
         dfs_new   = []
         names_new = []
         errors=[]
+        expr = maskString
+        if len(maskString.strip())>0 and maskString.strip().lower()!='no mask':
+            try:
+                expr = compileExpression(maskString) # Parsed once for all the tables
+            except Exception as e:
+                return dfs_new, names_new, [e.args[0]]
         for i,t in enumerate(self._tabs):
             try:
-                df_new, name_new = t.applyMaskString(maskString, bAdd=bAdd)
+                df_new, name_new = t.applyMaskString(expr, bAdd=bAdd)
                 if df_new is not None: 
                     # we don't append when string is empty
                     dfs_new.append(df_new)
@@ -294,6 +1056,67 @@ class TableList(object): # todo inherit list
 
 
 
+    # --- Incremental reload
+    def popWarnings(self):
+        """ Warnings of the tables (formulas that failed when recomputed), the warnings are cleared """
+        warnList = []
+        for t in self._tabs:
+            warnList += t.formulaWarnings
+            t.formulaWarnings = []
+        return warnList
+
+    def reloadTail(self):
+        """ 
+        Incremental reload of the tables, reading only the rows appended to the files.
+        Returns False if a full reload is needed for at least one of the tables.
+        """
+        bOK = True
+        for t in self._tabs:
+            if len(t.filename)==0:
+                continue # Table not associated with a file (e.g. derived table)
+            if t.reloadTail() is None:
+                bOK = False
+        return bOK
+
+    def reloadFile(self, filename, incremental=False):
+        """ 
+        Reload the tables of a single file, keeping their formulas, masks and names.
+        incremental: if True, only the rows appended to the file are read when possible
+        Returns a warning string, empty if the reload succeeded
+        """
+        I = [i for i,t in enumerate(self._tabs) if t.filename==filename]
+        if len(I)==0:
+            return ''
+        oldTabs = [self._tabs[i] for i in I]
+        if incremental:
+            if all([t.reloadTail() is not None for t in oldTabs]):
+                return ''
+        _, dfs, ff, warn = next(self._readFiles([(filename, oldTabs[0].fileformat)]))
+        tabs, warn = self._tabs_from_dfs(filename, dfs, ff, warn)
+        if len(warn)>0:
+            return warn
+        for t in tabs:
+            if t.isStreaming:
+                t.readStream()
+        # Restoring the properties of the previous tables
+        if len(tabs)==len(oldTabs):
+            pairs = zip(oldTabs, tabs)
+        else:
+            newTabs = dict([(t.raw_name, t) for t in tabs])
+            pairs = [(t, newTabs[t.raw_name]) for t in oldTabs if t.raw_name in newTabs.keys()]
+        for old, new in pairs:
+            new.name        = old.raw_name
+            new.active_name = old.active_name
+            new.applyFormulas(old.formulas)
+            if len(old.maskString)>0:
+                try:
+                    new.applyMaskString(old.maskString, bAdd=False)
+                except:
+                    pass
+        # Replacing the tables in place
+        self._tabs = self._tabs[:I[0]] + tabs + [t for i,t in enumerate(self._tabs[I[0]:]) if i+I[0] not in I]
+        return ''
+
     # --- Radial average related
     def radialAvg(self,avgMethod,avgParam):
         dfs_new   = []
@@ -333,7 +1156,17 @@ class Table(object):
       - mask
       - maskString
       - formulas
+
+    Class attributes (session options):
+      - compact: if True, float columns are stored in single precision when the relative
+                 precision lost is below compactRtol, and string columns as categoricals.
+      - typeSampleSize: number of rows used to infer the type of object columns (0: all rows)
     """
+    compact     = False
+    compactRtol = 1e-6
+    typeSampleSize  = 100
+    columnCacheSize = 32 # Number of columns kept by getColumn
+
     # TODO sort out the naming
     # Main naming concepts:
     #    name        : 
@@ -342,8 +1175,19 @@ class Table(object):
     #    filename    : 
     def __init__(self,data=None,name='',filename='',columns=[], fileformat=None):
         # Default init
+        self._data  = None
+        self._store = None # Column store for lazy tables, see columnstore.py
+        self._version   = 0  # incremented when the values of the columns change, see evalMask
+        self._maskCache = {} # masks evaluated, key: (expression, version, columns)
+        self._stale     = set() # ids of the formulas to be recomputed when their column is accessed
+        self.formulaWarnings = [] # formulas that failed when recomputed, see popWarnings
+        self._columnCache = {}  # i -> (version, mask, values returned by getColumn)
         self.maskString=''
         self.mask=None
+        self._tailOffset = None # byte offset of the end of the last row read, for incremental reload
+        self._tailSep    = None
+        self._tailLine   = None # last line read, used to check that the file was not rewritten
+        self.lastUsed    = time.time() # time of the last access to the columns, see TableList.enforceMemoryBudget
 
         self.filename        = filename
         self.fileformat      = fileformat
@@ -353,7 +1197,17 @@ class Table(object):
             self.fileformat_name = ''
         self.formulas = []
 
-        if not isinstance(data,pd.DataFrame):
+        if isinstance(data, ColumnStore):
+            # --- Lazy table, columns are read when needed
+            self._store  = data
+            if self.compact and not data.zeroCopy:
+                rtol = self.compactRtol
+                data.transform = lambda i, n, v: compactColumn(i, n, v, rtol=rtol)
+            self.columns = self.columnsFromDF(data)
+            if name is None or len(str(name))==0:
+                if data.name is not None:
+                    name=data.name
+        elif not isinstance(data,pd.DataFrame):
             # ndarray??
             raise NotImplementedError('Tables that are not dataframe not implemented.')
         else:
@@ -368,6 +1222,8 @@ class Table(object):
         self.setupName(name=str(name))
         
         self.convertTimeColumns()
+        if self.compact:
+            self.compactData()
 
 
     def setupName(self,name=''):
@@ -416,26 +1272,18 @@ class Table(object):
         self.mask=None
 
     def applyMaskString(self,maskString,bAdd=True):
-        df = self.data
-        Index = np.array(range(df.shape[0]))
-        sMask=maskString.replace('{Index}','Index')
-        for i,c in enumerate(self.columns):
-            c_no_unit = no_unit(c).strip()
-            c_in_df   = df.columns[i]
-            # TODO sort out the mess with asarray (introduced to have and/or
-            # as array won't work with date comparison
-            # NOTE: using iloc to avoid duplicates column issue
-            if isinstance(df.iloc[0,i], pd._libs.tslibs.timestamps.Timestamp):
-                sMask=sMask.replace('{'+c_no_unit+'}','df[\''+c_in_df+'\']')
-            else:
-                sMask=sMask.replace('{'+c_no_unit+'}','np.asarray(df[\''+c_in_df+'\'])')
+        """ maskString: string or compiled Expression (see expressions.py) """
+        if isinstance(maskString, Expression):
+            expr, maskString = maskString, maskString.string
+        else:
+            expr = None
         df_new   = None
         name_new = None
-        if len(sMask.strip())>0 and sMask.strip().lower()!='no mask':
+        if len(maskString.strip())>0 and maskString.strip().lower()!='no mask':
             try:
-                mask = np.asarray(eval(sMask))
+                mask = self.evalMask(maskString if expr is None else expr)
                 if bAdd:
-                    df_new = df[mask]
+                    df_new = self.derivedStore(mask)
                     name_new=self.raw_name+'_masked'
                 else:
                     self.mask=mask
@@ -444,14 +1292,47 @@ class Table(object):
                 raise Exception('Error: The mask failed for table: '+self.name)
         return df_new, name_new
 
+    def evalMask(self, expr, cacheSize=8):
+        """ 
+        Boolean mask of the rows for an expression (string or compiled Expression)
+        Masks are cached until the values of the columns change (see _version).
+        """
+        if not isinstance(expr, Expression):
+            expr = compileExpression(expr)
+        key = (expr.string, self._version, tuple(self.columns))
+        mask = self._maskCache.get(key, None)
+        if mask is None:
+            mask = np.asarray(expr.evaluate(self.columns, self._maskColumn, self.nRows))
+            if mask.dtype!=bool or mask.shape!=(self.nRows,):
+                raise Exception('Error: the mask is not a boolean array with one value per row')
+            mask.flags.writeable = False # Shared with the cache
+            if len(self._maskCache)>=cacheSize:
+                self._maskCache = {}
+            self._maskCache[key] = mask
+        return mask
+
+    def _maskColumn(self, i):
+        """ Values of column i (starting at 0) used in expressions, series for dates to allow comparisons with strings """
+        c = self._column(i)
+        if pd.api.types.is_datetime64_any_dtype(c.dtype):
+            return c
+        return np.asarray(c)
+
     # --- Important manipulation TODO MOVE THIS OUT OF HERE OR UNIFY
     def applyResampling(self, iCol, sampDict, bAdd=True):
-        from pydatview.tools.signal import applySamplerDF
+        from pydatview.tools.signal import applySamplerDF, samplerRows
         if iCol==0:
             raise Exception('Cannot resample based on index')
-        colName=self.data.columns[iCol-1]
-        df_new =applySamplerDF(self.data, colName, sampDict=sampDict)
-        df_new
+        colName=self._frame.columns[iCol-1]
+        rows = samplerRows(self._column(iCol-1).values, sampDict)
+        if rows is not None and bAdd:
+            # Rows selected, the new table references the columns of this table
+            df_new = self.derivedStore(rows)
+        elif bAdd:
+            # Values interpolated, this table is left unchanged (lazy tables are not converted to a dataframe)
+            df_new =applySamplerDF(self._dataSnapshot(), colName, sampDict=sampDict)
+        else:
+            df_new =applySamplerDF(self.data, colName, sampDict=sampDict)
         if bAdd:
             name_new=self.raw_name+'_resampled'
         else:
@@ -460,12 +1341,19 @@ class Table(object):
         return df_new, name_new
 
     def applyFiltering(self, iCol, options, bAdd=True):
-        from pydatview.tools.signal import applyFilterDF
+        from pydatview.tools.signal import applyFilterDF, filterColumns
         if iCol==0:
             raise Exception('Cannot filter based on index')
-        colName=self.data.columns[iCol-1]
-        df_new =applyFilterDF(self.data, colName, options)
-        df_new
+        if bAdd:
+            # Only the filtered columns are new, the other columns reference the columns of this table
+            df_new = self.derivedStore()
+            dtypes = [df_new.dtype(i) for i in range(df_new.shape[1])]
+            filtered = filterColumns(lambda i: self._column(i).values, dtypes, iCol-1, options)
+            for i, values in filtered.items():
+                df_new.set(i, df_new.names[i], values)
+        else:
+            colName=self.data.columns[iCol-1]
+            df_new =applyFilterDF(self.data, colName, options)
         if bAdd:
             name_new=self.raw_name+'_filtered'
         else:
@@ -474,6 +1362,24 @@ class Table(object):
         return df_new, name_new
 
 
+    def _dataSnapshot(self):
+        """ Dataframe of the table, the column store of lazy tables is kept (see data) """
+        if len(self._stale)>0:
+            self._updateFormulas()
+        if self._store is not None:
+            return self._store.toDataFrame()
+        return self._data
+
+    def derivedStore(self, rows=None):
+        """ 
+        Column store of a table derived from this table by selecting rows (see DerivedColumnStore). 
+        The columns of this table are referenced and copied only when used by the new table.
+          - rows: None (all rows), slice, boolean mask or array of indices
+        """
+        if len(self._stale)>0:
+            self._updateFormulas()
+        return DerivedColumnStore(self._frame, rows=rows)
+
     def radialAvg(self,avgMethod, avgParam):
         import pydatview.fast.fastlib as fastlib
         import pydatview.fast.fastfarm as fastfarm
@@ -521,51 +1427,290 @@ class Table(object):
         from pydatview.plugins.data_standardizeUnits import changeUnits
         changeUnits(self, flavor=flavor)
 
-    def convertTimeColumns(self):
-        if len(self.data)>0:
-            for i,c in enumerate(self.data.columns.values):
-                y = self.data.iloc[:,i]
-                if y.dtype == object:
-                    if isinstance(y.values[0], str):
-                        # tring to convert to date
-                        try:
-                            parser.parse(y.values[0])
-                            isDate=True
-                        except:
-                            if y.values[0]=='NaT':
-                                isDate=True
-                            else:
-                                isDate=False
-                        if isDate:
-                            try:
-                                self.data[c]=pd.to_datetime(self.data[c].values).to_pydatetime()
-                                print('Column {} converted to datetime'.format(c))
-                            except:
-                                # Happens if values are e.g. "Monday, Tuesday"
-                                print('Conversion to datetime failed, column {} inferred as string'.format(c))
-                        else:
-                            print('Column {} inferred as string'.format(c))
-                    elif isinstance(y.values[0], (float, int)):
-                        try:
-                            self.data[c]=self.data[c].astype(float)
-                            print('Column {} converted to float (likely nan)'.format(c))
-                        except:
-                            self.data[c]=self.data[c].astype(str)
-                            print('Column {} inferred and converted to string'.format(c))
-                    else :
-                        print('>> Unknown type:',type(y.values[0]))
-            #print(self.data.dtypes)
+    @classmethod
+    def setTypeSampleSize(cls, sampleSize):
+        """ Session option, number of rows used to infer the type of object columns (0: all rows) """
+        cls.typeSampleSize = sampleSize
 
+    def convertTimeColumns(self):
+        """ 
+        Convert the object columns (e.g. strings read from text files) to numbers or dates.
+        The types of all object columns are inferred from the same sample of rows (see inferColumnType),
+        the columns are then converted, and all conversions are reported in one line.
+        returns: dict kind -> list of column names
+        """
+        summary = {}
+        if self._store is not None:
+            # Lazy table, only object columns need to be read
+            names = self._store.names
+            IObj  = [i for i in range(len(names)) if self._store.dtype(i) == object]
+            I     = sampleIndices(self._store.nRows, self.typeSampleSize)
+            for i in IObj:
+                values = self._store.column(i).values
+                kind = inferColumnType(values[I])
+                newValues, kind = convertObjectColumn(values, kind, compact=self.compact)
+                if newValues is not None:
+                    self._store.set(i, names[i], newValues)
+                summary.setdefault(kind, []).append(names[i])
+        else:
+            df    = self._data
+            IObj  = [i for i,t in enumerate(df.dtypes) if t == object]
+            if len(IObj)==0 or len(df)==0:
+                return summary
+            # Sample of the rows of all object columns at once
+            sample = df.iloc[sampleIndices(len(df), self.typeSampleSize), IObj].values
+            kinds  = [inferColumnType(sample[:,k]) for k in range(len(IObj))]
+            newCols = {}
+            for i, kind in zip(IObj, kinds):
+                newValues, kind = convertObjectColumn(df.iloc[:,i].values, kind, compact=self.compact)
+                if newValues is not None:
+                    newCols[i] = newValues
+                summary.setdefault(kind, []).append(df.columns[i])
+            if len(newCols)>0:
+                # All columns replaced at once
+                values = [newCols.get(i, df.iloc[:,i].values) for i in range(df.shape[1])]
+                df_new = pd.DataFrame(data=dict(zip(range(len(values)), values)), index=df.index)
+                df_new.columns = df.columns
+                self.data = df_new
+        summary.pop(None, None)
+        if len(summary)>0:
+            print('Table {}: '.format(self.name) + ', '.join(['{} column(s) {}'.format(len(v), 'inferred as string' if k=='string' else 'converted to '+k) for k,v in summary.items()]))
+        return summary
+
+
+    @classmethod
+    def setCompactStorage(cls, compact, rtol=1e-6):
+        """ Session option, applied to the tables created afterwards """
+        cls.compact     = compact
+        cls.compactRtol = rtol
+
+    def compactData(self):
+        """ Store float columns in single precision when possible (see compactValues) """
+        if self._store is not None:
+            return # Compacted when the columns are read
+        df = self.data
+        values = [df.iloc[:,i].values for i in range(df.shape[1])]
+        newValues = [compactColumn(i, c, v, rtol=self.compactRtol) for i,(c,v) in enumerate(zip(df.columns, values))]
+        if any([v1 is not v2 for v1,v2 in zip(values, newValues)]):
+            df_new = pd.DataFrame(data=dict(zip(range(len(newValues)), newValues)), index=df.index)
+            df_new.columns = df.columns
+            self.data = df_new
+
+    # --- Incremental reload
+    def initTail(self):
+        """ 
+        Store the information needed to read the rows that will be appended to the file.
+        Only delimited text files are supported.
+        """
+        self._tailOffset = None
+        if os.path.splitext(self.filename)[1].lower() not in TAIL_EXTENSIONS:
+            return
+        try:
+            size = os.path.getsize(self.filename)
+            with open(self.filename, 'rb') as f:
+                f.seek(max(size-4096,0))
+                end = f.read()
+        except OSError:
+            return
+        # Stopping at the last complete line
+        iEnd   = end.rfind(b'\n')
+        if iEnd<0:
+            return
+        iStart = end.rfind(b'\n', 0, iEnd)
+        lastLine = end[iStart+1:iEnd].decode('utf-8', errors='replace')
+        if len(lastLine.strip())==0:
+            return
+        for sep in [',', ';', '\t']:
+            if sep in lastLine:
+                self._tailSep = sep
+                break
+        else:
+            self._tailSep = r'\s+'
+        self._tailOffset = size-len(end)+iEnd+1
+        self._tailLine   = end[iStart+1:iEnd+1]
+
+    def reloadTail(self):
+        """ 
+        Incremental reload: read the rows that were appended to the file since the last read,
+        append them to the data, and update the formulas and the mask.
+        Returns the number of rows added, or None if an incremental reload is not possible
+        (a full reload is then needed).
+        """
+        if self._tailOffset is None:
+            return None
+        try:
+            size = os.path.getsize(self.filename)
+        except OSError:
+            return None
+        if size<self._tailOffset:
+            return None # The file was truncated or rewritten
+        with open(self.filename, 'rb') as f:
+            f.seek(self._tailOffset-len(self._tailLine))
+            if f.read(len(self._tailLine))!=self._tailLine:
+                return None # The file was rewritten
+            chunk = f.read(size-self._tailOffset)
+        iEnd = chunk.rfind(b'\n')
+        if iEnd<0:
+            return 0 # No complete line yet
+        from io import StringIO
+        text = chunk[:iEnd+1].decode('utf-8', errors='replace')
+        if len(text.strip())==0:
+            return 0
+        # Columns read from the file (i.e. not formulas)
+        IForm = [f['pos']-1 for f in self.formulas]
+        IFile = [i for i in range(self.nCols) if i not in IForm]
+        if not all([np.issubdtype(self._dtype(i), np.number) for i in IFile]):
+            return None
+        try:
+            df_app = pd.read_csv(StringIO(text), sep=self._tailSep, header=None, engine='python', comment='#')
+            columns = [pd.to_numeric(df_app.iloc[:,j], errors='coerce').values for j in range(df_app.shape[1])]
+        except:
+            return None
+        if len(columns)!=len(IFile):
+            return None
+        # Removing rows that were already read (if the file was growing while it was parsed)
+        x = self._column(IFile[0]).values
+        if len(x)>0 and np.all(np.diff(x[-3:])>0):
+            b = columns[0]>x[-1]
+            columns = [c[b] for c in columns]
+        nNew = len(columns[0])
+        if nNew>0:
+            # Rows appended to buffers with some margin, the table is not copied
+            self._growableStore(IFile, IForm).append(columns)
+            self._updateDerived()
+        iStart = chunk.rfind(b'\n', 0, iEnd)
+        self._tailLine    = chunk[iStart+1:iEnd+1]
+        self._tailOffset += iEnd+1
+        return nNew
+
+    def _growableStore(self, IFile, IForm):
+        """ Store to which the rows read from the file are appended (see reloadTail) """
+        if not isinstance(self._store, GrowableColumnStore):
+            names = list(self._frame.columns)
+            store = GrowableColumnStore([names[i] for i in IFile], [self._column(i).values for i in IFile], name=self._frame.columns.name)
+            for i in sorted(IForm):
+                store.insert(i, names[i], self._column(i).values)
+            self._store = store
+            self._data  = None
+        self._store.persistent = True # The store is kept while rows are appended
+        return self._store
+
+    def _updateDerived(self):
+        """ Update the formulas and the mask after rows were added """
+        self._version += 1
+        self._stale.update([id(f) for f in self.formulas]) # Recomputed when accessed
+        if len(self.maskString)>0:
+            self.applyMaskString(self.maskString, bAdd=False)
+
+    # --- Memory
+    @property
+    def nbytes(self):
+        """ Memory used by the data of the table """
+        if self._store is not None:
+            return self._store.nbytes
+        return int(self._data.memory_usage(index=False, deep=False).sum())
+
+    def evict(self, spillDir=None):
+        """ 
+        Release the memory used by the data of the table. The columns are read again from disk 
+        when they are used (e.g. by getColumn). Names, formulas and mask are kept.
+          - tables backed by the file cache: the columns read from the cache are released
+          - other tables are written to a parquet file in spillDir, if provided
+        Returns the number of bytes released
+        """
+        if self.isStreaming:
+            return 0
+        self._columnCache = {}
+        if self._store is not None and self._store.onDisk:
+            return self._store.release()
+        if spillDir is None:
+            return 0
+        nBytes = self.nbytes
+        store  = spillDataFrame(self._data if self._store is None else self._store.toDataFrame(), spillDir)
+        if store is None:
+            return 0
+        self._store = store
+        self._data  = None
+        return nBytes
+
+    # --- Shared columns
+    def _columnValues(self, i):
+        """ Array of the values of column i (starting at 0) """
+        if self._store is not None:
+            return self._store.values(i)
+        return self.data.iloc[:, i].values
+
+    def _shareableColumns(self, xOnly=False):
+        """ Indices (starting at 0) of the columns that can be shared with other tables (see TableList.shareColumns) """
+        if self._store is not None and (self._store.zeroCopy or getattr(self._store, 'persistent', False)):
+            return [] # Memory-mapped or growing columns
+        I = [0] if xOnly else range(self.nCols)
+        IShare = []
+        for i in I:
+            if i>=self.nCols:
+                break
+            if i>0 and self._store is not None and not self._store.isLoaded(i):
+                continue # Columns not read yet (lazy tables)
+            dtype = self._dtype(i)
+            if isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+                IShare.append(i)
+        return IShare
+
+    def _shareColumn(self, i, values):
+        """ Use for column i (starting at 0) values that are identical, and shared with other tables """
+        self._columnCache = {} # Releasing the previous values
+        if self._store is None:
+            # The columns are stored as separate arrays, views of the dataframe (not copied)
+            self._store = ArrayColumnStore.fromDataFrame(self._data, copy=False)
+            self._data  = None
+        self._store.share(i, values)
+
+    # --- Streaming
+    @property
+    def isStreaming(self):
+        """ True if rows of the file are still to be appended (see streaming.py) """
+        return self._store is not None and getattr(self._store, 'stream', None) is not None
+
+    def appendRows(self, M):
+        """ Append rows read by the stream (2d array of the columns of the file) """
+        self._store.append(M)
+        self._updateDerived()
+
+    def finishStream(self):
+        """ End of the streaming, the unused capacity of the buffers is released """
+        if not self.isStreaming:
+            return
+        self._store.stream.close()
+        self._store.stream     = None
+        self._store.persistent = False
+        self._store.trim()
+
+    def readStream(self, cancel=None):
+        """ Read the remaining rows of a streamed file. cancel: threading.Event """
+        try:
+            for M in self._store.stream:
+                self.appendRows(M)
+                if cancel is not None and cancel.is_set():
+                    break
+        finally:
+            self.finishStream()
 
     # --- Column manipulations
     def renameColumn(self,iCol,newName):
         self.columns[iCol]=newName
-        self.data.columns.values[iCol]=newName
+        if self._store is not None:
+            self._store.rename(iCol, newName)
+        else:
+            self.data.columns.values[iCol]=newName
 
     def deleteColumns(self,ICol):
         """ Delete columns by index, not column names which can have duplicates"""
-        IKeep =[i for i in np.arange(self.data.shape[1]) if i not in ICol]
-        self.data = self.data.iloc[:, IKeep] # Drop won't work for duplicates
+        self._version += 1
+        if self._store is not None:
+            self._store.delete(ICol)
+        else:
+            IKeep =[i for i in np.arange(self.data.shape[1]) if i not in ICol]
+            self.data = self.data.iloc[:, IKeep] # Drop won't work for duplicates
         for i in sorted(ICol, reverse=True):
             del(self.columns[i])
             for f in self.formulas:
@@ -575,17 +1720,23 @@ class Table(object):
             for f in self.formulas:
                 if f['pos'] > (i + 1):
                     f['pos'] = f['pos'] - 1
+        self._stale &= set([id(f) for f in self.formulas])
 
     def rename(self,new_name):
         self.name='>'+new_name
 
     def addColumn(self,sNewName,NewCol,i=-1,sFormula=''):
+        df = self._frame
         if i<0:
-            i=self.data.shape[1]
-        elif i>self.data.shape[1]+1:
-            i=self.data.shape[1]
-        self.data.insert(int(i),sNewName,NewCol)
-        self.columns=self.columnsFromDF(self.data)
+            i=df.shape[1]
+        elif i>df.shape[1]+1:
+            i=df.shape[1]
+        if self._store is not None:
+            self._store.insert(int(i),sNewName,NewCol)
+        else:
+            df.insert(int(i),sNewName,NewCol)
+        self._version += 1 # Positions of the columns changed
+        self.columns=self.columnsFromDF(df)
         for f in self.formulas:
             if f['pos'] > i:
                 f['pos'] = f['pos'] + 1
@@ -594,22 +1745,50 @@ class Table(object):
     def setColumn(self,sNewName,NewCol,i,sFormula=''):
         if i<1:
             raise ValueError('Cannot set column at position ' + str(i))
-        self.data = self.data.drop(columns=self.data.columns[i-1])
-        self.data.insert(int(i-1),sNewName,NewCol)
-        self.columns=self.columnsFromDF(self.data)
+        if self._store is not None:
+            self._store.set(int(i-1),sNewName,NewCol)
+        else:
+            self.data = self.data.drop(columns=self.data.columns[i-1])
+            self.data.insert(int(i-1),sNewName,NewCol)
+        self._version += 1
+        self.columns=self.columnsFromDF(self._frame)
         for f in self.formulas:
             if f['pos'] == i:
                 f['name'] = sNewName
                 f['formula'] = sFormula
+                self._stale.discard(id(f))
+        self.invalidateColumns([i-1])
         
     def getColumn(self,i):
         """ Return column of data, where i=0 is the index column
         If a mask exist, the mask is applied
 
+        The values are cached until the data or the mask change (see _version), so that redraws
+        do not copy the data. The arrays returned are read-only, views of the data when possible.
+
         TODO TODO TODO get rid of this!
         """
+        self.lastUsed = time.time()
+        entry = self._columnCache.get(i, None)
+        if entry is not None and entry[0]==self._version and entry[1] is self.mask:
+            return entry[2]
+        x,isString,isDate,c = self._getColumn(i)
+        if isinstance(x, np.ndarray):
+            x = x.view() # NOTE: the flag is set on a view, the data itself remains writeable
+            x.flags.writeable = False
+        if len(self._columnCache)>=self.columnCacheSize:
+            del self._columnCache[next(iter(self._columnCache))] # Oldest entry
+        self._columnCache[i] = (self._version, self.mask, (x,isString,isDate,c))
+        return x,isString,isDate,c
+
+    def dataModified(self):
+        """ To be called after the values of the data were modified in place: cached columns and masks are discarded """
+        self._version += 1
+
+    def _getColumn(self,i):
+        """ See getColumn """
         if i <= 0 :
-            x = np.array(range(self.data.shape[0]))
+            x = np.arange(self.nRows)
             if self.mask is not None:
                 x=x[self.mask]
 
@@ -617,14 +1796,15 @@ class Table(object):
             isString = False
             isDate   = False
         else:
+            c = self._column(i-1)
+            if isinstance(c.dtype, pd.CategoricalDtype):
+                c = c.astype(object) # Strings stored as categories (compact storage)
+            x = c.values
             if self.mask is not None:
-                c = self.data.iloc[self.mask, i-1]
-                x = self.data.iloc[self.mask, i-1].values
-            else:
-                c = self.data.iloc[:, i-1]
-                x = self.data.iloc[:, i-1].values
+                x = x[self.mask]
+                c = pd.Series(x, name=c.name, copy=False)
 
-            isString = c.dtype == np.object and isinstance(c.values[0], str)
+            isString = c.dtype == object and len(x)>0 and isinstance(x[0], str)
             if isString:
                 x=x.astype(str)
             isDate   = np.issubdtype(c.dtype, np.datetime64)
@@ -637,27 +1817,106 @@ class Table(object):
         return x,isString,isDate,c
 
 
+    # --- Formulas
     def evalFormula(self,sFormula):
-        df = self.data
-        Index = np.array(range(df.shape[0]))
-        sFormula=sFormula.replace('{Index}','Index')
-        for i,c in enumerate(self.columns):
-            c_no_unit = no_unit(c).strip()
-            c_in_df   = df.columns[i]
-            sFormula=sFormula.replace('{'+c_no_unit+'}','df[\''+c_in_df+'\']')
+        """ Evaluate a formula (see expressions.py), only the columns used are read. Returns None if the evaluation fails """
         try:
-            NewCol=eval(sFormula)
-            return NewCol
+            return compileExpression(sFormula).evaluate(self.columns, self._column, self.nRows)
         except:
             return None
 
-    def addColumnByFormula(self,sNewName,sFormula,i=-1):
+    def addColumnByFormula(self,sNewName,sFormula,i=-1,lazy=False):
+        """ 
+        Add a column computed by a formula
+        lazy: if True, the formula is only compiled and checked, its values are computed
+              the first time the column is accessed.
+        """
+        if lazy:
+            try:
+                compileExpression(sFormula).resolve(self.columns)
+            except:
+                return False
+            self._addFormulaColumn(sNewName, sFormula, i)
+            return True
         NewCol=self.evalFormula(sFormula)
         if NewCol is None:
             return False
         else:
             self.addColumn(sNewName,NewCol,i,sFormula)
             return True
+
+    def applyFormulas(self, formulas, lazy=True):
+        """ 
+        Add several formula columns, e.g. the formulas of another table
+          - formulas: list of dict with keys 'name', 'formula' and optionally 'pos' (see Table.formulas)
+          - lazy: see addColumnByFormula. Formulas may refer to each other, in any order.
+        Returns the names of the formulas that could not be added
+        """
+        formulas = sorted(formulas, key=lambda f: f.get('pos', np.inf))
+        known    = [no_unit(c).strip() for c in self.columns] + [no_unit(f['name'].replace('_',' ')).strip() for f in formulas]
+        failed   = []
+        for f in formulas:
+            try:
+                expr = compileExpression(f['formula'])
+            except:
+                expr = None
+            if expr is None or any([r not in known for r in expr.refs]):
+                failed.append(f['name'])
+                continue
+            self._addFormulaColumn(f['name'], f['formula'], f.get('pos', 0)-1)
+        if not lazy:
+            self._updateFormulas()
+        return failed
+
+    def _addFormulaColumn(self, sNewName, sFormula, i=-1):
+        """ Add a formula column, computed when accessed (placeholder values until then) """
+        self.addColumn(sNewName, np.full(self.nRows, np.nan), i, sFormula)
+        self._stale.add(id(self.formulas[-1]))
+
+    def invalidateColumns(self, I):
+        """ 
+        The values of columns I (starting at 0) changed: the formulas that depend on them,
+        directly or through other formulas, are recomputed when accessed.
+        """
+        changed  = set(I)
+        progress = True
+        while progress:
+            progress = False
+            for f in self.formulas:
+                i = f['pos']-1
+                if i in changed or id(f) in self._stale:
+                    continue
+                try:
+                    deps = compileExpression(f['formula']).resolve(self.columns)
+                except:
+                    continue # Columns used by the formula were renamed or deleted
+                if len(changed.intersection(deps))>0:
+                    self._stale.add(id(f))
+                    changed.add(i)
+                    progress = True
+
+    def _updateFormula(self, i):
+        """ Recompute the formula of column i (starting at 0) if it is stale, its inputs are updated first when read """
+        for f in self.formulas:
+            if f['pos']-1==i and id(f) in self._stale:
+                self._stale.discard(id(f)) # NOTE: before evaluating, a formula may refer to itself
+                values = self.evalFormula(f['formula'])
+                if values is None:
+                    self.formulaWarnings.append('Formula `{}` failed for table: {}'.format(f['name'], self.name))
+                elif self._store is not None:
+                    self._store.set(i, self._store.names[i], values)
+                else:
+                    # Replacing the column by position (not writing in place: its array may be shared or read-only)
+                    columns = self._data.columns
+                    self._data.columns = range(self._data.shape[1])
+                    self._data[i] = np.asarray(values)
+                    self._data.columns = columns
+                return
+
+    def _updateFormulas(self):
+        """ Recompute all the stale formulas """
+        for f in sorted(self.formulas, key=lambda f: f['pos']):
+            self._updateFormula(f['pos']-1)
     
     def setColumnByFormula(self,sNewName,sFormula,i=-1):
         NewCol=self.evalFormula(sFormula)
@@ -668,14 +1927,21 @@ class Table(object):
             return True
 
 
-    def export(self,path):
-        if isinstance(self.data, pd.DataFrame):
-            try:
-                self.data.to_csv(path,sep=',',index=False) #python3
-            except:
-                self.data.to_csv(path,sep=str(u',').encode('utf-8'),index=False) #python 2.
+    def export(self, path, fmt=None):
+        """ Export the table, fmt: 'csv', 'parquet', 'feather' or 'npz', None: given by the extension of path """
+        writeDataFrame(self.exportFrame(), path, fmt)
+
+    def exportFrame(self):
+        """ Dataframe of the table, for lazy tables the store is kept """
+        if len(self._stale)>0:
+            self._updateFormulas()
+        if self._store is not None:
+            df = self._store.toDataFrame()
         else:
+            df = self.data
+        if not isinstance(df, pd.DataFrame):
             raise NotImplementedError('Export of data that is not a dataframe')
+        return df
 
 
 
@@ -719,7 +1985,55 @@ class Table(object):
 
     @property
     def nRows(self):
-        return len(self.data.iloc[:,0]) # TODO if not panda
+        if self._store is not None:
+            return self._store.nRows
+        return len(self._data.iloc[:,0]) # TODO if not panda
+
+    # --- Data storage
+    @property
+    def data(self):
+        """ 
+        Dataframe of the table. For lazy tables, all the columns are read on first access.
+        For tables being streamed, a snapshot of the data is returned and the store is kept.
+        """
+        if len(self._stale)>0:
+            self._updateFormulas()
+        if self._store is not None:
+            if getattr(self._store, 'persistent', False):
+                return self._store.toDataFrame()
+            self._data  = self._store.toDataFrame()
+            self._store = None
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data  = data
+        self._store = None
+        self._version += 1
+
+    @property
+    def isLazy(self):
+        return self._store is not None
+
+    @property
+    def _frame(self):
+        """ Column store for lazy tables, dataframe otherwise (stale formulas are not computed) """
+        if self._store is not None:
+            return self._store
+        return self._data
+
+    def _column(self, i):
+        """ Column at position i (starting at 0) as a Series, without reading the other columns """
+        if len(self._stale)>0:
+            self._updateFormula(i)
+        if self._store is not None:
+            return self._store.column(i)
+        return self._data.iloc[:, i]
+
+    def _dtype(self, i):
+        if self._store is not None:
+            return self._store.dtype(i)
+        return self.data.dtypes.iloc[i]
 
 
 if __name__ == '__main__':
@@ -7,6 +7,9 @@ from .GUICommon import Error
 def configFilePath():
     return os.path.join(defaultUserDataDir(), 'pyDatView', 'pyDatView.json')
 
+def cacheDirPath():
+    return os.path.join(defaultUserDataDir(), 'pyDatView', 'cache')
+
 def loadAppData(mainframe):
     configFile = configFilePath()
     os.makedirs(os.path.dirname(configFile), exist_ok=True)
@@ -100,6 +103,32 @@ def defaultAppData(mainframe):
     #BOT_PANL =85
     data['plotPanel']=defaultPlotPanelData()
     data['infoPanel']=defaultInfoPanelData()
+    data['loader']=defaultLoaderData()
+    return data
+
+# --- Loader
+def defaultLoaderData():
+    data={}
+    data['nWorkers']    = 1        # Number of workers used to read files, 1: serial, None: number of cpus
+    data['parallel']    = 'thread' # Type of pool used when nWorkers>1, 'thread' or 'process'
+    data['background']  = False    # Files are loaded in a background thread, the GUI remains responsive
+    data['cache']       = False  # Store parsed files in a persistent cache for faster reload
+    data['cacheSizeMB'] = 2000   # Maximum size of the cache, least recently used files are removed
+    data['lazy']        = False  # Tables are backed by the cache, columns are only read when used
+    data['memmap']      = False  # Numeric tables are cached in memory-mapped files (larger on disk, no copy in memory)
+    data['formatCache'] = []     # Formats detected for file signatures, list of [signature, formatName]
+    data['compact']     = False  # Float columns stored in single precision and strings as categoricals
+    data['compactRtol'] = 1e-6   # Maximum relative error allowed when converting to single precision
+    data['typeSampleSize'] = 100 # Number of rows used to infer the type of text columns (0: all rows)
+    data['incrementalReload'] = False # On reload, only read the rows appended to text files
+    data['follow']         = False # Automatically reload files modified on disk
+    data['followInterval'] = 1000  # Time between two checks of the files, in ms
+    data['followDebounce'] = 1     # Number of checks during which a modified file needs to remain unchanged
+    data['stream']          = False  # Stream large delimited files: preview after the first rows, rest read in the background
+    data['streamSizeMB']    = 200    # Files larger than this are streamed
+    data['streamChunkRows'] = 200000 # Number of rows parsed at once when streaming
+    data['shareColumns']    = False  # Columns identical between tables (e.g. time) are stored once
+    data['memoryBudgetMB']  = 0      # Memory for the data of the tables, least recently used tables are evicted (0: no limit)
     return data
 
 # --- Plot Panel
@@ -0,0 +1,514 @@
+"""
+Column stores: lazy storage of the data of a table
+
+A column store knows the column names and the number of rows of a table up front, but a
+column is only read (or decoded) the first time it is accessed, and is then kept in memory.
+Columns can be added, replaced, renamed or deleted without reading the other columns.
+
+A column store behaves like a minimal read-only dataframe (`columns`, `shape`, `len`,
+`store[name]`), and can be converted to a dataframe with `toDataFrame`.
+
+Backends:
+ - DataFrameColumnStore: columns of a dataframe in memory
+ - ParquetColumnStore  : columns read one at a time from a parquet file
+ - MemmapColumnStore   : columns are views of a memory-mapped binary file (no copy)
+ - GrowableColumnStore : columns in preallocated buffers, rows are appended (streaming)
+ - ArrayColumnStore    : columns held as separate arrays, which can be shared between tables
+ - DerivedColumnStore  : rows of the columns of another table (e.g. masked), copied only when used
+"""
+import hashlib
+import numpy as np
+import pandas as pd
+
+
+class ColumnStore(object):
+    """
+    Base class, columns are provided by the method `_read` of the subclasses.
+    Each column has a source: either the key used to read the column, or an array
+    (for columns that are added or modified in memory).
+    """
+    zeroCopy = False # True if the columns are views of the underlying storage
+    onDisk   = False # True if the columns can be read again from disk after being released
+
+    def __init__(self, names, nRows, keys=None, name=None):
+        self.names   = list(names)
+        self._nRows  = nRows
+        self._sources= list(keys) if keys is not None else list(names)
+        self._keyInfo= dict([(k, (i, n)) for i, (k, n) in enumerate(zip(self._sources, self.names))])
+        self._cache  = {} # key -> values read
+        self.name    = name # Equivalent of dataframe.columns.name
+        self.transform = None # function(i, name, values) applied to the columns read, i and name are the original position and name
+
+    # --- Method to be implemented by subclasses
+    def _read(self, key):
+        raise NotImplementedError()
+
+    def _dtype(self, key):
+        return self._values(key).dtype
+
+    # --- Access
+    def _values(self, key):
+        if key not in self._cache:
+            values = self._read(key)
+            if self.transform is not None:
+                i, name = self._keyInfo[key]
+                values = self.transform(i, name, values)
+            self._cache[key] = values
+        return self._cache[key]
+
+    @staticmethod
+    def _inMemory(src):
+        return not isinstance(src, (str, int, np.integer))
+
+    @staticmethod
+    def _asColumn(values):
+        if isinstance(values, pd.Series):
+            values = values.values
+        if isinstance(values, pd.Categorical):
+            return values
+        return np.asarray(values)
+
+    def values(self, i):
+        """ Values of the column at position i """
+        src = self._sources[i]
+        if self._inMemory(src):
+            return src
+        return self._values(src)
+
+    def column(self, i):
+        """ Column at position i, as a pandas Series """
+        return pd.Series(self.values(i), name=self.names[i], copy=False)
+
+    def dtype(self, i):
+        """ dtype of a column, without reading it when possible """
+        src = self._sources[i]
+        if self._inMemory(src):
+            return src.dtype
+        if src in self._cache:
+            return self._cache[src].dtype
+        return self._dtype(src)
+
+    def isLoaded(self, i):
+        src = self._sources[i]
+        return self._inMemory(src) or src in self._cache
+
+    def __getitem__(self, name):
+        return self.column(self.names.index(name))
+
+    def __len__(self):
+        return self._nRows
+
+    @property
+    def nRows(self):
+        return self._nRows
+
+    @property
+    def columns(self):
+        return pd.Index(self.names, name=self.name)
+
+    @property
+    def shape(self):
+        return (self._nRows, len(self.names))
+
+    # --- Manipulation
+    def insert(self, i, name, values):
+        values = self._asColumn(values)
+        if len(values)!=self._nRows:
+            raise ValueError('Length of values does not match the number of rows')
+        self.names.insert(i, name)
+        self._sources.insert(i, values)
+
+    def set(self, i, name, values):
+        values = self._asColumn(values)
+        if len(values)!=self._nRows:
+            raise ValueError('Length of values does not match the number of rows')
+        self.names[i]    = name
+        self._sources[i] = values
+
+    def rename(self, i, name):
+        self.names[i] = name
+
+    def share(self, i, values):
+        """ Replace the values of column i by identical values shared with other stores (see sameValues) """
+        src = self._sources[i]
+        if self._inMemory(src):
+            self._sources[i] = values
+        elif src in self._cache:
+            self._cache[src] = values
+
+    def delete(self, I):
+        IKeep = [i for i in range(len(self.names)) if i not in I]
+        self.names    = [self.names[i] for i in IKeep]
+        self._sources = [self._sources[i] for i in IKeep]
+        # Free memory of columns that are no longer used
+        keys = set([s for s in self._sources if not self._inMemory(s)])
+        for k in list(self._cache.keys()):
+            if k not in keys:
+                del self._cache[k]
+
+    def toDataFrame(self):
+        """ Read all the columns and return a dataframe """
+        if len(self.names)==0:
+            df = pd.DataFrame(index=pd.RangeIndex(self._nRows))
+        else:
+            df = pd.concat([self.column(i) for i in range(len(self.names))], axis=1)
+            df.columns = self.names # concat may alter duplicated names
+        df.columns.name = self.name
+        return df
+
+    def memoryArrays(self):
+        """ Arrays held in memory by the store (columns loaded, added or modified) """
+        return list(self._cache.values()) + [s for s in self._sources if self._inMemory(s)]
+
+    @property
+    def nbytes(self):
+        """ Memory used by the columns loaded """
+        return sum([a.nbytes for a in self.memoryArrays()])
+
+    def release(self):
+        """ 
+        Free the memory of the columns read, they are read again when accessed.
+        Columns added or modified in memory are kept. Returns the number of bytes released.
+        """
+        if not self.onDisk:
+            return 0
+        n = sum([v.nbytes for v in self._cache.values()])
+        self._cache = {}
+        return n
+
+    def __repr__(self):
+        s='<{} object>:\n'.format(type(self).__name__)
+        s+=' - name   : {}\n'.format(self.name)
+        s+=' - shape  : {}x{}\n'.format(*self.shape)
+        s+=' - loaded : {}/{} columns\n'.format(sum([self.isLoaded(i) for i in range(len(self.names))]), len(self.names))
+        return s
+
+
+class DataFrameColumnStore(ColumnStore):
+    """ Column store on top of a dataframe, mostly used for tests """
+    def __init__(self, df):
+        ColumnStore.__init__(self, [str(c) for c in df.columns], len(df), keys=range(df.shape[1]), name=df.columns.name)
+        self._df = df
+
+    def _read(self, key):
+        return self._df.iloc[:, key].values
+
+    def _dtype(self, key):
+        return self._df.dtypes.iloc[key]
+
+
+class ParquetColumnStore(ColumnStore):
+    """ Column store reading the columns of a parquet file one at a time """
+    onDisk = True
+
+    def __init__(self, filename, name=None):
+        import pyarrow.parquet as pq
+        self.filename = filename
+        pf = pq.ParquetFile(filename)
+        self._schema = pf.schema_arrow
+        names = [n for n in self._schema.names if not n.startswith('__index_level_')]
+        ColumnStore.__init__(self, names, pf.metadata.num_rows, name=name)
+
+    def _read(self, key):
+        import pyarrow.parquet as pq
+        return pq.read_table(self.filename, columns=[key]).column(0).to_pandas().values
+
+    def _dtype(self, key):
+        try:
+            return np.dtype(self._schema.field(key).type.to_pandas_dtype())
+        except:
+            return np.dtype(object)
+
+
+class MemmapColumnStore(ColumnStore):
+    """ 
+    Column store where each column is a view of a memory-mapped .npy file, stored in
+    Fortran order so that each column is contiguous on disk. 
+    The file is mapped in copy-on-write mode: the file is never modified.
+    """
+    zeroCopy = True
+    onDisk   = True
+
+    def __init__(self, filename, names, name=None):
+        self.filename = filename
+        self._array = np.load(filename, mmap_mode='c')
+        if self._array.ndim!=2 or self._array.shape[1]!=len(names):
+            raise Exception('Error: the shape of the memory-mapped file does not match the number of columns')
+        ColumnStore.__init__(self, names, self._array.shape[0], keys=range(len(names)), name=name)
+
+    def _read(self, key):
+        return self._array[:, key]
+
+    def _dtype(self, key):
+        return self._array.dtype
+
+    def memoryArrays(self):
+        """ Columns modified or added in memory (mapped columns are not counted) """
+        return [s for s in self._sources if self._inMemory(s)]
+
+    def release(self):
+        self._cache = {}
+        return 0 # Mapped pages are managed by the operating system
+
+
+class GrowableColumnStore(ColumnStore):
+    """
+    Column store where each column is a preallocated numeric buffer, to which rows are appended
+    (e.g. when a file is streamed). The columns returned are views of the filled part of the buffers.
+    When the capacity is exceeded, the buffers are reallocated one at a time with some margin,
+    so that the memory used is bounded by about the size of the data plus one column.
+    Columns added in memory are padded with NaN when rows are appended, they are then moved to
+    buffers with the same capacity as the other columns.
+    """
+    zeroCopy = True
+
+    def __init__(self, names, values, capacity=None, name=None, growth=1.5):
+        """ 
+        values: 2d array of floats, or list of numeric columns (their dtype is kept)
+        """
+        columns = self._columnsOf(values, len(names))
+        nRows = len(columns[0]) if len(columns)>0 else 0
+        capacity = max(nRows, capacity if capacity is not None else 0)
+        self.growth   = growth
+        self._buffers = []
+        self._extra   = {} # Buffers of the columns added in memory, id: buffer (see _grow)
+        for c in columns:
+            buf = np.empty(capacity, dtype=c.dtype if c.dtype.kind in 'iuf' else float)
+            buf[:nRows] = c
+            self._buffers.append(buf)
+        ColumnStore.__init__(self, names, nRows, keys=range(len(names)), name=name)
+        self.persistent = True # The store should be kept (not replaced by a dataframe) while rows are appended
+        self.stream     = None # Source of the rows still to be appended
+
+    @staticmethod
+    def _columnsOf(values, nCols):
+        """ List of columns from a 2d array (converted to floats) or a list of columns """
+        if isinstance(values, (list, tuple)):
+            columns = [np.asarray(v) for v in values]
+        else:
+            values = np.asarray(values, dtype=float)
+            if values.ndim!=2:
+                raise Exception('Error: the values need to be a 2d array')
+            columns = [values[:,j] for j in range(values.shape[1])]
+        if len(columns)!=nCols or len(set([len(c) for c in columns]))>1:
+            raise Exception('Error: the shape of the values does not match the number of columns')
+        return columns
+
+    def _read(self, key):
+        return self._buffers[key][:self._nRows]
+
+    def _dtype(self, key):
+        return self._buffers[key].dtype
+
+    def _values(self, key):
+        # Views are not cached since the number of rows changes
+        return self._read(key)
+
+    def isLoaded(self, i):
+        return True
+
+    @property
+    def capacity(self):
+        if len(self._buffers)==0:
+            return self._nRows
+        return len(self._buffers[0])
+
+    def append(self, values):
+        """ 
+        Append rows, values: 2d array or list of columns, with the original columns of the store.
+        Integer columns are converted to float if the values appended are not integers.
+        """
+        columns = self._columnsOf(values, len(self._buffers))
+        n0, nNew = self._nRows, len(columns[0]) if len(columns)>0 else 0
+        n1 = n0 + nNew
+        if n1>self.capacity:
+            capacity = max(n1, int(self.capacity*self.growth))
+            for j, buf in enumerate(self._buffers):
+                newBuf = np.empty(capacity, dtype=buf.dtype)
+                newBuf[:n0] = buf[:n0]
+                self._buffers[j] = newBuf
+                del buf
+        for j, c in enumerate(columns):
+            buf = self._buffers[j]
+            if buf.dtype.kind in 'iu' and c.dtype.kind not in 'iub':
+                if not np.all(np.isfinite(c)) or np.any(c!=np.round(c)):
+                    buf = buf.astype(float)
+                    self._buffers[j] = buf
+            buf[n0:n1] = c
+        for i, src in enumerate(self._sources):
+            if self._inMemory(src):
+                self._sources[i] = self._grow(src, n0, n1)
+        self._extra = dict([(k, b) for k, b in self._extra.items() if any([self._owned(s) is b for s in self._sources])])
+        self._nRows = n1
+
+    def _owned(self, src):
+        """ Buffer of a column added in memory, None if the column is not a view of a buffer of the store """
+        base = getattr(src, 'base', None)
+        if base is not None and self._extra.get(id(base), None) is base:
+            return base
+        return None
+
+    def _grow(self, src, n0, n1):
+        """ Pad a column added in memory to n1 rows (NaN or None), in a buffer reallocated with some margin """
+        buf = self._owned(src)
+        if buf is None or len(buf)<n1:
+            if isinstance(src, np.ndarray) and np.issubdtype(src.dtype, np.number):
+                dtype, fill = np.result_type(src.dtype, float), np.nan
+            else:
+                dtype, fill = object, None
+            newBuf = np.empty(max(n1, self.capacity), dtype=dtype)
+            newBuf[:n0] = np.asarray(src)[:n0]
+            if buf is not None:
+                del self._extra[id(buf)]
+            buf = newBuf
+            self._extra[id(buf)] = buf
+        else:
+            fill = np.nan if buf.dtype!=object else None
+        buf[n0:n1] = fill
+        return buf[:n1]
+
+    def trim(self):
+        """ Release the unused capacity of the buffers """
+        for j, buf in enumerate(self._buffers):
+            if len(buf)>self._nRows:
+                self._buffers[j] = buf[:self._nRows].copy()
+        for i, src in enumerate(self._sources):
+            if self._owned(src) is not None:
+                self._sources[i] = src.copy()
+        self._extra = {}
+
+    def memoryArrays(self):
+        """ Buffers (allocated capacity) and columns added in memory """
+        return self._buffers + list(self._extra.values()) + [s for s in self._sources if self._inMemory(s) and self._owned(s) is None]
+
+
+class ArrayColumnStore(ColumnStore):
+    """ 
+    Column store where each column is a separate array in memory (instead of a block of a dataframe), 
+    so that identical columns can be shared between tables (see TableList.shareColumns).
+    """
+    def __init__(self, names, arrays, name=None):
+        ColumnStore.__init__(self, names, len(arrays[0]) if len(arrays)>0 else 0, keys=range(len(names)), name=name)
+        self._sources = [self._asColumn(a) for a in arrays]
+
+    @classmethod
+    def fromDataFrame(cls, df, copy=True):
+        """ 
+        copy: if True, the columns are copied, so that the memory of the dataframe can be released.
+              Otherwise the columns are views of the dataframe, no memory is allocated.
+        """
+        arrays = [df.iloc[:,i].values for i in range(df.shape[1])]
+        if copy:
+            arrays = [a.copy() for a in arrays]
+        return cls([str(c) for c in df.columns], arrays, name=df.columns.name)
+
+
+class DerivedColumnStore(ColumnStore):
+    """ 
+    Column store of a table derived from another table by selecting rows (e.g. masked table).
+    The columns of the parent (dataframe or column store) are referenced, a column is only
+    copied when it is accessed, and the reference to the parent column is then dropped.
+    Rows selected with a slice (or all the rows) are views of the columns of the parent (no copy).
+    The parent columns are assumed not to be modified in place (columns are replaced instead).
+    """
+    def __init__(self, parent, rows=None, name=None):
+        """ 
+        parent: dataframe or column store
+        rows  : None (all rows), slice, boolean mask or array of indices
+        """
+        if isinstance(parent, ColumnStore):
+            names   = list(parent.names)
+            sources = list(parent._sources)
+            self._parent = parent
+        else:
+            names   = [str(c) for c in parent.columns]
+            sources = [self._asColumn(parent.iloc[:,i]) for i in range(parent.shape[1])]
+            self._parent = None
+        self._nParent = len(parent) # NOTE: rows may be appended to the parent (streaming)
+        if rows is None:
+            nRows = self._nParent
+        elif isinstance(rows, slice):
+            nRows = len(range(self._nParent)[rows])
+        else:
+            rows  = np.asarray(rows)
+            nRows = int(np.sum(rows)) if rows.dtype==bool else len(rows)
+        self._rows = rows
+        self._parentSources = sources
+        ColumnStore.__init__(self, names, nRows, keys=range(len(names)), name=name)
+        self.zeroCopy = rows is None or isinstance(rows, slice)
+
+    def _parentValues(self, key):
+        src = self._parentSources[key]
+        if not self._inMemory(src):
+            src = self._parent._values(src)
+        return src[:self._nParent]
+
+    def _read(self, key):
+        values = self._parentValues(key)
+        if self._rows is not None:
+            values = values[self._rows]
+        return values
+
+    def _dtype(self, key):
+        src = self._parentSources[key]
+        if not self._inMemory(src):
+            if src in self._parent._cache:
+                return self._parent._cache[src].dtype
+            return self._parent._dtype(src)
+        return src.dtype
+
+    def _values(self, key):
+        values = ColumnStore._values(self, key)
+        self._parentSources[key] = None # The memory of the parent column is no longer referenced
+        return values
+
+
+def columnSignature(values, nSamples=64):
+    """ 
+    Hash of the dtype, length and of a sample of the values of a column, used to find identical 
+    columns without hashing all the values. Identical columns have the same signature, the
+    values need to be compared to confirm (see sameValues).
+    """
+    n = len(values)
+    I = np.unique(np.linspace(0, n-1, min(n, nSamples)).astype(int))
+    h = hashlib.sha1('{}|{}|'.format(values.dtype.str, n).encode('utf-8'))
+    h.update(np.ascontiguousarray(values[I]).tobytes())
+    return h.hexdigest()
+
+
+def sameValues(a, b):
+    """ True if two numeric arrays are bitwise identical """
+    if a is b:
+        return True
+    if a.dtype!=b.dtype or a.shape!=b.shape:
+        return False
+    return np.array_equal(np.ascontiguousarray(a).view(np.uint8), np.ascontiguousarray(b).view(np.uint8))
+
+
+def memmapAvailable(df):
+    """ 
+    True if the columns of a dataframe can be stored in a single memory-mapped array:
+    numeric columns, all with the same dtype (no upcast, e.g. of large integers to float)
+    """
+    if df.shape[1]==0:
+        return False
+    dt = df.dtypes.iloc[0]
+    if not (np.issubdtype(dt, np.number) and not np.issubdtype(dt, np.complexfloating)):
+        return False
+    return all([t==dt for t in df.dtypes])
+
+
+def writeMemmap(filename, df):
+    """ 
+    Write the columns of a numeric dataframe to a .npy file in Fortran order (column-contiguous)
+    The columns are copied one at a time, no temporary copy of the full data is made.
+    The columns need to have the same dtype (see memmapAvailable).
+    """
+    if not memmapAvailable(df):
+        raise Exception('Error: only dataframes with numeric columns of the same type can be memory-mapped')
+    dtype = df.dtypes.iloc[0]
+    M = np.lib.format.open_memmap(filename, mode='w+', dtype=dtype, shape=df.shape, fortran_order=True)
+    for i in range(df.shape[1]):
+        M[:, i] = df.iloc[:, i].values
+    M.flush()
+    del M
@@ -0,0 +1,234 @@
+"""
+Export of tables to csv and binary files
+
+The binary formats (parquet, feather and npz) are much faster to write and to read than csv,
+and keep the column types. They are typically used to store derived tables (masked, filtered,
+binned, etc.) and reopen them quickly. The files written are read back by pyDatView with the
+readers defined at the end of this module (see EXPORT_FILE_FORMATS). Parquet and feather files
+are marked with a metadata key, so that only the files written by pyDatView are claimed by these
+readers (see isExportFile), other files are read by weio.
+
+Several tables can be written to one directory (one file per table) or to a single npz file,
+where the columns of each table are stored as separate arrays:
+   __tables__          : names of the tables
+   <i>/__columns__     : names of the columns of table i
+   <i>/<j>             : values of column j of table i
+"""
+import os
+import re
+import numpy as np
+import pandas as pd
+
+# Export formats and their extensions
+EXPORT_FORMATS = {'csv':'.csv', 'parquet':'.parquet', 'feather':'.feather', 'npz':'.npz'}
+# Formats that can store several tables in one file
+MULTI_FORMATS  = ['npz']
+# Key of the schema metadata of the parquet and feather files written by pyDatView
+EXPORT_METADATA_KEY = b'pydatview'
+
+
+class ExportFormatError(Exception):
+    """ A file could not be read by the readers of the files written by pyDatView """
+    pass
+
+
+def exportFormat(path, fmt=None):
+    """ Export format given explicitly or by the extension of the path (default: csv) """
+    if fmt is None:
+        ext = os.path.splitext(path)[1].lower()
+        fmt = dict([(v,k) for k,v in EXPORT_FORMATS.items()]).get(ext, 'csv')
+    fmt = fmt.lower()
+    if fmt not in EXPORT_FORMATS:
+        raise Exception('Error: export format unknown: `{}`, supported formats: {}'.format(fmt, ', '.join(EXPORT_FORMATS.keys())))
+    return fmt
+
+
+def safeFilename(name):
+    """ Name that can be used as a filename """
+    name = re.sub(r'[\\/:*?"<>|\s]+', '_', str(name)).strip('_.')
+    return name if len(name)>0 else 'table'
+
+
+def uniqueNames(names):
+    """ Make names unique by appending a counter to duplicates """
+    out  = []
+    seen = set()
+    for n in names:
+        new, k = n, 1
+        while new in seen:
+            new = '{}_{}'.format(n, k)
+            k += 1
+        seen.add(new)
+        out.append(new)
+    return out
+
+
+def _arrowTable(df):
+    """ Arrow table of a dataframe, with the metadata marking the files written by pyDatView """
+    import pyarrow as pa
+    table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+    meta  = dict(table.schema.metadata or {})
+    meta[EXPORT_METADATA_KEY] = b'1'
+    return table.replace_schema_metadata(meta)
+
+
+def _npzArray(values):
+    """ Array that can be stored in a npz file without pickling """
+    values = np.asarray(values)
+    if values.dtype.kind=='O':
+        values = values.astype(str)
+    return values
+
+
+# --------------------------------------------------------------------------------}
+# --- Writers
+# --------------------------------------------------------------------------------{
+def writeDataFrame(df, path, fmt=None):
+    """ Write a dataframe to a file, fmt: see exportFormat """
+    fmt = exportFormat(path, fmt)
+    if fmt=='csv':
+        df.to_csv(path, sep=',', index=False)
+    elif fmt=='parquet':
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(_arrowTable(df), path)
+    elif fmt=='feather':
+        import pyarrow.feather
+        pyarrow.feather.write_feather(_arrowTable(df), path)
+    elif fmt=='npz':
+        writeNPZ({df.columns.name if df.columns.name is not None else '': df}, path)
+
+
+def writeNPZ(dfs, path):
+    """ Write one or several dataframes to a npz file, dfs: dict of dataframes (see module header) """
+    names  = uniqueNames([str(k) for k in dfs.keys()])
+    arrays = {'__tables__': np.array(names, dtype=str)}
+    for i, df in enumerate(dfs.values()):
+        arrays['{}/__columns__'.format(i)] = np.array([str(c) for c in df.columns], dtype=str)
+        for j in range(df.shape[1]):
+            arrays['{}/{}'.format(i,j)] = _npzArray(df.iloc[:,j].values)
+    with open(path, 'wb') as f: # NOTE: a file object, np.savez would append .npz to the filename
+        np.savez(f, **arrays)
+
+
+def writeDataFrames(dfs, path, fmt='parquet', nWorkers=None, imap=None):
+    """
+    Write several dataframes, either in one npz file or in a directory with one file per dataframe
+      - dfs: dict of dataframes, the keys are used as table names and filenames
+      - path: npz file (fmt='npz' and path ending with .npz), otherwise a directory
+      - imap: function(func, argsList, nWorkers) used to write the files concurrently
+    returns: list of files written
+    """
+    fmt = exportFormat(path, fmt)
+    if fmt in MULTI_FORMATS and path.lower().endswith(EXPORT_FORMATS[fmt]):
+        writeNPZ(dfs, path)
+        return [path]
+    os.makedirs(path, exist_ok=True)
+    names = uniqueNames([safeFilename(k) for k in dfs.keys()])
+    argsList = [(df, os.path.join(path, n+EXPORT_FORMATS[fmt]), fmt) for n,df in zip(names, dfs.values())]
+    if imap is None:
+        results = [_writeTuple(args) for args in argsList]
+    else:
+        results = list(imap(_writeTuple, argsList, nWorkers))
+    return results
+
+
+def _writeTuple(args):
+    writeDataFrame(*args)
+    return args[1]
+
+
+# --------------------------------------------------------------------------------}
+# --- Readers
+# --------------------------------------------------------------------------------{
+def readNPZ(filename):
+    """ Read a npz file written by writeNPZ, returns a dataframe, or a dict of dataframes if there are several tables """
+    dfs = {}
+    with np.load(filename, allow_pickle=False) as data:
+        if '__tables__' not in data.files:
+            raise ExportFormatError('The npz file was not written by pyDatView: {}'.format(filename))
+        for i, name in enumerate(data['__tables__']):
+            columns = [str(c) for c in data['{}/__columns__'.format(i)]]
+            df = pd.DataFrame(dict([(j, data['{}/{}'.format(i,j)]) for j in range(len(columns))]))
+            df.columns = columns
+            df.columns.name = str(name) if len(name)>0 else None
+            dfs[str(name)] = df
+    if len(dfs)==1:
+        return list(dfs.values())[0]
+    return dfs
+
+
+class ExportFile(object):
+    """ Minimal file class with the interface of the weio files (constructor and toDataFrame) """
+    def __init__(self, filename=None):
+        self.filename = filename
+
+    def toDataFrame(self):
+        ext = os.path.splitext(self.filename)[1].lower()
+        try:
+            if ext=='.npz':
+                return readNPZ(self.filename)
+            elif ext=='.feather':
+                return pd.read_feather(self.filename)
+            elif ext=='.parquet':
+                return pd.read_parquet(self.filename)
+        except ExportFormatError:
+            raise
+        except Exception as e:
+            raise ExportFormatError('{}: {}'.format(type(e).__name__, e))
+        raise ExportFormatError('Extension not supported: {}'.format(ext))
+
+
+class ExportFileFormat(object):
+    """ File format with the interface of the weio file formats """
+    def __init__(self, name, extensions):
+        self.constructor = ExportFile
+        self.name        = name
+        self.extensions  = extensions
+        self.isValid     = True
+
+    def __repr__(self):
+        return 'FileFormat object: {} ({})'.format(self.name, self.extensions[0])
+
+
+EXPORT_FILE_FORMATS = [
+    ExportFileFormat('pyDatView npz file'    , ['.npz']),
+    ExportFileFormat('pyDatView feather file', ['.feather']),
+    ExportFileFormat('pyDatView parquet file', ['.parquet']),
+    ]
+
+
+def isExportFile(filename):
+    """ 
+    True if the file was written by pyDatView: npz file with a list of tables, or parquet and 
+    feather file with the pyDatView metadata. Only the header or the schema of the file is read.
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    try:
+        if ext=='.npz':
+            with np.load(filename, allow_pickle=False) as data:
+                return '__tables__' in data.files
+        elif ext=='.parquet':
+            import pyarrow.parquet
+            meta = pyarrow.parquet.read_schema(filename).metadata
+        elif ext=='.feather':
+            import pyarrow.ipc
+            with open(filename, 'rb') as f:
+                meta = pyarrow.ipc.open_file(f).schema.metadata
+        else:
+            return False
+    except Exception:
+        return False
+    return meta is not None and EXPORT_METADATA_KEY in meta
+
+
+def exportFileFormat(filename=None, name=None):
+    """ 
+    File format of a file written by pyDatView (see isExportFile), or of a format name. 
+    Returns None if not found, other files are detected by weio.
+    """
+    for ff in EXPORT_FILE_FORMATS:
+        if name is not None and ff.name==name:
+            return ff
+        if filename is not None and os.path.splitext(filename)[1].lower() in ff.extensions:
+            return ff if isExportFile(filename) else None
+    return None
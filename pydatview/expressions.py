@@ -0,0 +1,156 @@
+"""
+Compiled expressions on the columns of a table (e.g. masks)
+
+An expression such as "({Time}>100) & ({WS}==5)" is parsed once into a python AST, where the
+column references {name} are replaced by variables. The AST is compiled to a code object that is
+evaluated with numpy arrays, or with numexpr when it is installed and supports the expression.
+The references are resolved to column indices once per list of column names, so that the same
+compiled expression can be evaluated on many tables without rewriting any string, and only the
+columns used are read.
+
+Compared to a plain python eval, the following is supported:
+   - `and`, `or`, `not`, `&&`, `||` are applied elementwise
+   - chained comparisons, e.g. "0 < {Time} < 100"
+   - {Index}: index of the rows
+"""
+import ast
+import re
+import numpy as np
+import pandas as pd
+try:
+    from .common import no_unit
+except:
+    from common import no_unit
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+REF_PATTERN = re.compile(r'\{([^{}]+)\}')
+INDEX_NAME  = '__index'
+
+# Functions supported by numexpr, that can be called directly in expressions
+NUMEXPR_FUNCS = ['sin', 'cos', 'tan', 'arcsin', 'arccos', 'arctan', 'arctan2', 'sinh', 'cosh', 'tanh',
+                 'sqrt', 'exp', 'log', 'log10', 'abs', 'where']
+
+
+class ElementwiseTransformer(ast.NodeTransformer):
+    """ Replace boolean operators and chained comparisons by elementwise operations """
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        expr = node.values[0]
+        for v in node.values[1:]:
+            expr = ast.BinOp(left=expr, op=op, right=v)
+        return expr
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(op=ast.Invert(), operand=node.operand)
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        if len(node.ops)==1:
+            return node
+        lefts = [node.left]+node.comparators[:-1]
+        comps = [ast.Compare(left=l, ops=[op], comparators=[r]) for l,op,r in zip(lefts, node.ops, node.comparators)]
+        expr = comps[0]
+        for c in comps[1:]:
+            expr = ast.BinOp(left=expr, op=ast.BitAnd(), right=c)
+        return expr
+
+
+def _numexprSupported(tree):
+    """ True if the expression only contains operations supported by numexpr """
+    allowed = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Name, ast.Load,
+               ast.operator, ast.unaryop, ast.cmpop, ast.Call)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float, bool)):
+                return False
+        elif isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in NUMEXPR_FUNCS or len(node.keywords)>0:
+                return False
+        elif isinstance(node, (ast.Pow, ast.FloorDiv, ast.MatMult)) or not isinstance(node, allowed):
+            return False
+    return True
+
+
+class Expression(object):
+    """
+    Expression on the columns of a table, parsed and compiled once.
+       - refs: names of the columns referenced (as written in the expression, without braces)
+    """
+    def __init__(self, string):
+        self.string = string
+        # --- Column references replaced by variables
+        self.refs = []
+        def replace(m):
+            ref = m.group(1).strip()
+            if ref=='Index':
+                return INDEX_NAME
+            if ref not in self.refs:
+                self.refs.append(ref)
+            return '__c{}'.format(self.refs.index(ref))
+        s = REF_PATTERN.sub(replace, string)
+        # NOTE: replaced by boolean operators (not & and |) for their precedence, see ElementwiseTransformer
+        s = s.replace('&&', ' and ').replace('||', ' or ')
+        try:
+            tree = ast.parse(s.strip(), mode='eval')
+        except SyntaxError as e:
+            raise Exception('Error: invalid expression `{}`: {}'.format(string, e.msg))
+        tree = ast.fix_missing_locations(ElementwiseTransformer().visit(tree))
+        self.code = compile(tree, '<expression>', 'eval')
+        self.nexpr = None # expression evaluated by numexpr
+        if numexpr is not None and hasattr(ast, 'unparse') and _numexprSupported(tree):
+            self.nexpr = ast.unparse(tree)
+        self._indices = {}
+
+    def resolve(self, columns):
+        """ Indices of the columns referenced, for a list of column names (see Table.columns) """
+        key = tuple(columns)
+        if key not in self._indices:
+            names = [no_unit(c).strip() for c in columns]
+            I = []
+            for ref in self.refs:
+                if ref not in names:
+                    raise Exception('Error: column `{}` not found'.format(ref))
+                I.append(names.index(ref))
+            self._indices[key] = I
+        return self._indices[key]
+
+    def evaluate(self, columns, getColumn, nRows):
+        """
+        Evaluate the expression
+          - columns: names of the columns (see resolve)
+          - getColumn: function(i) returning the values of column i (numpy array or series)
+          - nRows: number of rows, used for {Index}
+        """
+        I = self.resolve(columns)
+        env = dict([('__c{}'.format(k), getColumn(i)) for k,i in enumerate(I)])
+        if INDEX_NAME in self.code.co_names:
+            env[INDEX_NAME] = np.arange(nRows)
+        if self.nexpr is not None:
+            arrays = dict([(k, v.values if isinstance(v, pd.Series) else v) for k,v in env.items()])
+            if all([isinstance(v, np.ndarray) and v.dtype.kind in 'biuf' for v in arrays.values()]):
+                try:
+                    return numexpr.evaluate(self.nexpr, local_dict=arrays)
+                except Exception:
+                    pass # Evaluated with numpy
+        env['np'] = np
+        env['pd'] = pd
+        return eval(self.code, {'__builtins__':__builtins__}, env)
+
+
+_EXPRESSIONS = {}
+def compileExpression(string, cacheSize=256):
+    """ Compiled expression, expressions are compiled once and kept in a cache """
+    expr = _EXPRESSIONS.get(string, None)
+    if expr is None:
+        if len(_EXPRESSIONS)>=cacheSize:
+            _EXPRESSIONS.clear()
+        expr = Expression(string)
+        _EXPRESSIONS[string] = expr
+    return expr
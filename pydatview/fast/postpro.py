@@ -1207,20 +1207,10 @@ def radialInterpTS(df, r, varName, r_ref, blade=1, bldFmt='AB{:d}', ndFmt='N{:03
 
 def bin_mean_DF(df, xbins, colBin ):
     """ 
-    Perform bin averaging of a dataframe
+    Perform bin averaging of a dataframe (see tools.stats.bin_DF)
     """
-    if colBin not in df.columns.values:
-        raise Exception('The column `{}` does not appear to be in the dataframe'.format(colBin))
-    xmid      = (xbins[:-1]+xbins[1:])/2
-    df['Bin'] = pd.cut(df[colBin], bins=xbins, labels=xmid ) # Adding a column that has bin attribute
-    df2       = df.groupby('Bin').mean()                     # Average by bin
-    # also counting
-    df['Counts'] = 1
-    dfCount=df[['Counts','Bin']].groupby('Bin').sum()
-    df2['Counts'] = dfCount['Counts']
-    # Just in case some bins are missing (will be nan)
-    df2       = df2.reindex(xmid)
-    return df2
+    from pydatview.tools.stats import bin_DF
+    return bin_DF(df, xbins, colBin, stats='mean')
 
 def azimuthal_average_DF(df, psiBin=None, colPsi='Azimuth_[deg]', tStart=None, colTime='Time_[s]'):
     """ 
@@ -1233,7 +1223,7 @@ def azimuthal_average_DF(df, psiBin=None, colPsi='Azimuth_[deg]', tStart=None, c
     if tStart is not None:
         if colTime not in df.columns.values:
             raise Exception('The column `{}` does not appear to be in the dataframe'.format(colTime))
-        df=df[ df[colTime]>tStart].copy()
+        df=df[ df[colTime]>tStart]
 
     dfPsi= bin_mean_DF(df, psiBin, colPsi)
     if np.any(dfPsi['Counts']<1):
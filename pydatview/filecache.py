@@ -0,0 +1,240 @@
+"""
+Persistent cache of parsed files
+
+The dataframes returned by the file readers are stored in parquet format in a cache directory.
+An entry is identified by the absolute path, size, modification time and file format of the
+file, so that an entry is automatically invalidated when the file changes on disk.
+With the memmap option, numeric dataframes are instead stored as .npy files (column-contiguous)
+that can be memory-mapped, so that large files can be opened without reading them into memory.
+A json index keeps track of the entries and their last access time. The least recently used
+entries are removed when the size of the cache exceeds its maximum size. The access times
+are only written to disk by flush (e.g. after a batch of files was read), or when entries
+are added or removed.
+"""
+import os
+import json
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+try:
+    from .columnstore import ParquetColumnStore, MemmapColumnStore, memmapAvailable, writeMemmap
+except:
+    from columnstore import ParquetColumnStore, MemmapColumnStore, memmapAvailable, writeMemmap
+
+INDEX_FILE = 'index.json'
+
+
+def parquetAvailable():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return True
+    except:
+        return False
+
+
+class FileCache(object):
+    def __init__(self, directory, maxSizeMB=2000, memmap=False):
+        self.directory = directory
+        self.maxSize   = maxSizeMB*1024**2
+        self.memmap    = memmap # Store numeric dataframes in memory-mappable .npy files
+        self._index    = None
+        self._dirty    = False # Access times modified since the index was written
+
+    # --- Index
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = {}
+            indexFile = os.path.join(self.directory, INDEX_FILE)
+            if os.path.exists(indexFile):
+                try:
+                    with open(indexFile) as f:
+                        self._index = json.load(f)
+                except:
+                    print('[WARN] File cache index corrupted, the cache is purged')
+                    self.purge()
+        return self._index
+
+    def _saveIndex(self):
+        self._dirty = False
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, INDEX_FILE), 'w') as f:
+                json.dump(self.index, f)
+        except:
+            pass
+
+    def flush(self):
+        """ Write the index if access times were modified (see load) """
+        if self._dirty:
+            self._saveIndex()
+
+    def key(self, filename, formatName=None):
+        """ Key of a cache entry, None if the file cannot be accessed """
+        try:
+            st = os.stat(filename)
+        except OSError:
+            return None
+        if formatName is None:
+            formatName = 'auto'
+        s = '{}|{}|{}|{}'.format(os.path.abspath(filename), st.st_size, st.st_mtime_ns, formatName)
+        return hashlib.sha1(s.encode('utf-8')).hexdigest()
+
+    # --- Main methods
+    def lookup(self, filename, formatName=None):
+        """ Return the key of the cache entry for this file, None if the file is not cached"""
+        key = self.key(filename, formatName)
+        if key is None or key not in self.index:
+            return None
+        return key
+
+    def load(self, key, lazy=False):
+        """
+        Load a cache entry
+        lazy: if True, column stores are returned instead of dataframes, the columns are
+              only read from the cache when they are accessed (see columnstore.py)
+        returns: dfs, formatName
+           dfs: dataframe or dict of dataframes, as returned by the file reader
+           formatName: name of the file format that was used to read the file
+        """
+        entry = self.index[key]
+        entry['atime'] = time.time()
+        self._dirty = True # Written by flush, not for every file
+        columns = entry.get('columns', [None]*len(entry['files']))
+        dfs = [self._loadFile(f, cols, colName, lazy) for f, cols, colName in zip(entry['files'], columns, entry['columnsNames'])]
+        if entry['names'] is None:
+            return dfs[0], entry['format']
+        else:
+            return dict(zip(entry['names'], dfs)), entry['format']
+
+    def _loadFile(self, f, columns, colName, lazy):
+        filename = os.path.join(self.directory, f)
+        if f.endswith('.npy'):
+            if lazy:
+                return MemmapColumnStore(filename, columns, name=colName)
+            df = pd.DataFrame(data=np.load(filename), columns=columns)
+        else:
+            if lazy:
+                return ParquetColumnStore(filename, name=colName)
+            df = pd.read_parquet(filename)
+        df.columns.name = colName
+        return df
+
+    def get(self, filename, formatName=None):
+        """ Return (dfs, formatName) if the file is in cache, otherwise None """
+        key = self.lookup(filename, formatName)
+        if key is None:
+            return None
+        try:
+            return self.load(key)
+        except:
+            self.remove(key)
+            return None
+
+    def put(self, filename, formatName, dfs, detectedFormatName=None):
+        """
+        Store the dataframe(s) read from a file
+        formatName: name of the format requested by the user (None for auto-detection)
+        detectedFormatName: name of the format actually used to read the file
+        returns True if the data was cached
+        """
+        key = self.key(filename, formatName)
+        if key is None or dfs is None:
+            return False
+        if isinstance(dfs, dict):
+            names = list(dfs.keys())
+            dfList = [dfs[k] for k in names]
+            if not all([isinstance(k, str) for k in names]):
+                return False
+        else:
+            names = None
+            dfList = [dfs]
+        os.makedirs(self.directory, exist_ok=True)
+        files   = []
+        columns = []
+        size    = 0
+        try:
+            for i, df in enumerate(dfList):
+                cols = list(df.columns.values)
+                if not all([isinstance(c, str) for c in cols]):
+                    raise Exception('Column names need to be strings')
+                if self.memmap and memmapAvailable(df):
+                    f = '{}_{:d}.npy'.format(key, i)
+                    files.append(f)
+                    writeMemmap(os.path.join(self.directory, f), df)
+                    columns.append(cols)
+                else:
+                    # Parquet requires unique column names
+                    if len(set(cols))!=len(cols):
+                        raise Exception('Columns not supported by parquet')
+                    f = '{}_{:d}.parquet'.format(key, i)
+                    files.append(f)
+                    df.to_parquet(os.path.join(self.directory, f))
+                    columns.append(None)
+                size += os.path.getsize(os.path.join(self.directory, f))
+        except:
+            for f in files:
+                self._removeFile(f)
+            return False
+        self.index[key] = {
+            'filename'     : os.path.abspath(filename),
+            'format'       : detectedFormatName if detectedFormatName is not None else formatName,
+            'names'        : names,
+            'columnsNames' : [df.columns.name if isinstance(df.columns.name, str) else None for df in dfList],
+            'files'        : files,
+            'columns'      : columns,
+            'size'         : size,
+            'atime'        : time.time(),
+        }
+        self._evict(keep=key)
+        self._saveIndex()
+        return True
+
+    def remove(self, key):
+        entry = self.index.pop(key, None)
+        if entry is not None:
+            for f in entry['files']:
+                self._removeFile(f)
+            self._saveIndex()
+
+    def purge(self):
+        """ Remove all the entries of the cache """
+        self._index = {}
+        self._dirty = False
+        if os.path.exists(self.directory):
+            for f in os.listdir(self.directory):
+                if f.endswith('.parquet') or f.endswith('.npy') or f==INDEX_FILE:
+                    self._removeFile(f)
+
+    @property
+    def size(self):
+        """ Size of the cache in bytes """
+        return sum([e['size'] for e in self.index.values()])
+
+    def _evict(self, keep=None):
+        """ Remove least recently used entries until the cache size is below the maximum size """
+        size = self.size
+        for key in sorted(self.index.keys(), key=lambda k: self.index[k]['atime']):
+            if size <= self.maxSize:
+                break
+            if key == keep:
+                continue
+            size -= self.index[key]['size']
+            entry = self.index.pop(key)
+            for f in entry['files']:
+                self._removeFile(f)
+
+    def _removeFile(self, f):
+        try:
+            os.remove(os.path.join(self.directory, f))
+        except OSError:
+            pass
+
+    def __repr__(self):
+        s='<FileCache object>:\n'
+        s+=' - directory: {}\n'.format(self.directory)
+        s+=' - entries  : {}\n'.format(len(self.index))
+        s+=' - size     : {:.1f}/{:.1f} MB\n'.format(self.size/1024**2, self.maxSize/1024**2)
+        return s
@@ -0,0 +1,69 @@
+"""
+Detection of files modified on disk, used by the "follow" mode of pyDatView.
+
+All the watched files are checked in one batch (a single `os.stat` per file) each time
+`poll` is called, so that a single GUI timer is needed, whatever the number of files.
+A change is only reported once the file has remained unchanged for `debounce` consecutive
+polls, to avoid reloading a file while it is being written.
+"""
+import os
+
+
+def fileSignature(filename):
+    """ Modification time and size of a file, None if the file cannot be accessed """
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class FileWatcher(object):
+    def __init__(self, filenames=[], debounce=1):
+        self.debounce = debounce # Number of polls during which a modified file needs to remain unchanged
+        self._files   = {}       # filename -> [reference signature, last signature, number of stable polls]
+        self.setFiles(filenames)
+
+    def setFiles(self, filenames):
+        """ Set the list of watched files. Files newly added are considered up to date. """
+        filenames = set([f for f in filenames if len(f)>0])
+        for f in list(self._files.keys()):
+            if f not in filenames:
+                del self._files[f]
+        for f in filenames:
+            if f not in self._files:
+                sig = fileSignature(f)
+                self._files[f] = [sig, sig, 0]
+
+    def reset(self, filename):
+        """ Consider a file as up to date (e.g. after it was reloaded) """
+        if filename in self._files:
+            sig = fileSignature(filename)
+            self._files[filename] = [sig, sig, 0]
+
+    def poll(self):
+        """ Check all the files and return the list of files that changed and are now stable """
+        changed = []
+        for f, state in self._files.items():
+            ref, last, nStable = state
+            sig = fileSignature(f)
+            if sig != last:
+                # File is being modified, waiting for it to be stable
+                state[1] = sig
+                state[2] = 0
+            elif sig != ref and sig is not None:
+                state[2] = nStable+1
+                if state[2] >= self.debounce:
+                    state[0] = sig
+                    changed.append(f)
+        return changed
+
+    @property
+    def filenames(self):
+        return list(self._files.keys())
+
+    def __repr__(self):
+        s='<FileWatcher object>:\n'
+        s+=' - files   : {}\n'.format(len(self._files))
+        s+=' - debounce: {}\n'.format(self.debounce)
+        return s
@@ -0,0 +1,70 @@
+"""
+Cache of detected file formats
+
+Detecting the format of a file (weio.detectFormat) may try many readers in turn.
+The format detected for a file is stored against a signature made of the file extension and
+of the first bytes of the file, so that files that look alike (e.g. outputs of the same
+program) reuse the format without detection.
+Digits are ignored in the header, since headers often contain dates or version numbers.
+
+The entries are stored in a list of [signature, formatName], most recently used last,
+so that the list can be stored as is in the pyDatView config file.
+"""
+import os
+import re
+import hashlib
+
+HEADER_SIZE = 64
+
+
+def headerSignature(filename, nBytes=HEADER_SIZE):
+    """ Signature of a file based on its extension and first bytes, None if the file cannot be read """
+    try:
+        with open(filename, 'rb') as f:
+            head = f.read(nBytes)
+    except (OSError, IOError):
+        return None
+    if len(head)==0:
+        return None
+    head = re.sub(b'[0-9]', b'0', head)
+    ext  = os.path.splitext(filename)[1].lower()
+    return ext+'|'+hashlib.sha1(head).hexdigest()[:16]
+
+
+class FormatCache(object):
+    def __init__(self, entries=None, maxEntries=200):
+        self.entries    = entries if entries is not None else [] # list of [signature, formatName]
+        self.maxEntries = maxEntries
+
+    def signature(self, filename):
+        return headerSignature(filename)
+
+    def get(self, signature):
+        """ Name of the format of files with this signature, None if unknown """
+        if signature is None:
+            return None
+        for i, (sig, formatName) in enumerate(self.entries):
+            if sig==signature:
+                return formatName
+        return None
+
+    def update(self, filename, formatName):
+        """ Store the format of a file, the list of entries is modified in place """
+        sig = self.signature(filename)
+        if sig is None or formatName is None:
+            return
+        self.remove(sig)
+        self.entries.append([sig, formatName])
+        if len(self.entries)>self.maxEntries:
+            del self.entries[:len(self.entries)-self.maxEntries]
+
+    def remove(self, signature):
+        self.entries[:] = [e for e in self.entries if e[0]!=signature]
+
+    def clear(self):
+        del self.entries[:]
+
+    def __repr__(self):
+        s='<FormatCache object>:\n'
+        s+=' - entries: {}/{}\n'.format(len(self.entries), self.maxEntries)
+        return s
@@ -0,0 +1,163 @@
+"""
+Header-only reading of delimited text files
+
+The column names of simple delimited files are read from their first lines, and the number
+of rows is obtained by counting the lines, without parsing the data. This allows to scan
+many files and select the columns before loading them (see TableList.scanHeaders).
+The selected columns can then be read on their own (readDelimitedColumns).
+
+Supported files:
+ - csv/txt/dat files with a single line of column names followed by numeric data
+ - FAST .out files: a line of channel names followed by a line of units in parentheses
+Other files are read with the regular file readers.
+"""
+import os
+import re
+import numpy as np
+import pandas as pd
+try:
+    from .common import cleanCol
+    from .columnstore import ColumnStore
+    from .streaming import detectSeparator
+except:
+    from common import cleanCol
+    from columnstore import ColumnStore
+    from streaming import detectSeparator
+
+HEADER_EXTENSIONS = ['.out', '.csv', '.txt', '.dat']
+HEADER_LINES_MAX  = 50
+
+
+def splitLine(line, sep):
+    if sep==r'\s+':
+        return line.split()
+    return [t.strip().strip('"') for t in line.strip().split(sep)]
+
+
+def _isNumeric(tokens):
+    if len(tokens)==0:
+        return False
+    try:
+        [float(t) for t in tokens]
+        return True
+    except ValueError:
+        return False
+
+
+def readDelimitedHeader(filename):
+    """
+    Read the header of a simple delimited text file
+    returns: dict with keys 'columns', 'sep', 'skiprows' (number of lines before the data)
+             and 'formatName' (weio format that would read the file), or None if the header
+             is not recognized
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in HEADER_EXTENSIONS:
+        return None
+    try:
+        with open(filename, 'r', errors='replace') as f:
+            lines = [f.readline().rstrip('\r\n') for _ in range(HEADER_LINES_MAX)]
+    except (OSError, IOError):
+        return None
+    if ext=='.out':
+        # Channel names, units, then data
+        for i in range(len(lines)-2):
+            names = lines[i].split()
+            units = lines[i+1].split()
+            if len(names)==0 or len(names)!=len(units):
+                continue
+            if all([u.startswith('(') and u.endswith(')') for u in units]) and _isNumeric(lines[i+2].split()):
+                units = [re.sub(r'[()\[\]]', '', u).replace('sec', 's') for u in units]
+                return {'columns':[n+'_['+u+']' for n,u in zip(names, units)], 'sep':r'\s+', 'skiprows':i+2, 'formatName':'FAST output file'}
+        return None
+    sep   = detectSeparator(lines[0])
+    names = splitLine(lines[0], sep)
+    data  = splitLine(lines[1], sep)
+    if len(names)==0 or _isNumeric(names) or len(data)!=len(names) or not _isNumeric(data):
+        return None
+    return {'columns':names, 'sep':sep, 'skiprows':1, 'formatName':'CSV file'}
+
+
+def countRows(filename, skiprows=0, blockSize=1024**2):
+    """ Number of data rows of a text file, obtained by counting the lines (the data is not parsed) """
+    nLines = 0
+    last   = b'\n'
+    with open(filename, 'rb') as f:
+        while True:
+            block = f.read(blockSize)
+            if len(block)==0:
+                break
+            nLines += block.count(b'\n')
+            last = block[-1:]
+    if last!=b'\n':
+        nLines += 1 # Last line without end of line
+    return max(nLines-skiprows, 0)
+
+
+def columnIndices(names, columns):
+    """ Indices of the names that match the columns, compared without units, case and separators (see cleanCol) """
+    keep = set([cleanCol(c) for c in columns])
+    return [i for i,c in enumerate(names) if cleanCol(str(c)) in keep]
+
+
+def readDelimitedColumns(filename, header, columns):
+    """ Read some columns of a delimited file, header: see readDelimitedHeader """
+    I = columnIndices(header['columns'], columns)
+    df = pd.read_csv(filename, sep=header['sep'], skiprows=header['skiprows'], header=None, usecols=I, skipinitialspace=True)
+    df.columns = [header['columns'][i] for i in I]
+    return df
+
+
+def selectColumns(dfs, columns):
+    """
+    Keep only some columns of the dataframe(s) or column store(s) returned by a file reader
+    Columns of stores are deleted without being read.
+    """
+    if columns is None or dfs is None:
+        return dfs
+    if isinstance(dfs, dict):
+        return dict([(k, selectColumns(v, columns)) for k,v in dfs.items()])
+    names = list(dfs.columns)
+    I = columnIndices(names, columns)
+    if isinstance(dfs, ColumnStore):
+        dfs.delete([i for i in range(len(names)) if i not in I])
+        return dfs
+    if len(I)==len(names):
+        return dfs
+    df = dfs.iloc[:, I].copy()
+    df.columns.name = dfs.columns.name
+    return df
+
+
+def headersFromDfs(dfs):
+    """ Headers of the tables of the dataframe(s) returned by a file reader, list of (name, columns, nRows) """
+    if dfs is None:
+        return []
+    if isinstance(dfs, dict):
+        return [(str(k), [str(c) for c in df.columns], len(df)) for k,df in dfs.items() if len(df)>0]
+    if len(dfs)==0:
+        return []
+    name = dfs.columns.name if dfs.columns.name is not None else ''
+    return [(name, [str(c) for c in dfs.columns], len(dfs))]
+
+
+class TableHeader(object):
+    """ Columns and number of rows of a table of a file, obtained without loading the data """
+    def __init__(self, filename, name, columns, nRows, fileformat=None):
+        self.filename   = filename
+        self.name       = name
+        self.rawColumns = list(columns)
+        self.columns    = [s.replace('_',' ') for s in self.rawColumns] # Same as Table.columns
+        self.nRows      = nRows
+        self.fileformat = fileformat
+
+    @property
+    def nCols(self):
+        return len(self.columns)
+
+    def __repr__(self):
+        s='<TableHeader object>:\n'
+        s+=' - filename : {}\n'.format(self.filename)
+        s+=' - name     : {}\n'.format(self.name)
+        s+=' - shape    : {}x{}\n'.format(self.nRows, self.nCols)
+        return s
@@ -0,0 +1,82 @@
+"""
+Loading of files in a background thread
+
+The files are read by TableList.iterLoadFiles in a worker thread. The tables of each file
+are passed to a callback as soon as the file is read, together with the progress.
+The callbacks are called from the worker thread: GUI code should forward them to the main
+thread (e.g. using wx.CallAfter). The tables are not added to the table list by the loader.
+
+Large delimited files are streamed: the table returned first only contains the first rows,
+the loader then parses the rest of the file and passes the rows to the callback `onChunk`.
+The rows are appended to the table by the consumer (Table.appendRows), so that the table
+is only modified by the main thread.
+"""
+import threading
+
+
+class BackgroundLoader(threading.Thread):
+    def __init__(self, tabList, filenames, fileformats=None, nWorkers=1, parallel='thread', onResult=None, onDone=None, onChunk=None, columns=None):
+        """
+        onResult: function(filename, tabs, warn, progress), called after each file (see TableList.iterLoadFiles)
+        onDone  : function(cancelled, error), called at the end, error is None or the exception raised
+        onChunk : function(tab, M, progress), called for each block of rows M of a streamed table,
+                  M is None at the end of the stream (see Table.finishStream).
+                  If None, the streamed tables only contain the first rows.
+        columns : names of the columns to load, None for all (see TableList.iterLoadFiles)
+        """
+        threading.Thread.__init__(self)
+        self.daemon      = True
+        self.tabList     = tabList
+        self.filenames   = filenames
+        self.fileformats = fileformats
+        self.nWorkers    = nWorkers
+        self.parallel    = parallel
+        self.onResult    = onResult
+        self.onDone      = onDone
+        self.onChunk     = onChunk
+        self.columns     = columns
+        self.cancelEvent = threading.Event()
+
+    def run(self):
+        error = None
+        try:
+            for f, tabs, warn, progress in self.tabList.iterLoadFiles(self.filenames, self.fileformats,
+                    nWorkers=self.nWorkers, parallel=self.parallel, cancel=self.cancelEvent, columns=self.columns):
+                if self.onResult is not None:
+                    self.onResult(f, tabs, warn, progress)
+                for t in tabs:
+                    if t.isStreaming:
+                        self.readStream(t, progress)
+        except Exception as e:
+            error = e
+        finally:
+            if self.onDone is not None:
+                self.onDone(self.cancelled, error)
+
+    def readStream(self, tab, progress):
+        """ Parse the remaining rows of a streamed table in this thread """
+        if self.onChunk is None:
+            tab.finishStream()
+            return
+        stream = tab._store.stream
+        progress = dict(progress)
+        progress['current']     = tab.filename
+        progress['streamSize']  = stream.size
+        try:
+            for M in stream:
+                progress['streamBytes'] = stream.bytesRead
+                self.onChunk(tab, M, dict(progress))
+                if self.cancelled:
+                    break
+        finally:
+            stream.close()
+            progress['streamBytes'] = stream.size
+            self.onChunk(tab, None, progress)
+
+    def cancel(self):
+        """ Stop the loading after the file(s) being read """
+        self.cancelEvent.set()
+
+    @property
+    def cancelled(self):
+        return self.cancelEvent.is_set()
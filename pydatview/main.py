@@ -9,6 +9,7 @@ import os.path
 import sys
 import traceback 
 import gc
+import time
 try:
     import pandas as pd
 except:
@@ -50,7 +51,13 @@ except:
     print('   git clone --recurse-submodules https://github.com/ebranlard/pyDatView\n')
     sys.exit(-1)
 
-from .appdata import loadAppData, saveAppData, configFilePath, defaultAppData
+from .appdata import loadAppData, saveAppData, configFilePath, cacheDirPath, defaultAppData, savePlotPanelData, defaultPlotPanelData
+from .filecache import FileCache, parquetAvailable
+from .filewatch import FileWatcher
+from .formatcache import FormatCache
+from .loader import BackgroundLoader
+from .export import EXPORT_FILE_FORMATS
+from .session import SESSION_EXTENSION
 
 # --------------------------------------------------------------------------------}
 # --- GLOBAL 
@@ -111,6 +118,12 @@ class MainFrame(wx.Frame):
         self.systemFontSize = self.GetFont().GetPointSize()
         self.data = loadAppData(self)
         self.datareset = False
+        self.setLoaderOptions()
+        self.tabList.setFormatCache(FormatCache(self.data['loader']['formatCache'])) # entries saved with the app data
+        Table.setCompactStorage(self.data['loader']['compact'], rtol=self.data['loader']['compactRtol'])
+        Table.setTypeSampleSize(self.data['loader']['typeSampleSize'])
+        if self.data['loader']['memoryBudgetMB']>0:
+            self.tabList.setMemoryBudget(self.data['loader']['memoryBudgetMB'], spillDir=os.path.join(cacheDirPath(), 'spill'))
         # Global variables...
         setFontSize(self.data['fontSize'])
         setMonoFontSize(self.data['monoFontSize'])
@@ -130,14 +143,44 @@ class MainFrame(wx.Frame):
 
         fileMenu = wx.Menu()
         loadMenuItem  = fileMenu.Append(wx.ID_NEW,"Open file" ,"Open file"           )
+        chanMenuItem  = fileMenu.Append(-1        ,"Open channels" ,"Select the channels common to many files, and only load these channels")
         exptMenuItem  = fileMenu.Append(-1        ,"Export table" ,"Export table"           )
         saveMenuItem  = fileMenu.Append(wx.ID_SAVE,"Save figure" ,"Save figure"           )
+        fileMenu.AppendSeparator()
+        sessLoadMenuItem = fileMenu.Append(-1, "Open session", "Open the tables and the view saved in a session file")
+        sessSaveMenuItem = fileMenu.Append(-1, "Save session", "Save the tables (including derived tables) and the view to a session file")
+        fileMenu.AppendSeparator()
+        tailMenuItem  = fileMenu.AppendCheckItem(-1, "Reload only appended rows", "Reload only the rows appended to text files")
+        tailMenuItem.Check(self.data['loader']['incrementalReload'])
+        followMenuItem = fileMenu.AppendCheckItem(-1, "Follow files", "Automatically reload files modified on disk")
+        followMenuItem.Check(self.data['loader']['follow'])
+        compactMenuItem = fileMenu.AppendCheckItem(-1, "Compact storage", "Store the data of the files opened in single precision when possible")
+        compactMenuItem.Check(self.data['loader']['compact'])
+        loaderMenu = wx.Menu()
+        for key, label, help in [
+                ('background'  , 'Load in background'     , 'Load files in a background thread, the GUI remains responsive'),
+                ('cache'       , 'Cache parsed files'     , 'Store parsed files in a persistent cache (in the user directory) for faster reload'),
+                ('lazy'        , 'Read columns when used' , 'Tables read from the file cache only load the columns that are used'),
+                ('stream'      , 'Stream large files'     , 'Show the first rows of large delimited files while the rest is read'),
+                ('shareColumns', 'Share identical columns', 'Columns identical between tables (e.g. time) are stored once'),
+                ]:
+            item = loaderMenu.AppendCheckItem(-1, label, help)
+            item.Check(self.data['loader'][key])
+            self.Bind(wx.EVT_MENU, lambda e, k=key: self.onLoaderOption(e, k), item)
+        fileMenu.AppendSubMenu(loaderMenu, 'Loading options')
+        fileMenu.AppendSeparator()
         exitMenuItem  = fileMenu.Append(wx.ID_EXIT, 'Quit', 'Quit application')
         menuBar.Append(fileMenu, "&File")
         self.Bind(wx.EVT_MENU,self.onExit  ,exitMenuItem)
         self.Bind(wx.EVT_MENU,self.onLoad  ,loadMenuItem)
+        self.Bind(wx.EVT_MENU,self.onLoadChannels, chanMenuItem)
         self.Bind(wx.EVT_MENU,self.onExport,exptMenuItem)
         self.Bind(wx.EVT_MENU,self.onSave  ,saveMenuItem)
+        self.Bind(wx.EVT_MENU,self.onLoadSession, sessLoadMenuItem)
+        self.Bind(wx.EVT_MENU,self.onSaveSession, sessSaveMenuItem)
+        self.Bind(wx.EVT_MENU,self.onIncrementalReload, tailMenuItem)
+        self.Bind(wx.EVT_MENU,self.onFollow, followMenuItem)
+        self.Bind(wx.EVT_MENU,self.onCompact, compactMenuItem)
 
         dataMenu = wx.Menu()
         menuBar.Append(dataMenu, "&Data")
@@ -159,16 +202,19 @@ class MainFrame(wx.Frame):
         helpMenu = wx.Menu()
         aboutMenuItem = helpMenu.Append(wx.NewId(), 'About', 'About')
         resetMenuItem = helpMenu.Append(wx.NewId(), 'Reset options', 'Rest options')
+        cacheMenuItem = helpMenu.Append(wx.NewId(), 'Clear file cache', 'Clear file cache')
         menuBar.Append(helpMenu, "&Help")
         self.SetMenuBar(menuBar)
         self.Bind(wx.EVT_MENU,self.onAbout, aboutMenuItem)
         self.Bind(wx.EVT_MENU,self.onReset, resetMenuItem)
+        self.Bind(wx.EVT_MENU,self.onClearCache, cacheMenuItem)
 
 
         self.FILE_FORMATS, errors= weio.fileFormats(ignoreErrors=True, verbose=False)
         if len(errors)>0:
             for e in errors:
                 Warn(self, e)
+        self.FILE_FORMATS += EXPORT_FILE_FORMATS # Files exported by pyDatView
 
         self.FILE_FORMATS_EXTENSIONS = [['.*']]+[f.extensions for f in self.FILE_FORMATS]
         self.FILE_FORMATS_NAMES      = ['auto (any supported file)'] + [f.name for f in self.FILE_FORMATS]
@@ -201,8 +247,12 @@ class MainFrame(wx.Frame):
         tb.Realize() 
 
         # --- Status bar
-        self.statusbar=self.CreateStatusBar(3, style=0)
-        self.statusbar.SetStatusWidths([200, -1, 70])
+        self.statusbar=self.CreateStatusBar(4, style=0)
+        self.statusbar.SetStatusWidths([200, -1, 70, 140])
+        self.btCancel = wx.Button(self.statusbar, -1, 'Cancel', style=wx.BU_EXACTFIT)
+        self.btCancel.Bind(wx.EVT_BUTTON, self.onCancelLoad)
+        self.btCancel.Hide()
+        self.loader = None # Background loader, see load_files
 
         # --- Main Panel and Notebook
         self.MainPanel = wx.Panel(self)
@@ -243,6 +293,14 @@ class MainFrame(wx.Frame):
                 )
         self.SetAcceleratorTable(accel_tbl)
 
+        # --- Follow mode, a single timer checks all the files
+        self.fileWatcher = FileWatcher(debounce=self.data['loader']['followDebounce'])
+        self.followTimer = wx.Timer(self)
+        self.followBusy  = False
+        self.Bind(wx.EVT_TIMER, self.onFollowTimer, self.followTimer)
+        if self.data['loader']['follow']:
+            self.followTimer.Start(self.data['loader']['followInterval'])
+
     def onFilter(self,event):
         if hasattr(self,'selPanel'):
             self.selPanel.colPanel1.tFilter.SetFocus()
@@ -261,8 +319,14 @@ class MainFrame(wx.Frame):
                 self.plotPanel.cleanPlot()
         gc.collect()
 
-    def load_files(self, filenames=[], fileformats=None, bReload=False, bAdd=False):
-        """ load multiple files, only trigger the plot at the end """
+    def load_files(self, filenames=[], fileformats=None, bReload=False, bAdd=False, columns=None):
+        """ 
+        load multiple files, in a background thread by default (see onLoadResult and onLoadDone) 
+        columns: names of the columns to load, None for all columns (see selectChannels)
+        """
+        if self.loader is not None:
+            Error(self,'Files are still being loaded. Wait for the loading to finish, or cancel it.')
+            return
         if bReload:
             if hasattr(self,'selPanel'):
                 self.selPanel.saveSelection() # TODO move to tables
@@ -283,27 +347,131 @@ class MainFrame(wx.Frame):
         fileformats = list(np.array(fileformats)[I])
         #filenames = [f for __, f in sorted(zip(base_filenames, filenames))]
 
-        # Load the tables
-        warnList = self.tabList.load_tables_from_files(filenames=filenames, fileformats=fileformats, bAdd=bAdd)
-        if bReload:
+        # Load the tables, they are added to the GUI as files are read
+        self.loadState = {'bReload':bReload, 'bAdd':bAdd, 'warnList':[], 'GUI':False, 'tUpdate':0, 'nPending':0, 'tDraw':0}
+        loaderArgs = dict(nWorkers=self.data['loader']['nWorkers'], parallel=self.data['loader']['parallel'], columns=columns)
+        if self.data['loader']['background']:
+            if not bAdd:
+                # The panels are not usable until the first tables are loaded
+                if bReload:
+                    self.MainPanel.Disable()
+                else:
+                    self.cleanGUI()
+            self.loader = BackgroundLoader(self.tabList, filenames, fileformats, 
+                    onResult = lambda *args: wx.CallAfter(self.onLoadResult, *args),
+                    onDone   = lambda *args: wx.CallAfter(self.onLoadDone, *args),
+                    onChunk  = lambda *args: wx.CallAfter(self.onLoadChunk, *args), **loaderArgs)
+            self.showLoadProgress(True)
+            self.loader.start()
+        else:
+            for args in self.tabList.iterLoadFiles(filenames, fileformats, **loaderArgs):
+                for t in args[1]:
+                    if t.isStreaming:
+                        t.readStream()
+                self.onLoadResult(*args)
+            self.onLoadDone(False, None)
+
+    def onLoadResult(self, filename, tabs, warn, progress):
+        """ Called when a file has been read, add its tables to the list, and to the GUI from time to time """
+        st = self.loadState
+        if len(warn)>0:
+            st['warnList'].append(warn)
+        if st['bReload']:
             # Restore formulas that were previously added
-            for tab in self.tabList:
+            for tab in tabs:
                 if tab.raw_name in self.restore_formulas.keys():
-                    for f in self.restore_formulas[tab.raw_name]:
-                        tab.addColumnByFormula(f['name'], f['formula'], f['pos']-1)
-            self.restore_formulas = {}
+                    tab.applyFormulas(self.restore_formulas[tab.raw_name]) # Computed when the columns are used
+        self.tabList.append(tabs)
+        st['nPending'] += len(tabs)
+        if self.loader is not None:
+            self.setLoadProgress(progress)
+            if st['nPending']>0 and (not st['GUI'] or time.time()-st['tUpdate']>0.5):
+                self.updateLoadedTabs()
+
+    def updateLoadedTabs(self):
+        """ Add the tables loaded so far to the GUI """
+        st = self.loadState
+        if not st['GUI']:
+            self.load_tabs_into_GUI(bReload=st['bReload'], bAdd=st['bAdd'], bPlot=True)
+            st['GUI'] = True
+        else:
+            self.selPanel.saveSelection()
+            self.selPanel.update_tabs(self.tabList)
+        st['nPending'] = 0
+        st['tUpdate']  = time.time()
+        self.MainPanel.Enable()
+
+    def onLoadChunk(self, tab, M, progress):
+        """ Called when rows of a streamed file have been parsed, the plot is updated from time to time """
+        st = self.loadState
+        if M is None:
+            tab.finishStream()
+        else:
+            tab.appendRows(M)
+            self.setLoadProgress(progress)
+        if st['GUI'] and (M is None or time.time()-st['tDraw']>1):
+            self.redraw()
+            st['tDraw'] = time.time()
+
+    def onLoadDone(self, cancelled, error):
+        st = self.loadState
+        self.loader = None
+        self.showLoadProgress(False)
+        self.MainPanel.Enable()
+        self.restore_formulas = {}
+        if self.data['loader']['shareColumns'] and self.tabList.len()>1:
+            self.tabList.shareColumns() # Identical columns (e.g. time) of different files stored once
+        # Load remaining tables into the GUI
+        if st['nPending']>0:
+            if st['GUI']:
+                self.selPanel.saveSelection()
+                self.load_tabs_into_GUI(bReload=True, bPlot=True)
+            else:
+                self.load_tabs_into_GUI(bReload=st['bReload'], bAdd=st['bAdd'], bPlot=True)
+        elif self.tabList.len()>0:
+            self.setStatusBar()
+        self.checkMemory()
         # Display warnings
-        for warn in warnList: 
+        for warn in st['warnList']: 
             Warn(self,warn)
-        # Load tables into the GUI
-        if self.tabList.len()>0:
-            self.load_tabs_into_GUI(bReload=bReload, bAdd=bAdd, bPlot=True)
+        if cancelled:
+            self.statusbar.SetStatusText('Loading cancelled', 1)
+        if error is not None:
+            # NOTE: called by the event loop, the error is shown to the user instead of being raised
+            traceback.print_exception(type(error), error, error.__traceback__)
+            tmp = traceback.format_exception(type(error), error, error.__traceback__)
+            if str(error).startswith('Error:'):
+                Error(self, str(error)[6:].strip())
+            else:
+                Error(self, 'Loading the files failed:\n\n'+tmp[-1]+'\n'+tmp[-2].strip())
+
+    def showLoadProgress(self, show=True):
+        if show:
+            rect = self.statusbar.GetFieldRect(2)
+            self.btCancel.SetPosition(rect.GetPosition())
+            self.btCancel.SetSize(rect.GetSize())
+            self.statusbar.SetStatusText('Loading...', 0)
+        self.btCancel.Show(show)
+
+    def setLoadProgress(self, progress):
+        self.statusbar.SetStatusText('Loading {:d}/{:d} files'.format(progress['nDone'], progress['nFiles']), 0)
+        s = '{:.1f}/{:.1f} MB'.format(progress['bytesDone']/1024**2, progress['bytesTotal']/1024**2)
+        if len(progress['current'])>0:
+            s += ' - reading: '+progress['current']
+        if 'streamBytes' in progress:
+            s += ' ({:.0f}%)'.format(100*progress['streamBytes']/max(progress['streamSize'],1))
+        self.statusbar.SetStatusText(s, 1)
+
+    def onCancelLoad(self, event=None):
+        if self.loader is not None:
+            self.loader.cancel()
+            self.statusbar.SetStatusText('Cancelling...', 0)
 
     def load_df(self, df, name=None, bAdd=False, bPlot=True):
         if bAdd:
             self.tabList.append(Table(data=df, name=name))
         else:
-            self.tabList = TableList( [Table(data=df, name=name)] )
+            self.tabList.from_dataframes(dataframes=[df], names=[name], bAdd=False)
         self.load_tabs_into_GUI(bAdd=bAdd, bPlot=bPlot)
         if hasattr(self,'selPanel'):
             self.selPanel.updateLayout(SEL_MODES_ID[self.comboMode.GetSelection()])
@@ -428,13 +596,137 @@ class MainFrame(wx.Frame):
     def exportTab(self, iTab):
         tab=self.tabList.get(iTab)
         default_filename=tab.basename +'.csv'
-        with wx.FileDialog(self, "Save to CSV file",defaultFile=default_filename,
+        wildcard = 'CSV file (*.csv)|*.csv|Parquet file (*.parquet)|*.parquet|Feather file (*.feather)|*.feather|NPZ file (*.npz)|*.npz'
+        with wx.FileDialog(self, "Export table",defaultFile=default_filename, wildcard=wildcard,
                 style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT) as dlg:
-                #, wildcard="CSV files (*.csv)|*.csv",
             dlg.CentreOnParent()
             if dlg.ShowModal() == wx.ID_CANCEL:
                 return     # the user changed their mind
-            tab.export(dlg.GetPath())
+            fmt = ['csv','parquet','feather','npz'][dlg.GetFilterIndex()]
+            path = dlg.GetPath()
+            if os.path.splitext(path)[1].lower()!='.'+fmt:
+                path += '.'+fmt
+            try:
+                with wx.BusyCursor():
+                    tab.export(path, fmt)
+            except Exception as e:
+                Error(self, 'Export failed:\n\n{}'.format(e))
+
+    def exportTabs(self, ISel):
+        """ Export several tables, to one npz file or to a directory with one file per table """
+        if len(ISel)==1:
+            return self.exportTab(ISel[0])
+        choices = ['NPZ (one file with all the tables)', 'Parquet (one file per table)', 'Feather (one file per table)', 'CSV (one file per table)']
+        with wx.SingleChoiceDialog(self, 'Export format for the {} tables selected:'.format(len(ISel)), 'Export tables', choices) as dlg:
+            dlg.CentreOnParent()
+            if dlg.ShowModal() != wx.ID_OK:
+                return
+            fmt = ['npz','parquet','feather','csv'][dlg.GetSelection()]
+        if fmt=='npz':
+            with wx.FileDialog(self, "Export tables", defaultFile='tables.npz', wildcard='NPZ file (*.npz)|*.npz',
+                    style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT) as dlg:
+                dlg.CentreOnParent()
+                if dlg.ShowModal() == wx.ID_CANCEL:
+                    return
+                path = dlg.GetPath()
+                if not path.lower().endswith('.npz'):
+                    path += '.npz'
+        else:
+            with wx.DirDialog(self, "Export tables to directory") as dlg:
+                dlg.CentreOnParent()
+                if dlg.ShowModal() == wx.ID_CANCEL:
+                    return
+                path = dlg.GetPath()
+        try:
+            with wx.BusyCursor():
+                files = self.tabList.exportTables(path, I=ISel, fmt=fmt)
+            self.statusbar.SetStatusText('{} file(s) exported'.format(len(files)), 1)
+        except Exception as e:
+            Error(self, 'Export failed:\n\n{}'.format(e))
+
+    # --- Session
+    def onSaveSession(self, event=None):
+        if self.tabList.len()==0:
+            Error(self,'Open a file first.')
+            return
+        wildcard = 'pyDatView session (*{0})|*{0}'.format(SESSION_EXTENSION)
+        with wx.FileDialog(self, "Save session", defaultFile='session'+SESSION_EXTENSION, wildcard=wildcard,
+                style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT) as dlg:
+            dlg.CentreOnParent()
+            if dlg.ShowModal() == wx.ID_CANCEL:
+                return
+            path = dlg.GetPath()
+        if not path.lower().endswith(SESSION_EXTENSION):
+            path += SESSION_EXTENSION
+        try:
+            with wx.BusyCursor():
+                self.tabList.saveSession(path, gui=self.getGUIState())
+            self.statusbar.SetStatusText('Session saved', 1)
+        except Exception as e:
+            Error(self, 'Saving the session failed:\n\n{}'.format(e))
+
+    def onLoadSession(self, event=None):
+        wildcard = 'pyDatView session (*{0})|*{0}'.format(SESSION_EXTENSION)
+        with wx.FileDialog(self, "Open session", wildcard=wildcard, style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST) as dlg:
+            dlg.CentreOnParent()
+            if dlg.ShowModal() == wx.ID_CANCEL:
+                return
+            path = dlg.GetPath()
+        self.loadSession(path)
+
+    def loadSession(self, filename):
+        """ Replace the tables by the ones of a session file and restore the view """
+        if self.loader is not None:
+            Error(self, 'Wait for the files being loaded before opening a session.')
+            return
+        try:
+            with wx.BusyCursor():
+                gui, warnList = self.tabList.loadSession(filename, nWorkers=self.data['loader']['nWorkers'], parallel=self.data['loader']['parallel'])
+        except Exception as e:
+            Error(self, 'Opening the session failed:\n\n{}'.format(e))
+            return
+        if gui is not None and 'plotPanel' in gui.keys():
+            self.data['plotPanel'] = gui['plotPanel'] # Read when the plot panel is created
+        if self.tabList.len()>0:
+            if gui is not None and 'mode' in gui.keys() and gui['mode'] in SEL_MODES_ID:
+                self.comboMode.SetSelection(SEL_MODES_ID.index(gui['mode']))
+            self.load_tabs_into_GUI(bReload=False, bAdd=False, bPlot=False)
+            self.setGUIState(gui)
+        else:
+            self.cleanGUI()
+        for warn in warnList:
+            Warn(self, warn)
+
+    def getGUIState(self):
+        """ State of the view, saved in session files """
+        if not hasattr(self, 'selPanel'):
+            return None
+        self.selPanel.saveSelection()
+        plotPanelData = defaultPlotPanelData()
+        savePlotPanelData(plotPanelData, self.plotPanel)
+        tabSelections = {}
+        for k,v in self.selPanel.tabSelections.items():
+            tabSelections[k] = {'xSel':int(v['xSel']), 'ySel':[int(i) for i in v['ySel']]}
+        return {'mode'         : SEL_MODES_ID[self.comboMode.GetSelection()],
+                'tabSelected'  : [int(i) for i in self.selPanel.tabPanel.lbTab.GetSelections()],
+                'tabSelections': tabSelections,
+                'plotPanel'    : plotPanelData,
+                'plotType'     : self.plotPanel.pltTypePanel.plotType(),
+                }
+
+    def setGUIState(self, gui):
+        """ Restore the view saved by getGUIState """
+        if gui is not None:
+            self.selPanel.tabSelections.update(gui.get('tabSelections', {}))
+            self.selPanel.tabPanel.lbTab.SetSelection(wx.NOT_FOUND)
+            self.selPanel.tabSelected = [i for i in gui.get('tabSelected', []) if i<self.tabList.len()]
+            self.selPanel.update_tabs(self.tabList)
+            plotType = gui.get('plotType', 'Regular')
+            if plotType in ['PDF','FFT','MinMax','Compare']:
+                getattr(self.plotPanel.pltTypePanel, 'cb'+plotType).SetValue(True)
+                getattr(self.plotPanel.pltTypePanel, plotType.lower()+'_select')()
+        self.mainFrameUpdateLayout()
+        self.onColSelectionChange(event=None)
 
     def onShowTool(self, event=None, tool=''):
         """ 
@@ -497,9 +789,22 @@ class MainFrame(wx.Frame):
             self.selPanel.colSelectionChanged()
             # Redrawing
             self.plotPanel.load_and_draw()
+            # Columns may have been read
+            self.checkMemory()
             # --- Stats trigger
             #self.showStats()
 
+    def checkMemory(self):
+        """ Enforce the memory budget, keeping the tables selected, and show the memory used in the status bar """
+        ISel = []
+        if hasattr(self,'selPanel'):
+            ISel = self.selPanel.tabPanel.lbTab.GetSelections()
+        self.tabList.enforceMemoryBudget(keep=ISel)
+        s = 'Memory: {:.0f}'.format(self.tabList.nbytes/1024**2)
+        if self.tabList.memoryBudgetMB is not None:
+            s += '/{:.0f}'.format(self.tabList.memoryBudgetMB)
+        self.statusbar.SetStatusText(s+' MB', 3)
+
     def redraw(self):
         if hasattr(self,'plotPanel'):
             self.plotPanel.load_and_draw()
@@ -510,6 +815,11 @@ class MainFrame(wx.Frame):
         self.Close() 
 
     def onClose(self, event):
+        self.followTimer.Stop()
+        if self.loader is not None:
+            self.loader.cancel()
+        if self.tabList.cache is not None:
+            self.tabList.cache.flush()
         saveAppData(self, self.data)
         event.Skip()
 
@@ -536,6 +846,7 @@ class MainFrame(wx.Frame):
         defaultDir = weio.defaultUserDataDir() # TODO input file options
         About(self,PROG_NAME+' '+PROG_VERSION+'\n\n'
                 'pyDatView config file:\n     {}\n'.format(configFilePath())+
+                'pyDatView cache directory:\n     {}\n'.format(cacheDirPath())+
                 'weio data directory:     \n     {}\n'.format(os.path.join(defaultDir,'weio'))+
                 '\n\nVisit http://github.com/ebranlard/pyDatView for documentation.')
 
@@ -555,8 +866,97 @@ class MainFrame(wx.Frame):
             self.datareset = True
             self.onExit(event=None)
 
+    def onClearCache(self, event=None):
+        cache = self.tabList.cache
+        if cache is None:
+            Info(self, 'The file cache is disabled.')
+            return
+        result = YesNo(self,
+                'The file cache contains {:d} file(s) ({:.1f} MB), located at:\n   {}\n\n'.format(len(cache.index), cache.size/1024**2, cache.directory)+
+                'Files will be parsed again the next time they are opened.\n\n'
+                'Are you sure you want to clear the cache?', caption = 'Clear file cache?')
+        if result:
+            cache.purge()
+
+    def onIncrementalReload(self, event=None):
+        self.data['loader']['incrementalReload'] = event.IsChecked()
+
+    def onLoaderOption(self, event, key):
+        # Applies to the files opened afterwards
+        self.data['loader'][key] = event.IsChecked()
+        self.setLoaderOptions()
+
+    def setLoaderOptions(self):
+        """ Set the file cache and streaming of the table list based on the loader options """
+        opts  = self.data['loader']
+        cache = self.tabList.cache
+        if opts['cache'] and parquetAvailable():
+            if cache is None:
+                cache = FileCache(cacheDirPath(), maxSizeMB=opts['cacheSizeMB'], memmap=opts['memmap'])
+        elif cache is not None:
+            cache.flush()
+            cache = None
+        self.tabList.setCache(cache, lazy=opts['lazy'])
+        self.tabList.setStreaming(opts['streamSizeMB'] if opts['stream'] else None, chunkRows=opts['streamChunkRows'])
+
+    def onCompact(self, event=None):
+        # Applies to the files opened afterwards
+        self.data['loader']['compact'] = event.IsChecked()
+        Table.setCompactStorage(event.IsChecked(), rtol=self.data['loader']['compactRtol'])
+
+    def onFollow(self, event=None):
+        self.data['loader']['follow'] = event.IsChecked()
+        if event.IsChecked():
+            self.fileWatcher.setFiles([])
+            self.fileWatcher.setFiles(self.tabList.unique_filenames)
+            self.followTimer.Start(self.data['loader']['followInterval'])
+        else:
+            self.followTimer.Stop()
+
+    def onFollowTimer(self, event=None):
+        if self.followBusy or self.loader is not None or not hasattr(self,'selPanel'):
+            return
+        self.followBusy = True
+        try:
+            self.fileWatcher.setFiles(self.tabList.unique_filenames)
+            changed = self.fileWatcher.poll()
+            if len(changed)>0:
+                self.reloadFiles(changed)
+        finally:
+            self.followBusy = False
+
+    def reloadFiles(self, filenames):
+        """ Reload only the tables of the given files, and redraw keeping the current zoom """
+        tabNames = self.tabList.tabNames
+        warnList = []
+        for f in filenames:
+            warn = self.tabList.reloadFile(f, incremental=self.data['loader']['incrementalReload'])
+            if len(warn)>0:
+                warnList.append(warn)
+        if self.tabList.tabNames != tabNames:
+            self.selPanel.saveSelection()
+            self.selPanel.update_tabs(self.tabList)
+        ISel=self.selPanel.tabPanel.lbTab.GetSelections()
+        self.setStatusBar(ISel if len(ISel)>0 else None)
+        self.redraw()
+        self.setStatusWarnings(warnList + self.tabList.popWarnings())
+
+    def setStatusWarnings(self, warnList):
+        """ Show warnings in the status bar, used for automatic reloads where dialogs would be intrusive """
+        if len(warnList)>0:
+            self.statusbar.SetStatusText('Warning: '+' | '.join([w.strip() for w in warnList]), 1)
+
     def onReload(self, event=None):
         filenames, fileformats = self.tabList.filenames_and_formats
+        if len(filenames)>0 and self.data['loader']['incrementalReload']:
+            # Reading only the rows appended to the files, formulas and masks are kept
+            if self.tabList.reloadTail():
+                # Only the plot needs to be updated
+                ISel=self.selPanel.tabPanel.lbTab.GetSelections()
+                self.setStatusBar(ISel if len(ISel)>0 else None)
+                self.redraw()
+                self.setStatusWarnings(self.tabList.popWarnings())
+                return
         if len(filenames)>0:
             # Save formulas to restore them after reload with sorted tabs
             self.restore_formulas = {}
@@ -581,7 +981,7 @@ class MainFrame(wx.Frame):
         except:
             pass
         if len(ISel)>0:
-            self.exportTab(ISel[0])
+            self.exportTabs(ISel)
         else:
            Error(self,'Open a file and select a table first.')
 
@@ -591,7 +991,10 @@ class MainFrame(wx.Frame):
     def onAdd(self, event=None):
         self.selectFile(bAdd=self.tabList.len()>0)
 
-    def selectFile(self,bAdd=False):
+    def onLoadChannels(self, event=None):
+        self.selectFile(bAdd=False, bChannels=True)
+
+    def selectFile(self,bAdd=False,bChannels=False):
         # --- File Format extension
         iFormat=self.comboFormats.GetSelection()
         sFormat=self.comboFormats.GetStringSelection()
@@ -613,7 +1016,32 @@ class MainFrame(wx.Frame):
            if dlg.ShowModal() == wx.ID_CANCEL:
                return     # the user changed their mind
            filenames = dlg.GetPaths()
-           self.load_files(filenames,fileformats=[Format]*len(filenames),bAdd=bAdd)
+        if bChannels:
+            self.selectChannels(filenames,fileformats=[Format]*len(filenames),bAdd=bAdd)
+        else:
+            self.load_files(filenames,fileformats=[Format]*len(filenames),bAdd=bAdd)
+
+    def selectChannels(self, filenames, fileformats=None, bAdd=False):
+        """ Read the headers of the files, and only load the channels common to all files selected by the user """
+        with wx.BusyCursor():
+            headers, warnList = self.tabList.scanHeaders(filenames, fileformats, nWorkers=None, parallel=self.data['loader']['parallel'])
+        for warn in warnList:
+            Warn(self,warn)
+        columns = TableList.commonColumns(headers)
+        if len(columns)==0:
+            if len(headers)>0:
+                Error(self,'The files have no channel in common.')
+            return
+        nRows = sum([h.nRows for h in headers])
+        dlg = wx.MultiChoiceDialog(self, 'Channels common to the {:d} tables ({:d} rows in total):'.format(len(headers), nRows), 'Open channels', columns)
+        dlg.SetSelections([0])
+        if dlg.ShowModal()!=wx.ID_OK:
+            dlg.Destroy()
+            return
+        ISel = dlg.GetSelections()
+        dlg.Destroy()
+        if len(ISel)>0:
+            self.load_files(filenames, fileformats=fileformats, bAdd=bAdd, columns=[columns[i] for i in ISel])
 
     def onModeChange(self, event=None):
         if hasattr(self,'selPanel'):
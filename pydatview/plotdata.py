@@ -387,7 +387,7 @@ class PlotData():
         if PD.yIsString or  PD.yIsDate:
             return None,'NA'
         else:
-            v=np.nanmean(PD.y)
+            v=np.nanmean(PD.y, dtype=np.float64) # double precision accumulator (compact storage)
             s=pretty_num(v)
         return (v,s)
 
@@ -403,7 +403,7 @@ class PlotData():
         if PD.yIsString or  PD.yIsDate:
             return None,'NA'
         else:
-            v=np.nanstd(PD.y)
+            v=np.nanstd(PD.y, dtype=np.float64)
             s=pretty_num(v)
         return (v,s)
 
@@ -576,7 +576,7 @@ class PlotData():
             if left_index > right_index:
                 left_index, right_index = right_index, left_index
             if mode == 'mean':
-                v = np.nanmean(PD.y[left_index:right_index])
+                v = np.nanmean(PD.y[left_index:right_index], dtype=np.float64)
             elif mode == 'min':
                 v = np.nanmin(PD.y[left_index:right_index])
             elif mode == 'max':
@@ -648,6 +648,27 @@ class PlotData():
 # --------------------------------------------------------------------------------}
 # ---  
 # --------------------------------------------------------------------------------{
+def sameAxis(x1, x2):
+    """ 
+    True if two x axes are identical, interpolation is then not needed.
+    Axes shared between tables (see TableList.shareColumns) are detected without comparing the values.
+    """
+    if x1 is x2:
+        return True
+    x1 = np.asarray(x1)
+    x2 = np.asarray(x2)
+    if x1.shape!=x2.shape or x1.dtype!=x2.dtype:
+        return False
+    if x1.__array_interface__['data'][0]==x2.__array_interface__['data'][0] and x1.strides==x2.strides:
+        return True
+    return np.array_equal(x1, x2)
+
+def interpOnAxis(xRef, x, y):
+    """ Values y defined on x, interpolated on xRef """
+    if sameAxis(xRef, x):
+        return y
+    return np.interp(xRef, x, y)
+
 def compareMultiplePD(PD, mode, sComp):
     """ 
     PD: list of PlotData
@@ -730,7 +751,7 @@ def compareMultiplePD(PD, mode, sComp):
         xRef = PD[0].x
         yRef = PD[0].y
         PD[1].syl=SS
-        y=np.interp(xRef,PD[1].x,PD[1].y)
+        y=interpOnAxis(xRef,PD[1].x,PD[1].y)
         if sComp=='Y-Y':
             PD[1].x=yRef
             PD[1].y=y
@@ -780,7 +801,7 @@ def compareMultiplePD(PD, mode, sComp):
                     else:
                         raise Exception('X values have different length and are strings, cannot interpolate string. Use `Index` for x instead.')
                 else:
-                    pd.y=np.interp(xRef,pd.x,pd.y)
+                    pd.y=interpOnAxis(xRef,pd.x,pd.y)
                 if sComp=='Y-Y':
                     pd.x=yRef
                     pd.sx=PD_SameCol[0].st+', '+PD_SameCol[0].sy
@@ -26,6 +26,7 @@ class BinningToolPanel(GUIToolPanel):
             self.parent.plotDataOptions['Binning'] =_DEFAULT_DICT.copy()
         self.data = self.parent.plotDataOptions['Binning']
         self.data['selectionChangeCallBack'] = self.selectionChange
+        self.colorbar = None # Colorbar of the 2D plot
 
 
         # --- GUI elements
@@ -40,30 +41,34 @@ class BinningToolPanel(GUIToolPanel):
         self.textXMin = wx.TextCtrl(self, wx.ID_ANY, '', style = wx.TE_PROCESS_ENTER|wx.TE_RIGHT, size=wx.Size(70,-1))
         self.textXMax = wx.TextCtrl(self, wx.ID_ANY, '', style = wx.TE_PROCESS_ENTER|wx.TE_RIGHT, size=wx.Size(70,-1))
         self.btPlot     = self.getBtBitmap(self, 'Plot' ,'chart'  , self.onPlot)
+        self.btPlot2D   = self.getBtBitmap(self, 'Plot 2D' ,'chart'  , self.onPlot2D)
         self.btApply    = self.getToggleBtBitmap(self,'Apply','cloud',self.onToggleApply)
         self.btXRange = self.getBtBitmap(self, 'Default','compute', self.reset)
         self.lbDX     = wx.StaticText(self, -1, '')
         self.scBins.SetRange(3, 10000)
+        self.scBins2 = wx.SpinCtrl(self, value='50', style=wx.TE_RIGHT, size=wx.Size(60,-1) )
+        self.scBins2.SetRange(3, 10000)
 
         boldFont = self.GetFont().Bold()
         lbInputs  = wx.StaticText(self, -1, 'Inputs: ')
         lbInputs.SetFont(boldFont)
 
         # --- Layout
-        btSizer  = wx.FlexGridSizer(rows=3, cols=2, hgap=2, vgap=0)
+        btSizer  = wx.FlexGridSizer(rows=4, cols=2, hgap=2, vgap=0)
         btSizer.Add(self.btClose                , 0, flag = wx.ALL|wx.EXPAND, border = 1)
         btSizer.Add(self.btClear                , 0, flag = wx.ALL|wx.EXPAND, border = 1)
         btSizer.Add(self.btAdd                  , 0, flag = wx.ALL|wx.EXPAND, border = 1)
         btSizer.Add(self.btPlot                 , 0, flag = wx.ALL|wx.EXPAND, border = 1)
         btSizer.Add(self.btHelp                 , 0, flag = wx.ALL|wx.EXPAND, border = 1)
         btSizer.Add(self.btApply                , 0, flag = wx.ALL|wx.EXPAND, border = 1)
+        btSizer.Add(self.btPlot2D               , 0, flag = wx.ALL|wx.EXPAND, border = 1)
 
         msizer  = wx.FlexGridSizer(rows=1, cols=3, hgap=2, vgap=0)
         msizer.Add(wx.StaticText(self, -1, 'Table:')    , 0, wx.ALIGN_LEFT|wx.ALIGN_CENTER_VERTICAL|wx.TOP|wx.BOTTOM, 1)
         msizer.Add(self.cbTabs                          , 0, wx.ALIGN_LEFT|wx.ALIGN_CENTER_VERTICAL|wx.TOP|wx.BOTTOM, 1)
 #         msizer.Add(self.btXRange                        , 0, wx.ALIGN_LEFT|wx.ALIGN_CENTER_VERTICAL|wx.TOP|wx.BOTTOM|wx.LEFT, 1)
 
-        msizer2 = wx.FlexGridSizer(rows=2, cols=5, hgap=2, vgap=1)
+        msizer2 = wx.FlexGridSizer(rows=3, cols=5, hgap=2, vgap=1)
 
         msizer2.Add(lbInputs                                   , 0, wx.LEFT|wx.ALIGN_LEFT|wx.ALIGN_CENTER_VERTICAL          , 0)
         msizer2.Add(wx.StaticText(self, -1, '#bins: ')         , 0, wx.LEFT|wx.ALIGN_LEFT|wx.ALIGN_CENTER_VERTICAL          , 1)
@@ -75,6 +80,9 @@ class BinningToolPanel(GUIToolPanel):
         msizer2.Add(self.textXMin                              , 1, wx.LEFT|wx.ALIGN_LEFT|wx.ALIGN_CENTER_VERTICAL|wx.EXPAND, 1)
         msizer2.Add(wx.StaticText(self, -1, 'xmax: ')          , 0, wx.LEFT|wx.ALIGN_LEFT|wx.ALIGN_CENTER_VERTICAL          , 8)
         msizer2.Add(self.textXMax                              , 1, wx.LEFT|wx.ALIGN_LEFT|wx.ALIGN_CENTER_VERTICAL|wx.EXPAND, 1)
+        msizer2.Add(wx.StaticText(self, -1, '')                , 0, wx.LEFT|wx.ALIGN_LEFT|wx.ALIGN_CENTER_VERTICAL          , 0)
+        msizer2.Add(wx.StaticText(self, -1, '#bins y: ')       , 0, wx.LEFT|wx.ALIGN_LEFT|wx.ALIGN_CENTER_VERTICAL          , 1)
+        msizer2.Add(self.scBins2                               , 1, wx.LEFT|wx.ALIGN_LEFT|wx.ALIGN_CENTER_VERTICAL, 1)
         #msizer2.AddGrowableCol(4,1)
 
         vsizer = wx.BoxSizer(wx.VERTICAL)
@@ -100,6 +108,7 @@ class BinningToolPanel(GUIToolPanel):
         else:
             self.setXRange()
         self.scBins.SetValue(self.data['nBins'])
+        self.scBins2.SetValue(self.data.get('nBins2', 50))
         self.onToggleApply(init=True)
         self.updateTabList()
         self.onParamChange()
@@ -131,6 +140,7 @@ class BinningToolPanel(GUIToolPanel):
         def zero_if_empty(s):
             return 0 if len(s)==0 else s
         self.data['nBins'] = int  (self.scBins.Value)
+        self.data['nBins2']= int  (self.scBins2.Value)
         self.data['xMin']  = float(zero_if_empty(self.textXMin.Value))
         self.data['xMax']  = float(zero_if_empty(self.textXMax.Value))
 
@@ -144,11 +154,13 @@ class BinningToolPanel(GUIToolPanel):
         if self.data['active']:
             self._GUI2Data()
             self.btPlot.Enable(False)
+            self.btPlot2D.Enable(False)
             self.btClear.Enable(False)
             self.btApply.SetLabel(CHAR['sun']+' Clear')
         else:
             self.parent.plotDataOptions['Binning'] = None
             self.btPlot.Enable(True)
+            self.btPlot2D.Enable(True)
             self.btClear.Enable(True)
             self.btApply.SetLabel(CHAR['cloud']+' Apply')
 
@@ -218,7 +230,52 @@ class BinningToolPanel(GUIToolPanel):
         ax.plot(PD_new.x, PD_new.y, '-')
         self.parent.canvas.draw()
 
+    def onPlot2D(self,event=None):
+        PDs = self.parent.plotData
+        if len(PDs) not in [1,2] or len(PDs[0].y0)!=len(PDs[-1].y0):
+            Error(self,'2D binning requires one signal (count of x and y), or two signals of the same table (mean of the second signal).')
+            return
+        if any([PD.xIsDate or PD.yIsDate or PD.xIsString or PD.yIsString for PD in PDs]):
+            Error(self,'2D binning only works with numerical values.')
+            return
+        self._GUI2Data()
+        PD = PDs[0]
+        z  = PDs[1].y0 if len(PDs)==2 else None
+        try:
+            x1Bins, x2Bins, M = bin2D_plot(PD.x0, PD.y0, z, self.data)
+        except Exception as e:
+            Error(self, 'Binning failed:\n\n'+e.args[0])
+            return
+
+        # Drawn as an image, replacing the curves
+        ax = self.parent.fig.axes[0]
+        ax.clear()
+        im = ax.pcolormesh(x1Bins, x2Bins, M.T, shading='flat')
+        label = 'Count' if z is None else PDs[1].sy
+        if self.colorbar is not None and self.colorbar.ax in self.parent.fig.axes:
+            # Reusing the colorbar, otherwise the axes would shrink at each plot
+            self.colorbar.update_normal(im)
+            self.colorbar.set_label(label)
+        else:
+            self.colorbar = self.parent.fig.colorbar(im, ax=ax, label=label)
+        ax.set_xlabel(PD.sx)
+        ax.set_ylabel(PD.sy)
+        self.parent.canvas.draw()
+
+    def _removeColorbar(self):
+        if self.colorbar is not None and self.colorbar.ax in self.parent.fig.axes:
+            self.colorbar.remove()
+        self.colorbar = None
+
+    def destroy(self,event=None):
+        bPlot2D = self.colorbar is not None
+        self._removeColorbar()
+        super(BinningToolPanel,self).destroy()
+        if bPlot2D:
+            self.parent.load_and_draw() # Restoring the curves replaced by the 2D plot
+
     def onClear(self,event=None):
+        self._removeColorbar()
         self.parent.load_and_draw() # Data will change
         # Update Table list
         self.updateTabList()
@@ -251,6 +308,10 @@ To bin perform the following step:
 
 - Click on one of the following buttons:
    - Plot: will display the binned data on the figure
+   - Plot 2D: will display, as an image, the number of values in each (x,y) bin when 
+          one signal is selected, or the average of the second signal in each bin of
+          (x, first signal) when two signals are selected. The y range is the range 
+          of the first signal, divided in "#bins y" bins.
    - Apply: will perform the binning on the fly for all new plots
            (click on Clear to stop applying)
    - Add: will create new table(s) with biined values for all 
@@ -270,14 +331,30 @@ def bin_plot(x, y, opts):
     x_new, y_new = bin_signal(x, y, xbins=xBins)
     return x_new, y_new
 
+def bin2D_plot(x1, x2, y, opts):
+    """ 2D binning on (x1, x2): count, or mean of y if provided (see tools.stats.bin2D_stats) """
+    from pydatview.tools.stats import bin2D_stats
+    x1Bins = np.linspace(opts['xMin'], opts['xMax'], opts['nBins']+1)
+    if x1Bins[0]>x1Bins[1]:
+        raise Exception('xmin must be lower than xmax')
+    x2Bins = np.linspace(np.nanmin(x2), np.nanmax(x2), opts['nBins2']+1)
+    M = bin2D_stats(x1, x2, x1Bins, x2Bins, y=y, stats='count' if y is None else 'mean')
+    return x1Bins, x2Bins, M
+
 def bin_tab(tab, iCol, colName, opts, bAdd=True):
     # TODO, make it such as it's only handling a dataframe instead of a table
-    from pydatview.tools.stats import bin_DF
-    colName = tab.data.columns[iCol-1]
+    from pydatview.tools.stats import bin_columns
+    colNames = list(tab._frame.columns)
+    colName = colNames[iCol-1]
     error=''
     xBins = np.linspace(opts['xMin'], opts['xMax'], opts['nBins']+1)
 #     try:
-    df_new =bin_DF(tab.data, xbins=xBins, colBin=colName)
+    # Only the numerical columns are read (lazy tables are not materialized)
+    I = [i for i in range(tab.nCols) if tab._dtype(i).kind in 'biuf']
+    if iCol-1 not in I:
+        raise Exception('Error: the column `{}` is not numerical'.format(colName))
+    x = tab._column(iCol-1).values
+    df_new = bin_columns(x, [colNames[i] for i in I], [tab._column(i).values for i in I], xBins, stats=('mean',))['mean']
     # Setting bin column as first columns
     colNames = list(df_new.columns.values)
     colNames.remove(colName)
@@ -300,6 +377,7 @@ _DEFAULT_DICT={
     'xMin':None, 
     'xMax':None, 
     'nBins':50, 
+    'nBins2':50, 
     'dx':0, 
     'applyCallBack':bin_plot,
     'selectionChangeCallBack':None,
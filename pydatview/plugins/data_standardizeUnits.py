@@ -22,17 +22,21 @@ def changeUnits(tab, flavor='SI'):
     NOTE: it relies on the Table class, which may change interface in the future..
     """
     if flavor=='WE':
-        for i, colname in enumerate(tab.columns):
-            colname, tab.data.iloc[:,i] = change_units_to_WE(colname, tab.data.iloc[:,i])
-            tab.columns[i]      = colname # TODO, use a dataframe everywhere..
-        tab.data.columns = tab.columns
+        change = change_units_to_WE
     elif flavor=='SI':
-        for i, colname in enumerate(tab.columns):
-            colname, tab.data.iloc[:,i] = change_units_to_SI(colname, tab.data.iloc[:,i])
-            tab.columns[i]      = colname # TODO, use a dataframe everywhere..
-        tab.data.columns = tab.columns
+        change = change_units_to_SI
     else:
         raise NotImplementedError(flavor)
+    df = tab.data
+    # NOTE: positional names, so that the columns are replaced (not modified in place, the arrays
+    #       may be shared with derived tables) with df[i]=, isetitem requires pandas>=1.5
+    df.columns = range(df.shape[1])
+    for i, colname in enumerate(tab.columns):
+        colname, values = change(colname, df[i])
+        df[i] = values
+        tab.columns[i]      = colname # TODO, use a dataframe everywhere..
+    df.columns = tab.columns
+    tab.dataModified()
 
 
 def change_units_to_WE(s, c):
@@ -54,7 +58,7 @@ def change_units_to_WE(s, c):
     if u in scalings.keys():
         scale, new_unit = scalings[u]
         s = svar+'['+new_unit+']'
-        c *= scale
+        c = c*scale
     return s, c
 
 def change_units_to_SI(s, c):
@@ -77,7 +81,7 @@ def change_units_to_SI(s, c):
     if u in scalings.keys():
         scale, new_unit = scalings[u]
         s = svar+'['+new_unit+']'
-        c *= scale
+        c = c*scale
     return s, c
 
 
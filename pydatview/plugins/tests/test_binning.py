@@ -0,0 +1,25 @@
+import unittest
+import numpy as np
+import pandas as pd
+try:
+    from pydatview.plugins.data_binning import bin_tab
+except ImportError: # wx not installed
+    bin_tab = None
+
+@unittest.skipIf(bin_tab is None, 'wx not installed')
+class TestBinning(unittest.TestCase):
+
+    def test_bin_tab(self):
+        from pydatview.Tables import Table
+        from pydatview.columnstore import DataFrameColumnStore
+        df = pd.DataFrame(data={'Time_[s]':np.arange(10.), 'ColA_[-]':np.arange(10.)*2, 'Label':list('abcdefghij')})
+        # Lazy tables are not converted to dataframes, only the numerical columns are read
+        tab = Table(data=DataFrameColumnStore(df))
+        df_new, name = bin_tab(tab, 1, 'Time', {'xMin':0, 'xMax':10, 'nBins':5})
+        self.assertTrue(tab.isLazy)
+        self.assertEqual(list(df_new.columns), ['Time_[s]', 'ColA_[-]', 'Counts'])
+        np.testing.assert_almost_equal(df_new['ColA_[-]'].values, [3, 7, 11, 15, 18])
+
+
+if __name__ == '__main__':
+    unittest.main()
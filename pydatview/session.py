@@ -0,0 +1,47 @@
+"""
+Session files
+
+A session stores the list of tables and the state of the GUI, so that the same view can be
+restored later (see TableList.saveSession and TableList.loadSession).
+ - Tables read from files are stored by reference (filename and file format), together with
+   their formula columns and mask, so that the formulas and the mask are not evaluated again.
+ - Derived tables (masked, resampled, filtered, binned, etc.), that have no file, are stored
+   entirely. Tables read from files can also be stored entirely (option embedSources), in
+   which case the files are not read again.
+
+The file is a npz file (uncompressed, fast to read and write) with the following arrays:
+   __session__       : json string with the description of the session (tables, GUI state)
+   <k>/data/<j>      : values of column j of table k, for tables stored entirely
+   <k>/formula/<pos> : values of the formula column at position pos of table k
+   <k>/mask          : mask of table k
+"""
+import json
+import numpy as np
+try:
+    from .export import _npzArray
+except:
+    from export import _npzArray
+
+SESSION_EXTENSION = '.pdvsession'
+SESSION_VERSION   = 1
+
+
+def writeSession(filename, meta, arrays):
+    """ Write a session file, meta: json serializable dict, arrays: dict of arrays """
+    data = dict([(k, _npzArray(v)) for k,v in arrays.items()])
+    meta['version'] = SESSION_VERSION
+    data['__session__'] = np.array(json.dumps(meta))
+    with open(filename, 'wb') as f: # NOTE: a file object, np.savez would append .npz to the filename
+        np.savez(f, **data)
+
+
+def readSession(filename):
+    """ Read a session file, returns: meta, arrays (see writeSession) """
+    with np.load(filename, allow_pickle=False) as data:
+        if '__session__' not in data.files:
+            raise Exception('Error: not a pyDatView session file: {}'.format(filename))
+        meta   = json.loads(str(data['__session__']))
+        arrays = dict([(k, data[k]) for k in data.files if k!='__session__'])
+    if meta.get('version', 0)>SESSION_VERSION:
+        raise Exception('Error: the session file was written by a more recent version of pyDatView: {}'.format(filename))
+    return meta, arrays
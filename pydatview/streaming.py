@@ -0,0 +1,104 @@
+"""
+Streaming of large delimited text files
+
+The file is parsed in chunks of rows with pandas. The first chunk gives the columns and
+a first preview of the data, the following chunks are returned as arrays, to be appended
+to a GrowableColumnStore (see columnstore.py) by the consumer.
+Only files with a single header line followed by numeric data are supported, other files
+are read with the regular file readers.
+"""
+import os
+import numpy as np
+import pandas as pd
+
+# Extensions of delimited text files that can be streamed
+STREAM_EXTENSIONS = ['.csv', '.txt', '.dat']
+# Names of the weio file formats that can be streamed (None: auto-detection)
+STREAM_FORMATS = [None, 'CSV file']
+
+
+class StreamNotSupportedError(Exception):
+    pass
+
+
+def detectSeparator(line):
+    """ Separator of a line of a delimited file """
+    for sep in [',', ';', '\t']:
+        if sep in line:
+            return sep
+    return r'\s+'
+
+
+def isStreamable(filename, formatName=None, minSizeMB=200):
+    """ True if the file is a delimited text file large enough to be streamed """
+    if formatName not in STREAM_FORMATS:
+        return False
+    if os.path.splitext(filename)[1].lower() not in STREAM_EXTENSIONS:
+        return False
+    try:
+        return os.path.getsize(filename) >= minSizeMB*1024**2
+    except OSError:
+        return False
+
+
+class CSVStream(object):
+    """
+    Read a delimited file in chunks.
+      - first: dataframe of the first chunk
+      - iterating on the object returns the next chunks as 2d float arrays
+    """
+    def __init__(self, filename, chunkRows=200000):
+        self.filename = filename
+        self.size     = os.path.getsize(filename)
+        with open(filename, 'r', errors='replace') as f:
+            header = f.readline()
+        sep = detectSeparator(header)
+        self._fid    = open(filename, 'rb')
+        try:
+            self._reader = pd.read_csv(self._fid, sep=sep, chunksize=chunkRows, skipinitialspace=True)
+            self.first   = next(self._reader)
+        except Exception as e:
+            self.close()
+            raise StreamNotSupportedError('The file could not be parsed: {}'.format(e))
+        if len(self.first)==0 or not all([np.issubdtype(dt, np.number) for dt in self.first.dtypes]):
+            self.close()
+            raise StreamNotSupportedError('Only files with a single header line and numeric data are supported')
+        self.first.columns = [str(c).strip() for c in self.first.columns]
+        self.columns = list(self.first.columns)
+        self.nFirst  = len(self.first)
+
+    @property
+    def bytesRead(self):
+        try:
+            return min(self._fid.tell(), self.size)
+        except (ValueError, OSError):
+            return self.size
+
+    def estimateRows(self):
+        """ Estimate of the number of rows of the file, based on the first chunk """
+        nBytes = self.bytesRead
+        if nBytes<=0:
+            return self.nFirst
+        return int(self.nFirst*self.size/nBytes)+1
+
+    def __iter__(self):
+        try:
+            for df in self._reader:
+                if df.shape[1]!=len(self.columns):
+                    raise Exception('Error: inconsistent number of columns in file {}'.format(self.filename))
+                yield df.apply(pd.to_numeric, errors='coerce').values.astype(float)
+        finally:
+            self.close()
+
+    def close(self):
+        try:
+            self._fid.close()
+        except:
+            pass
+
+    def __repr__(self):
+        s='<CSVStream object>:\n'
+        s+=' - filename : {}\n'.format(self.filename)
+        s+=' - columns  : {}\n'.format(len(self.columns))
+        s+=' - progress : {:.1f}/{:.1f} MB\n'.format(self.bytesRead/1024**2, self.size/1024**2)
+        return s
@@ -61,10 +61,17 @@ def multiInterp(x, xp, fp, extrap='bounded'):
       - fp : array ( nval, np), matrix values to be interpolated
     """
     # Sanity
-    x   = np.asarray(x)
-    xp  = np.asarray(xp)
     assert fp.shape[1]==len(xp), 'Second dimension of fp should have the same length as xp'
+    return applyInterpPlan(interpPlan(x, xp, extrap=extrap), fp)
 
+def interpPlan(x, xp, extrap='bounded'):
+    """ 
+    Indices and weights used to interpolate from `xp` to `x` (see multiInterp)
+    The plan depends only on x and xp, and can be applied to any matrix of values (see applyInterpPlan)
+    returns: jBef, jAft, dd
+    """
+    x   = np.asarray(x)
+    xp  = np.asarray(xp)
     j   = np.searchsorted(xp, x) - 1
     dd  = np.zeros(len(x))
     bOK = np.logical_and(j>=0, j< len(xp)-1)
@@ -87,9 +94,34 @@ def multiInterp(x, xp, fp, extrap='bounded'):
         dd[~bOK] = np.nan
     else:
         raise NotImplementedError()
+    return jBef, jAft, dd
 
+def applyInterpPlan(plan, fp):
+    """ Interpolate all the columns of a matrix `fp` ( nval, np) using a plan from interpPlan """
+    jBef, jAft, dd = plan
     return (1 - dd) * fp[:,jBef] + fp[:,jAft] * dd
 
+_INTERP_PLANS = [] # (key, xp, x, extrap, plan), most recently used last
+def cachedInterpPlan(x, xp, extrap='bounded', cacheSize=8):
+    """ 
+    Same as interpPlan, but plans are kept in a cache, so that tables and columns sharing 
+    the same x values (e.g. a common time axis) are interpolated with the same plan.
+    """
+    x   = np.asarray(x)
+    xp  = np.asarray(xp)
+    if len(x)==0 or len(xp)==0:
+        return interpPlan(x, xp, extrap=extrap)
+    key = (len(xp), len(x), xp[0], xp[-1], x[0], x[-1], extrap) # quick check before comparing the values
+    for k, entry in enumerate(_INTERP_PLANS):
+        if entry[0]==key and np.array_equal(entry[1], xp) and np.array_equal(entry[2], x):
+            _INTERP_PLANS.append(_INTERP_PLANS.pop(k))
+            return entry[4]
+    plan = interpPlan(x, xp, extrap=extrap)
+    _INTERP_PLANS.append((key, xp.copy(), x.copy(), extrap, plan))
+    if len(_INTERP_PLANS)>cacheSize:
+        _INTERP_PLANS.pop(0)
+    return plan
+
 def interpArray(x, xp, fp, extrap='bounded'):
     """ 
     Interpolate all the columns of a matrix `fp` based on one new value `x`
@@ -135,8 +167,8 @@ def resample_interp(x_old, x_new, y_old=None, df_old=None):
         #df_new = df_new.reindex(df_new.index | x_new)
         #df_new = df_new.interpolate().loc[x_new]
         #df_new = df_new.reset_index()
-        # --- Method 2 interp storing dx
-        data_new=multiInterp(x_new, x_old, df_old.values.T)
+        # --- Method 2 interp storing dx, the plan is shared by the tables with the same x values
+        data_new=applyInterpPlan(cachedInterpPlan(x_new, x_old), df_old.values.T)
         df_new = pd.DataFrame(data=data_new.T, columns=df_old.columns.values)
         return x_new, df_new
 
@@ -144,6 +176,99 @@ def resample_interp(x_old, x_new, y_old=None, df_old=None):
         return x_new, np.interp(x_new, x_old, y_old)
 
 
+def binAverage(x, columns, dx):
+    """ 
+    Average of the values within uniform bins of x: [x0+k dx, x0+(k+1) dx[, x0 being the smallest value of x 
+    (same bins as pandas' resample, x in seconds with a nanosecond resolution).
+    NaN values are ignored, the mean of empty bins is NaN (see fillGaps).
+    INPUTS:
+      - x      : array ( n ), e.g. time
+      - columns: list of arrays ( n ), values averaged
+      - dx     : bin width
+    returns: x_bins, M_bins: mean of x and of the columns in each bin, M_bins: array ( nBins x nCols)
+    """
+    x = np.asarray(x, dtype=float)
+    b = np.isfinite(x)
+    if not np.all(b):
+        x = x[b]
+        columns = [np.asarray(v)[b] for v in columns]
+    if len(x)==0:
+        return np.zeros(0), np.zeros((0, len(columns)))
+    # Integer bin indices, computed in nanoseconds to avoid rounding issues at the bin edges
+    xi     = np.round(x*1e9).astype(np.int64)
+    dxi    = max(int(round(dx*1e9)), 1)
+    bins   = (xi - xi.min())//dxi
+    nBins  = int(bins.max())+1
+    # The bin indices and counts are shared by all columns
+    counts = np.bincount(bins, minlength=nBins)
+    M_bins = np.empty((nBins, len(columns)))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_bins = np.bincount(bins, weights=x, minlength=nBins)/counts
+        for j, v in enumerate(columns):
+            v   = np.asarray(v, dtype=float)
+            nan = np.isnan(v)
+            if np.any(nan):
+                # NaN values are not counted
+                M_bins[:,j] = np.bincount(bins[~nan], weights=v[~nan], minlength=nBins)/np.bincount(bins[~nan], minlength=nBins)
+            else:
+                M_bins[:,j] = np.bincount(bins, weights=v, minlength=nBins)/counts
+    return x_bins, M_bins
+
+def fillGaps(M):
+    """ 
+    Linear interpolation of the NaN values of a uniformly sampled signal (same as pandas' interpolate):
+    NaN values before the first valid value are kept, NaN values after the last valid value are replaced by it.
+    M: array ( n ) or ( n x nCols)
+    """
+    if M.ndim==2:
+        J = np.where(np.any(np.isnan(M), axis=0))[0]
+        if len(J)>0:
+            M = M.copy()
+            for j in J:
+                M[:,j] = fillGaps(M[:,j])
+        return M
+    b = np.isnan(M)
+    if not np.any(b) or np.all(b):
+        return M
+    k = np.arange(len(M))
+    M = M.copy()
+    M[b] = np.interp(k[b], k[~b], M[~b], left=np.nan)
+    return M
+
+def findValues(x, values, tol=1e-3):
+    """ Indices of the elements of x that are within tol of one of the values (sorted lookup) """
+    x      = np.asarray(x).ravel()
+    values = np.asarray(values, dtype=float).ravel()
+    I      = np.argsort(x, kind='stable')
+    xs     = x[I]
+    iStart = np.searchsorted(xs, values-tol, side='right') # first index with xs > value-tol
+    iEnd   = np.searchsorted(xs, values+tol, side='left')  # last index+1 with xs < value+tol
+    b      = iEnd>iStart
+    # Union of the ranges [iStart, iEnd) 
+    delta  = np.zeros(len(x)+1, dtype=int)
+    np.add.at(delta, iStart[b],  1)
+    np.add.at(delta, iEnd[b]  , -1)
+    return np.sort(I[np.cumsum(delta[:-1])>0])
+
+def samplerRows(x_old, sampDict):
+    """ 
+    Rows kept by the samplers that select rows of the data ('Every n': slice, 'Remove': indices),
+    None for the samplers that interpolate the data
+    """
+    param = np.asarray(sampDict['param']).ravel()
+    if sampDict['name']=='Every n':
+        if len(param)==0:
+            raise Exception('Error: provide value for n')
+        n = int(param[0])
+        if n==0:
+            raise Exception('Error: |n| should be at least 1')
+        return slice(None, None, n)
+    elif sampDict['name']=='Remove':
+        if len(param)==0:
+            raise Exception('Error: provide a list of values to remove')
+        return np.delete(np.arange(len(x_old)), findValues(x_old, param, tol=1e-3))
+    return None
+
 def applySamplerDF(df_old, x_col, sampDict):
     x_old=df_old[x_col].values
     x_new, df_new =applySampler(x_old, y_old=None, sampDict=sampDict, df_old=df_old)
@@ -168,15 +293,12 @@ def applySampler(x_old, y_old, sampDict, df_old=None):
         return resample_interp(x_old, x_new, y_old, df_old)
 
     elif sampDict['name']=='Remove':
-        I=[]
-        if len(param)==0:
-            raise Exception('Error: provide a list of values to remove')
-        for d in param:
-            Ifound= np.where(np.abs(x_old-d)<1e-3)[0]
-            if len(Ifound)>0:
-                I+=list(Ifound.ravel())
-        x_new=np.delete(x_old,I)
-        return resample_interp(x_old, x_new, y_old, df_old)
+        I = samplerRows(x_old, sampDict)
+        x_new=np.asarray(x_old)[I]
+        if df_old is not None:
+            return x_new, df_old.iloc[I,:].reset_index(drop=True)
+        if y_old is not None:
+            return x_new, np.asarray(y_old)[I]
 
     elif sampDict['name']=='Delta x':
         if len(param)==0:
@@ -186,17 +308,12 @@ def applySampler(x_old, y_old, sampDict, df_old=None):
         return resample_interp(x_old, x_new, y_old, df_old)
 
     elif sampDict['name']=='Every n':
-        if len(param)==0:
-            raise Exception('Error: provide value for n')
-        n = int(param[0])
-        if n==0:
-            raise Exception('Error: |n| should be at least 1')
-
-        x_new=x_old[::n]
+        I = samplerRows(x_old, sampDict)
+        x_new=x_old[I]
         if df_old is not None:
-            return x_new, (df_old.copy()).iloc[::n,:]
+            return x_new, (df_old.copy()).iloc[I,:]
         if y_old is not None:
-            return x_new, y_old[::n]
+            return x_new, y_old[I]
 
     elif sampDict['name'] == 'Time-based':
         if len(param) == 0:
@@ -205,17 +322,17 @@ def applySampler(x_old, y_old, sampDict, df_old=None):
         if sample_time <= 0:
             raise Exception('Error: sample time must be positive')
 
-        time_index = pd.TimedeltaIndex(x_old, unit="S")
-        x_new = pd.Series(x_old, index=time_index).resample("{:f}S".format(sample_time)).mean().interpolate().values
-
+        x_old = np.asarray(x_old, dtype=float)
         if df_old is not None:
-            df_new = df_old.set_index(time_index, inplace=False).resample("{:f}S".format(sample_time)).mean()
-            df_new = df_new.interpolate().reset_index(drop=True)
-            return x_new, df_new
+            # Numerical columns only (as with pandas resample), averaged one at a time without copying the dataframe
+            I = [i for i,t in enumerate(df_old.dtypes) if t.kind in 'biuf']
+            x_new, M = binAverage(x_old, [df_old.iloc[:,i].values for i in I], sample_time)
+            df_new = pd.DataFrame(data=fillGaps(M), columns=df_old.columns[I])
+            return fillGaps(x_new), df_new
         if y_old is not None:
-            y_new = pd.Series(y_old, index=time_index).resample("{:f}S".format(sample_time)).mean()
-            y_new = y_new.interpolate().values
-            return x_new, y_new
+            x_new, M = binAverage(x_old, [y_old], sample_time)
+            return fillGaps(x_new), fillGaps(M[:,0])
+        return fillGaps(binAverage(x_old, [], sample_time)[0]), None
 
     else:
         raise NotImplementedError('{}'.format(sampDict))
@@ -236,40 +353,55 @@ def applySampler(x_old, y_old, sampDict, df_old=None):
 def moving_average(a, n=3) :
     """ 
     perform moving average, return a vector of same length as input
+    For a 2D array, each column is averaged (along axis 0)
 
     NOTE: also in kalman.filters
     """
-    a   = a.ravel()
-    a   = np.concatenate(([a[0]]*(n-1),a)) # repeating first values
-    ret = np.cumsum(a, dtype = float)
+    a   = np.asarray(a)
+    if a.ndim!=2:
+        a = a.ravel()
+    a   = np.concatenate((np.repeat(a[:1], n-1, axis=0), a), axis=0) # repeating first values
+    ret = np.cumsum(a, axis=0, dtype = float)
     ret[n:] = ret[n:] - ret[:-n]
     ret=ret[n - 1:] / n
     return ret
 
+def _lfilter(b, a, y, zi):
+    """ IIR filter along axis 0, zi: initial state of shape (1, ...) """
+    from scipy.signal import lfilter
+    # NOTE: lfilter is significantly faster along the last axis
+    y_filt, _ = lfilter(b, a, y.T, axis=-1, zi=zi.T)
+    return y_filt.T
+
 def lowpass1(y, dt, fc=3) :
     """ 
     1st order low pass filter
+        y_filt[i] = alpha*y[i] + (1-alpha)*y_filt[i-1],  y_filt[0]=y[0]
+    For a 2D array, each column is filtered (along axis 0)
     """
+    y = np.asarray(y, dtype=float)
     tau=1/(2*np.pi*fc)
     alpha=dt/(tau+dt)
-    y_filt=np.zeros(y.shape)
-    y_filt[0]=y[0]
-    for i in np.arange(1,len(y)):
-        y_filt[i]=alpha*y[i] + (1-alpha)*y_filt[i-1]
-    return y_filt
+    if len(y)==0:
+        return y.copy()
+    zi = (1-alpha)*y[:1] # initial state such that y_filt[0]=y[0]
+    return _lfilter([alpha], [1, alpha-1], y, zi)
 
 def highpass1(y, dt, fc=3) :
     """ 
     1st order high pass filter
+        y_filt[i] = alpha*y_filt[i-1] + alpha*(y[i]-y[i-1]),  y_filt[0]=0
+    The mean of the signal is kept. For a 2D array, each column is filtered (along axis 0)
     """
+    y = np.asarray(y, dtype=float)
     tau=1/(2*np.pi*fc)
     alpha=tau/(tau+dt)
-    y_filt=np.zeros(y.shape)
-    y_filt[0]=0
-    for i in np.arange(1,len(y)):
-        y_filt[i]=alpha*y_filt[i-1] + alpha*(y[i]-y[i-1])
-    m0=np.mean(y)
-    m1=np.mean(y_filt)
+    if len(y)==0:
+        return y.copy()
+    zi = -alpha*y[:1] # initial state such that y_filt[0]=0
+    y_filt = _lfilter([alpha, -alpha], [1, -alpha], y, zi)
+    m0=np.mean(y, axis=0)
+    m1=np.mean(y_filt, axis=0)
     y_filt+=m0-m1
     return y_filt
 
@@ -287,15 +419,33 @@ def applyFilter(x, y, filtDict):
         raise NotImplementedError('{}'.format(filtDict))
 
 def applyFilterDF(df_old, x_col, options):
-    """ apply filter on a dataframe """
-    # Brute force loop
-    df_new = df_old.copy()
-    x = df_new[x_col]
-    for (colName, colData) in df_new.iteritems():
-        if colName != x_col:
-            df_new[colName] = applyFilter(x, colData, options)
+    """ 
+    apply filter on a dataframe 
+    All numerical columns (except x_col) are filtered at once, as a 2D array. 
+    Other columns are unchanged.
+    """
+    iX = list(df_old.columns).index(x_col)
+    filtered = filterColumns(lambda i: df_old.iloc[:,i].values, df_old.dtypes, iX, options)
+    values = [filtered[i] if i in filtered else df_old.iloc[:,i].values for i in range(df_old.shape[1])]
+    df_new = pd.DataFrame(data=dict(zip(range(len(values)), values)), index=df_old.index)
+    df_new.columns = df_old.columns
     return df_new
 
+def filterColumns(getColumn, dtypes, iX, options):
+    """ 
+    Filtered values of the numerical columns of a table, filtered at once as a 2D array (see applyFilterDF)
+      - getColumn: function(i) returning the values of column i, only the x column and the columns filtered are read
+      - dtypes: dtypes of the columns
+      - iX: position of the x column, not filtered
+    returns: dict {i: filtered values of column i}
+    """
+    I = [i for i,t in enumerate(dtypes) if i!=iX and t.kind in 'biuf']
+    if len(I)==0:
+        return {}
+    x = np.asarray(getColumn(iX))
+    Y = applyFilter(x, np.column_stack([np.asarray(getColumn(i), dtype=float) for i in I]), options)
+    return dict([(i, Y[:,k]) for k,i in enumerate(I)])
+
 
 # --------------------------------------------------------------------------------}
 # ---  
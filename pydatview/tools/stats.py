@@ -164,32 +164,167 @@ def pdf_sns(y,nBins=50):
 # --------------------------------------------------------------------------------}
 # --- Binning 
 # --------------------------------------------------------------------------------{
+def bin_index(x, xbins):
+    """ 
+    Index of the bin ]xbins[i], xbins[i+1]] (same as pd.cut) containing each value of x
+    returns: index (-1 for values outside the bins or NaN)
+    """
+    nBins = len(xbins)-1
+    ib    = np.digitize(np.asarray(x), xbins, right=True)-1
+    ib[ib>=nBins] = -1
+    return ib
+
+BIN_STATS = ('count', 'mean', 'std', 'min', 'max')
+
+def bin_stats(x, columns, xbins, stats=BIN_STATS):
+    """ 
+    Statistics of columns within bins of x (using np.digitize and np.bincount)
+    The bins are ]xbins[i], xbins[i+1]] (same as pd.cut), values of x outside the bins are ignored.
+    NaN values are not included in the statistics of their column.
+    The bin indices and counts are computed once and shared by all the columns.
+    INPUTS:
+      - x      : array ( n ), values used for binning
+      - columns: list of nCols arrays ( n ), values
+      - xbins  : end points delimiting the bins, array of ascending x values
+      - stats  : statistics computed, among 'count', 'mean', 'std', 'min', 'max'
+    OUTPUTS:
+      - dict with one array ( nBins x nCols ) per statistic, and 'counts': array ( nBins ), number of x values in each bin
+    NOTE: the columns are processed one at a time with the shared bin indices, which is faster 
+          than a single bincount on all the columns (offset indices), and uses less memory.
+    """
+    for s in stats:
+        if s not in BIN_STATS:
+            raise Exception('Error: unknown statistic `{}`, available: {}'.format(s, ', '.join(BIN_STATS)))
+    xbins  = np.asarray(xbins)
+    nBins  = len(xbins)-1
+    nCols  = len(columns)
+    ib     = bin_index(x, xbins)
+    bOK    = ib>=0
+    if not np.all(bOK):
+        ib      = ib[bOK]
+        columns = [np.asarray(v)[bOK] for v in columns]
+    counts = np.bincount(ib, minlength=nBins)
+    out    = {'counts':counts}
+    for s in stats:
+        out[s] = np.full((nBins, nCols), np.nan)
+    if 'min' in stats or 'max' in stats:
+        # Rows sorted by bin, the min and max are reduced over the contiguous rows of each non empty bin
+        I      = np.argsort(ib, kind='stable')
+        nz     = counts>0
+        starts = (np.cumsum(counts)-counts)[nz]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for j, v in enumerate(columns):
+            v   = np.asarray(v, dtype=float)
+            nan = np.isnan(v)
+            if np.any(nan):
+                ibj, v = ib[~nan], v[~nan]
+                n = np.bincount(ibj, minlength=nBins)
+            else:
+                ibj, n = ib, counts
+            if 'count' in stats:
+                out['count'][:,j] = n
+            if 'mean' in stats or 'std' in stats:
+                mean = np.bincount(ibj, weights=v, minlength=nBins)/n
+                if 'mean' in stats:
+                    out['mean'][:,j] = mean
+                if 'std' in stats:
+                    # Deviation from the mean of the bin, unbiased estimator (same as pandas)
+                    std = np.sqrt(np.bincount(ibj, weights=(v-mean[ibj])**2, minlength=nBins)/(n-1))
+                    std[n<2] = np.nan
+                    out['std'][:,j] = std
+            if ('min' in stats or 'max' in stats) and len(starts)>0:
+                vs = np.asarray(columns[j], dtype=float)[I]
+                if 'min' in stats:
+                    out['min'][nz,j] = np.fmin.reduceat(vs, starts)
+                if 'max' in stats:
+                    out['max'][nz,j] = np.fmax.reduceat(vs, starts)
+    return out
+
+def bin2D_stats(x1, x2, x1bins, x2bins, y=None, stats='mean'):
+    """ 
+    Binning on a 2D grid (x1, x2), e.g. wind speed and azimuth, or cycle matrix.
+    The cells are indexed by i1*nBins2+i2, the counts and sums are computed with a single bincount.
+    INPUTS:
+      - x1, x2        : arrays ( n ), values used for binning
+      - x1bins, x2bins: end points delimiting the bins (see bin_index)
+      - y             : array ( n ), values averaged, NaN values are ignored
+      - stats         : 'count' (number of values in each cell) or 'mean' (mean of y in each cell)
+    OUTPUTS:
+      - M: array ( nBins1 x nBins2 ), NaN for empty cells if stats=='mean'
+    """
+    n1, n2 = len(x1bins)-1, len(x2bins)-1
+    i1  = bin_index(x1, x1bins)
+    i2  = bin_index(x2, x2bins)
+    bOK = np.logical_and(i1>=0, i2>=0)
+    if y is not None:
+        y   = np.asarray(y, dtype=float)
+        bOK = np.logical_and(bOK, ~np.isnan(y))
+    k      = i1[bOK]*n2 + i2[bOK]
+    counts = np.bincount(k, minlength=n1*n2).reshape(n1, n2)
+    if stats=='count':
+        return counts
+    elif stats=='mean':
+        if y is None:
+            raise Exception('Error: values are needed to compute the mean in each cell')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.bincount(k, weights=y[bOK], minlength=n1*n2).reshape(n1, n2)/counts
+    raise NotImplementedError(stats)
+
+def bin_columns(x, names, columns, xbins, stats=BIN_STATS):
+    """ 
+    Statistics of columns within bins of x, as dataframes (see bin_stats)
+    INPUTS:
+      - x      : array ( n ), values used for binning
+      - names  : names of the columns
+      - columns: list of numerical arrays ( n )
+      - xbins  : end points delimiting the bins, array of ascending x values
+      - stats  : statistics computed, among 'count', 'mean', 'std', 'min', 'max'
+    OUTPUTS:
+       dict of binned dataframes, one per statistic, with an additional column 'Counts' for 
+       the number of values in each bin, and the middle of the bins as index
+    """
+    xbins = np.asarray(xbins)
+    xmid  = (xbins[:-1]+xbins[1:])/2
+    out   = bin_stats(x, columns, xbins, stats=stats)
+    dfs   = {}
+    for s in stats:
+        df2 = pd.DataFrame(data=out[s], columns=names, index=pd.Index(xmid, name='Bin'))
+        df2['Counts'] = out['counts']
+        dfs[s] = df2
+    return dfs
+
+def bin_DF_stats(df, xbins, colBin, stats=BIN_STATS):
+    """ 
+    Several statistics of the numerical columns of a dataframe within bins, computed in one pass
+    (the bin indices are computed once)
+    INPUTS:
+      - df   : pandas dataframe (not modified)
+      - xBins: end points delimiting the bins, array of ascending x values)
+      - colBin: column name (string) of the dataframe, used for binning 
+      - stats: statistics computed, among 'count', 'mean', 'std', 'min', 'max'
+    OUTPUTS:
+       dict of binned dataframes, one per statistic (see bin_columns)
+    """
+    if colBin not in df.columns.values:
+        raise Exception('The column `{}` does not appear to be in the dataframe'.format(colBin))
+    I = [i for i,t in enumerate(df.dtypes) if t.kind in 'biuf']
+    return bin_columns(df[colBin].values, df.columns[I], [df.iloc[:,i].values for i in I], xbins, stats=stats)
+
 def bin_DF(df, xbins, colBin, stats='mean'):
     """ 
     Perform bin averaging of a dataframe
     INPUTS:
-      - df   : pandas dataframe
+      - df   : pandas dataframe (not modified)
       - xBins: end points delimiting the bins, array of ascending x values)
       - colBin: column name (string) of the dataframe, used for binning 
+      - stats: statistic of the values in each bin: 'mean', 'std', 'min', 'max' or 'count'
+               (see bin_DF_stats for several statistics)
     OUTPUTS:
-       binned dataframe, with additional columns 'Counts' for the number 
+       binned dataframe (numerical columns only), with additional columns 'Counts' for the number 
+       of values in each bin, and the middle of the bins as index
 
     """
-    if colBin not in df.columns.values:
-        raise Exception('The column `{}` does not appear to be in the dataframe'.format(colBin))
-    xmid      = (xbins[:-1]+xbins[1:])/2
-    df['Bin'] = pd.cut(df[colBin], bins=xbins, labels=xmid ) # Adding a column that has bin attribute
-    if stats=='mean':
-        df2       = df.groupby('Bin').mean()                     # Average by bin
-    elif stats=='std':
-        df2       = df.groupby('Bin').std()                     # std by bin
-    # also counting
-    df['Counts'] = 1
-    dfCount=df[['Counts','Bin']].groupby('Bin').sum()
-    df2['Counts'] = dfCount['Counts']
-    # Just in case some bins are missing (will be nan)
-    df2       = df2.reindex(xmid)
-    return df2
+    return bin_DF_stats(df, xbins, colBin, stats=(stats,))[stats]
 
 def bin_signal(x, y, xbins=None, stats='mean', nBins=None):
     """ 
@@ -206,9 +341,8 @@ def bin_signal(x, y, xbins=None, stats='mean', nBins=None):
         xmin, xmax = np.min(x), np.max(x)
         dx = (xmax-xmin)/nBins
         xbins=np.arange(xmin, xmax+dx/2, dx)
-    df = pd.DataFrame(data=np.column_stack((x,y)), columns=['x','y'])
-    df2 = bin_DF(df, xbins, colBin='x', stats=stats)
-    return df2['x'].values, df2['y'].values
+    out = bin_stats(x, [x, y], xbins, stats=(stats,))
+    return out[stats][:,0], out[stats][:,1]
 
 
 
@@ -220,7 +354,7 @@ def azimuthal_average_DF(df, psiBin=np.arange(0,360+1,10), colPsi='Azimuth_[deg]
     if tStart is not None:
         if colTime not in df.columns.values:
             raise Exception('The column `{}` does not appear to be in the dataframe'.format(colTime))
-        df=df[ df[colTime]>tStart].copy()
+        df=df[ df[colTime]>tStart]
 
     dfPsi= bin_DF(df, psiBin, colPsi, stats='mean')
     if np.any(dfPsi['Counts']<1):
@@ -237,7 +371,7 @@ def azimuthal_std_DF(df, psiBin=np.arange(0,360+1,10), colPsi='Azimuth_[deg]', t
     if tStart is not None:
         if colTime not in df.columns.values:
             raise Exception('The column `{}` does not appear to be in the dataframe'.format(colTime))
-        df=df[ df[colTime]>tStart].copy()
+        df=df[ df[colTime]>tStart]
 
     dfPsi= bin_DF(df, psiBin, colPsi, stats='std')
     if np.any(dfPsi['Counts']<1):
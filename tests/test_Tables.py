@@ -62,6 +62,438 @@ class TestTable(unittest.TestCase):
         self.assertEqual(ffname1, ffname2)
 
 
+    def test_load_files_parallel(self):
+        # --- Tables loaded with a pool of workers are returned in the input order
+        import tempfile
+        tmpdir = tempfile.mkdtemp()
+        files = []
+        for i in range(5):
+            f = os.path.join(tmpdir, 'file{:d}.csv'.format(i))
+            df = pd.DataFrame(data={'Time_[s]':np.arange(10), 'ColA_[-]':np.arange(10)*i})
+            df.to_csv(f, index=False)
+            files.append(f)
+        files.append(os.path.join(tmpdir, 'missing.csv'))
+        tablist = TableList()
+        warnList = tablist.load_tables_from_files(filenames=files, nWorkers=3)
+        self.assertEqual(len(warnList), 1)
+        self.assertEqual(tablist.filenames, files[:-1])
+        for i,tab in enumerate(tablist):
+            np.testing.assert_almost_equal(tab.data.iloc[:,1].values, np.arange(10)*i)
+
+    def test_reload_tail(self):
+        # --- Incremental reload reads only the rows appended to the file
+        import tempfile
+        f = os.path.join(tempfile.mkdtemp(), 'growing.csv')
+        df = pd.DataFrame(data={'Time_[s]':np.arange(5.), 'ColA_[-]':np.arange(5.)*2})
+        df.to_csv(f, index=False)
+        tablist = TableList()
+        tablist.load_tables_from_files(filenames=[f])
+        tab = tablist.get(0)
+        tab.addColumnByFormula('ColB', '{ColA}+1')
+        tab.applyMaskString('{Time}>=2', bAdd=False)
+        self.assertEqual(tab.reloadTail(), 0)
+        with open(f, 'a') as fid:
+            fid.write('5,10\n6,12\n7,1') # last line incomplete
+        self.assertTrue(tablist.reloadTail())
+        self.assertEqual(tab.nRows, 7)
+        np.testing.assert_almost_equal(tab.data['ColB'].values, np.arange(7)*2+1)
+        self.assertEqual(np.sum(tab.mask), 5)
+        with open(f, 'a') as fid:
+            fid.write('4\n')
+        self.assertEqual(tab.reloadTail(), 1)
+        np.testing.assert_almost_equal(tab.data['ColA_[-]'].values[-1], 14)
+        # Rows are appended to the buffers of a growable store
+        self.assertTrue(tab.isLazy)
+        self.assertEqual(tab._store.capacity, 10)
+        self.assertEqual(list(tab.columns), ['Time [s]', 'ColA [-]', 'ColB'])
+        # Integer columns are kept
+        fInt = os.path.join(os.path.dirname(f), 'int.csv')
+        pd.DataFrame(data={'Step_[-]':np.arange(3), 'Val_[-]':np.arange(3)*0.5}).to_csv(fInt, index=False)
+        tablist.load_tables_from_files(filenames=[fInt], bAdd=True)
+        tabInt = tablist.get(1)
+        with open(fInt, 'a') as fid:
+            fid.write('3,1.5\n')
+        self.assertEqual(tabInt.reloadTail(), 1)
+        self.assertEqual(tabInt._dtype(0), np.int64)
+        np.testing.assert_equal(tabInt.data['Step_[-]'].values, np.arange(4))
+        # Rewritten file requires a full reload
+        df.to_csv(f, index=False)
+        self.assertTrue(tab.reloadTail() is None)
+
+    def test_reload_file(self):
+        # --- Reloading a single file keeps the other tables, formulas and masks
+        import tempfile
+        tmpdir = tempfile.mkdtemp()
+        files = [os.path.join(tmpdir, 'f{}.csv'.format(i)) for i in range(3)]
+        for f in files:
+            pd.DataFrame(data={'Time_[s]':np.arange(5.), 'ColA_[-]':np.arange(5.)}).to_csv(f, index=False)
+        tablist = TableList()
+        tablist.load_tables_from_files(filenames=files)
+        tabs = tablist.getTabs()
+        tabs[1].addColumnByFormula('ColB', '{ColA}*2')
+        tabs[1].applyMaskString('{Time}>=1', bAdd=False)
+        pd.DataFrame(data={'Time_[s]':np.arange(8.), 'ColA_[-]':np.arange(8.)}).to_csv(files[1], index=False)
+        self.assertEqual(tablist.reloadFile(files[1]), '')
+        self.assertTrue(tablist.get(0) is tabs[0])
+        self.assertTrue(tablist.get(2) is tabs[2])
+        tab = tablist.get(1)
+        self.assertEqual(tab.filename, files[1])
+        self.assertEqual(tab.nRows, 8)
+        np.testing.assert_almost_equal(tab.data['ColB'].values, np.arange(8.)*2)
+        self.assertEqual(np.sum(tab.mask), 7)
+
+    def test_lazy_tables(self):
+        # --- Tables loaded from the file cache only read the columns used
+        import tempfile
+        from pydatview.filecache import FileCache, parquetAvailable
+        if not parquetAvailable():
+            return
+        tmpdir = tempfile.mkdtemp()
+        f = os.path.join(tmpdir, 'wide.csv')
+        df = pd.DataFrame(data=np.arange(50.).reshape(10,5), columns=['Time_[s]']+['C{}_[-]'.format(i) for i in range(4)])
+        df.to_csv(f, index=False)
+        for i in range(2): # miss, then hit
+            tablist = TableList()
+            tablist.setCache(FileCache(os.path.join(tmpdir, 'cache')), lazy=True)
+            tablist.load_tables_from_files(filenames=[f])
+            tab = tablist.get(0)
+            self.assertTrue(tab.isLazy)
+            self.assertEqual(tab.nRows, 10)
+            self.assertEqual(tab.columns, ['Time [s]','C0 [-]','C1 [-]','C2 [-]','C3 [-]'])
+            x,_,_,_ = tab.getColumn(3)
+            np.testing.assert_equal(x, df['C1_[-]'].values)
+            tab.addColumnByFormula('D', '{C0}+{C2}', 1)
+            tab.applyMaskString('{Time}>20', bAdd=False)
+            self.assertTrue(tab.isLazy)
+            self.assertEqual([tab._store.isLoaded(i) for i in range(6)], [True, True, True, True, True, False])
+            x,_,_,_ = tab.getColumn(2)
+            np.testing.assert_equal(x, (df['C0_[-]']+df['C2_[-]']).values[-5:])
+            # Full dataframe access materializes the table
+            self.assertEqual(tab.data.shape, (10,6))
+            self.assertFalse(tab.isLazy)
+
+    def test_format_cache(self):
+        # --- Files with the same signature reuse the format detected
+        import tempfile
+        from unittest import mock
+        from pydatview.formatcache import FormatCache
+        import pydatview.Tables as Tables
+        tmpdir = tempfile.mkdtemp()
+        files = [os.path.join(tmpdir, 'f{}.csv'.format(i)) for i in range(4)]
+        for i,f in enumerate(files):
+            pd.DataFrame(data={'Time_[s]':np.arange(5.)+i, 'ColA_[-]':np.arange(5.)}).to_csv(f, index=False)
+        fc = FormatCache()
+        for nWorkers, nDetect in [(2, 1), (1, 0)]:
+            with mock.patch.object(Tables.weio, 'detectFormat', wraps=Tables.weio.detectFormat) as detect:
+                tablist = TableList()
+                tablist.setFormatCache(fc)
+                warns = tablist.load_tables_from_files(filenames=files, nWorkers=nWorkers)
+                self.assertEqual(warns, [])
+                self.assertEqual(tablist.len(), 4)
+                self.assertEqual(detect.call_count, nDetect)
+        np.testing.assert_equal(tablist.get(3).data['Time_[s]'].values, np.arange(5.)+3)
+
+    def test_compact_storage(self):
+        # --- Single precision storage when the precision lost is acceptable
+        from pydatview.columnstore import DataFrameColumnStore
+        df = pd.DataFrame(data={'Step_[-]':np.arange(5.)+1e-12, 'Time_[s]':np.arange(5.)*0.1+1e-12,
+            'A_[-]':np.linspace(0,1,5), 'B_[-]':np.arange(5.)*1e-50, 'S_[-]':['a','b','a','b','a']})
+        Table.setCompactStorage(True, rtol=1e-6)
+        try:
+            for data in [df.copy(), DataFrameColumnStore(df)]:
+                tab = Table(data=data)
+                tab.getColumn(3)
+                dtypes = [tab._dtype(i) for i in range(5)]
+                self.assertEqual(dtypes[:4], [np.float64, np.float64, np.float32, np.float64])
+                self.assertTrue(isinstance(dtypes[4], pd.CategoricalDtype))
+                x, isString, isDate, c = tab.getColumn(5)
+                self.assertTrue(isString)
+                np.testing.assert_equal(x, df['S_[-]'].values)
+                x, _, _, _ = tab.getColumn(3)
+                np.testing.assert_almost_equal(x, df['A_[-]'].values, 6)
+        finally:
+            Table.setCompactStorage(False)
+        tab = Table(data=df.copy())
+        self.assertEqual(tab.data['A_[-]'].dtype, np.float64)
+
+    def test_type_inference(self):
+        n = 1000
+        s = np.array(['a']*n, dtype=object)
+        s[500] = 'b'
+        df = pd.DataFrame(data={'Time_[s]':np.arange(n, dtype=float),
+            'Date_[-]'  : np.array(['2018-09-{:02d}'.format(i%28+1) for i in range(n)], dtype=object),
+            'Num_[-]'   : np.array([str(i) for i in range(n)], dtype=object),
+            'Nan_[-]'   : np.array([None]*(n-1)+[1.5], dtype=object),
+            'Label_[-]' : s,
+            'Mixed_[-]' : np.array(['1']*(n-1)+['x'], dtype=object), # not found by the sample
+            })
+        tab = Table(data=df)
+        self.assertEqual(tab.data['Date_[-]'].dtype.kind, 'M')
+        self.assertEqual(tab.data['Num_[-]'].dtype.kind, 'i')
+        self.assertEqual(tab.data['Nan_[-]'].dtype, np.float64)
+        self.assertEqual(tab.data['Label_[-]'].dtype, object)
+        self.assertEqual(tab.data['Mixed_[-]'].dtype, object)
+        # Converted columns are not converted again
+        self.assertEqual(tab.convertTimeColumns(), {'string':['Label_[-]', 'Mixed_[-]']})
+        # Rows sampled
+        from pydatview.Tables import sampleIndices
+        I = sampleIndices(n, 100)
+        self.assertEqual((len(I), I[0], I[-1]), (100, 0, n-1))
+        np.testing.assert_equal(sampleIndices(n, 0), np.arange(n))
+
+    def test_streaming(self):
+        # --- Large delimited files are streamed, the table is created from the first rows
+        import tempfile
+        f = os.path.join(tempfile.mkdtemp(), 'large.csv')
+        df = pd.DataFrame(data={'Time_[s]':np.arange(25.), 'ColA_[-]':np.arange(25.)**2})
+        df.to_csv(f, index=False)
+        tablist = TableList()
+        tablist.setStreaming(minSizeMB=0, chunkRows=10)
+        (_, tabs, warn, _), = list(tablist.iterLoadFiles([f]))
+        tab = tabs[0]
+        self.assertTrue(tab.isStreaming)
+        self.assertEqual((tab.nRows, tab.columns), (10, ['Time [s]', 'ColA [-]']))
+        tab.addColumnByFormula('B', '{ColA}+1', -1)
+        tab.applyMaskString('{Time}>=5', bAdd=False)
+        self.assertEqual(tab.data.shape, (10,3)) # snapshot, the table keeps streaming
+        tab.readStream()
+        self.assertFalse(tab.isStreaming)
+        self.assertEqual(tab.nRows, 25)
+        np.testing.assert_equal(tab.data['B'].values, df['ColA_[-]'].values+1)
+        self.assertEqual(np.sum(tab.mask), 20)
+        # Synchronous loading reads the whole file
+        tablist.load_tables_from_files(filenames=[f])
+        self.assertEqual(tablist.get(0).nRows, 25)
+        self.assertFalse(tablist.get(0).isStreaming)
+
+    def test_scan_headers(self):
+        # --- Headers are read without loading the data, then only the common columns selected are loaded
+        import tempfile
+        tmpdir = tempfile.mkdtemp()
+        files = [os.path.join(tmpdir, 'sim{}.csv'.format(i)) for i in range(3)]
+        for i,f in enumerate(files):
+            df = pd.DataFrame(data={'Time_[s]':np.arange(4.+i), 'ColA_[-]':np.arange(4.+i)})
+            if i!=1:
+                df['ColB_[-]'] = 1.
+            df.to_csv(f, index=False)
+        tablist = TableList()
+        headers, warnList = tablist.scanHeaders(files, nWorkers=2)
+        self.assertEqual(warnList, [])
+        self.assertEqual([h.nRows for h in headers], [4, 5, 6])
+        self.assertEqual(tablist.len(), 0)
+        columns = TableList.commonColumns(headers)
+        self.assertEqual(columns, ['Time [s]', 'ColA [-]'])
+        tablist.load_tables_from_files(filenames=files, columns=columns[1:])
+        self.assertEqual([t.columns for t in tablist], [['ColA [-]']]*3)
+        np.testing.assert_equal(tablist.get(2).data['ColA_[-]'].values, np.arange(6.))
+
+    def test_share_columns(self):
+        # --- Identical columns of different tables are stored once, and never modified
+        time = np.linspace(0, 10, 101)
+        dfs  = [pd.DataFrame(data={'Time_[s]':time.copy(), 'A_[-]':np.sin(time)*i, 'B_[-]':np.ones(101)}) for i in range(3)]
+        tablist = TableList()
+        tablist.from_dataframes(dataframes=dfs, names=['t0','t1','t2'])
+        tablist.append(Table(data=pd.DataFrame(data={'Time_[s]':time+1})))
+        nSaved = tablist.shareColumns()
+        self.assertEqual(nSaved, 2*2*101*8) # 2 columns shared by 3 tables
+        x = [t.getColumn(1)[0] for t in tablist]
+        self.assertTrue(x[0].base is x[1].base and x[1].base is x[2].base) # Views of the same array
+        self.assertFalse(x[0].base.flags.writeable)
+        self.assertFalse(np.shares_memory(x[0], x[3]))
+        a = [t.getColumn(2)[0] for t in list(tablist)[:3]]
+        self.assertFalse(np.shares_memory(a[1], a[2]))
+        self.assertTrue(np.shares_memory(a[1], dfs[1]['A_[-]'].values)) # Columns not shared are not copied
+        # Tables loaded afterwards reuse the shared arrays
+        tablist.append(Table(data=dfs[0].copy()))
+        tablist.shareColumns(tabs=[tablist.get(4)], xOnly=True)
+        self.assertTrue(tablist.get(4).getColumn(1)[0].base is x[0].base)
+        self.assertFalse(tablist.get(4).getColumn(3)[0] is tablist.get(0).getColumn(3)[0])
+        # Copy-on-write
+        tab = tablist.get(1)
+        tab.data.iloc[0,0] = -1.
+        self.assertEqual(tab.data['Time_[s]'].values[0], -1.)
+        np.testing.assert_equal(tablist.get(0).getColumn(1)[0], time)
+
+    def test_memory_budget(self):
+        # --- Least recently used tables are evicted, and read again when used
+        import tempfile
+        from pydatview.filecache import parquetAvailable
+        if not parquetAvailable():
+            raise unittest.SkipTest('pyarrow not available')
+        spillDir = tempfile.mkdtemp()
+        dfs = [pd.DataFrame(data={'Time_[s]':np.arange(1000.), 'ColA_[-]':np.arange(1000.)*i}) for i in range(4)]
+        tablist = TableList()
+        tablist.from_dataframes(dataframes=dfs, names=['t0','t1','t2','t3'])
+        tablist.get(1).addColumnByFormula('B', '{ColA}*2', -1)
+        tablist.get(1).renameColumn(0, 'T [s]')
+        self.assertEqual(tablist.nbytes, 4*2*8000+8000)
+        for i in [3, 1, 2, 0]:
+            tablist.get(i).getColumn(1)
+        tablist.setMemoryBudget(5*8000/1024**2, spillDir=spillDir)
+        released = tablist.enforceMemoryBudget(keep=[3])
+        self.assertEqual(released, 3*8000+2*8000) # Tables 1 and 2 evicted, table 3 is selected
+        self.assertEqual(tablist.nbytes, 4*8000)
+        self.assertEqual(len(os.listdir(spillDir)), 2)
+        tab = tablist.get(1)
+        self.assertTrue(tab.isLazy)
+        self.assertEqual(tab.columns, ['T [s]', 'ColA [-]', 'B'])
+        np.testing.assert_equal(tab.getColumn(3)[0], np.arange(1000.)*2)
+        self.assertEqual(tablist.nbytes, 5*8000)
+        # Tables backed by a column store only release the columns read
+        self.assertEqual(tab.evict(spillDir), 8000)
+        del tab
+        tablist.clean()
+        import gc; gc.collect()
+        self.assertEqual(os.listdir(spillDir), [])
+
+    def test_export(self):
+        import tempfile
+        df1 = pd.DataFrame(data={'Time_[s]':np.arange(5.), 'Speed_[m/s]':np.arange(5.)**2, 'Label':list('abcde')})
+        df2 = pd.DataFrame(data={'Time_[s]':np.arange(3.), 'Force_[N]':np.ones(3)})
+        tablist = TableList()
+        tablist.from_dataframes(dataframes=[df1, df2], names=['tab1', 'tab2'])
+        with tempfile.TemporaryDirectory() as tmp:
+            # Single table, format from the extension
+            for ext in ['csv', 'parquet', 'feather', 'npz']:
+                filename = os.path.join(tmp, 'tab1.'+ext)
+                tablist.get(0).export(filename)
+                tabs = TableList()
+                tabs.load_tables_from_files(filenames=[filename])
+                self.assertEqual(tabs.get(0).columns, ['Time [s]', 'Speed [m/s]', 'Label'])
+                np.testing.assert_array_equal(tabs.get(0).data.values[:,1], df1.values[:,1])
+                self.assertEqual(list(tabs.get(0).data['Label']), list('abcde'))
+            # Several tables in one npz file
+            filename = os.path.join(tmp, 'all.npz')
+            self.assertEqual(tablist.exportTables(filename), [filename])
+            tabs = TableList()
+            tabs.load_tables_from_files(filenames=[filename])
+            self.assertEqual([n.split('|')[-1] for n in tabs.tabNames], ['tab1', 'tab2'])
+            np.testing.assert_array_equal(tabs.get(1).data.values, df2.values)
+            # Several tables in a directory, written in parallel
+            files = tablist.exportTables(os.path.join(tmp, 'dir'), fmt='feather', nWorkers=2)
+            self.assertEqual([os.path.basename(f) for f in files], ['tab1.feather', 'tab2.feather'])
+            tabs = TableList()
+            tabs.load_tables_from_files(filenames=files)
+            np.testing.assert_array_equal(tabs.get(1).data.values, df2.values)
+            # Files not written by pyDatView are left to weio, read failures are warnings
+            from pydatview.export import exportFileFormat
+            filename = os.path.join(tmp, 'plain.npz')
+            np.savez(filename, a=np.arange(3.))
+            self.assertTrue(exportFileFormat(filename=filename) is None)
+            filename2 = os.path.join(tmp, 'plain.parquet')
+            df2.to_parquet(filename2)
+            self.assertTrue(exportFileFormat(filename=filename2) is None)
+            self.assertEqual(exportFileFormat(filename=os.path.join(tmp, 'tab1.parquet')).name, 'pyDatView parquet file')
+            tabs = TableList()
+            warnList = tabs.load_tables_from_files(filenames=[filename], fileformats=[exportFileFormat(name='pyDatView npz file')])
+            self.assertEqual(len(warnList), 1)
+            self.assertTrue(warnList[0].startswith('Error: Wrong file format!'))
+            self.assertEqual(tabs.len(), 0)
+
+    def test_session(self):
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'data.csv')
+            pd.DataFrame(data={'Time_[s]':np.arange(10.), 'Speed_[m/s]':np.arange(10.)**2}).to_csv(filename, index=False)
+            tablist = TableList()
+            tablist.load_tables_from_files(filenames=[filename])
+            tab = tablist.get(0)
+            tab.addColumnByFormula('Double', '2*{Speed}')
+            tab.applyMaskString('{Time}>3', bAdd=False)
+            df_new, name_new = tab.applyMaskString('{Time}<5', bAdd=True)
+            tablist.from_dataframes(dataframes=[df_new], names=[name_new], bAdd=True)
+            tablist.get(1).active_name = 'derived'
+            sessionFile = os.path.join(tmp, 'test.pdvsession')
+            tablist.saveSession(sessionFile, gui={'tabSelected':[1]})
+
+            # Changing the file: formulas and mask are restored from the session, not recomputed
+            pd.DataFrame(data={'Time_[s]':np.arange(10.), 'Speed_[m/s]':np.zeros(10)}).to_csv(filename, index=False)
+            tabs = TableList()
+            gui, warnList = tabs.loadSession(sessionFile)
+            self.assertEqual(gui, {'tabSelected':[1]})
+            self.assertEqual(warnList, [])
+            self.assertEqual(tabs.tabNames, tablist.tabNames)
+            self.assertEqual(tabs.get(0).columns, ['Time [s]', 'Speed [m/s]', 'Double'])
+            self.assertEqual(tabs.get(0).formulas, [{'pos':3, 'formula':'2*{Speed}', 'name':'Double'}])
+            np.testing.assert_array_equal(tabs.get(0).data['Double'], 2*np.arange(10.)**2)
+            np.testing.assert_array_equal(tabs.get(0).mask, np.arange(10)>3)
+            self.assertEqual(tabs.get(0).maskString, '{Time}>3')
+            # Derived table stored entirely
+            self.assertEqual(tabs.get(1).active_name, 'derived')
+            np.testing.assert_array_equal(tabs.get(1).data.values, tablist.get(1).data.values)
+
+            # Embedded sources: the file is not read again
+            tablist.saveSession(sessionFile, embedSources=True)
+            os.remove(filename)
+            tabs = TableList()
+            gui, warnList = tabs.loadSession(sessionFile)
+            self.assertEqual(warnList, [])
+            np.testing.assert_array_equal(tabs.get(0).data.values, tablist.get(0).data.values)
+            self.assertEqual(tabs.get(0).filename, filename)
+
+    def test_formulas(self):
+        df = pd.DataFrame(data={'Time_[s]':np.arange(5.), 'Speed_[m/s]':np.arange(5.)*2})
+        tablist = TableList()
+        tablist.from_dataframes(dataframes=[df, df.copy()], names=['tab1', 'tab2'])
+        # Formulas referring to each other, in any order, computed when accessed
+        formulas = [{'name':'Quad', 'formula':'2*{Double}'}, {'name':'Double', 'formula':'2*{Speed}'}]
+        self.assertEqual(tablist.applyFormulas(formulas+[{'name':'Bad', 'formula':'{Missing}+1'}]), 
+                ['Formula `Bad` failed for table: tab1', 'Formula `Bad` failed for table: tab2'])
+        tab = tablist.get(0)
+        self.assertEqual(tab.columns, ['Time [s]', 'Speed [m/s]', 'Quad', 'Double'])
+        self.assertEqual(len(tab._stale), 2)
+        np.testing.assert_array_equal(tab.getColumn(4)[0], np.arange(5.)*4) # Double
+        self.assertEqual(len(tab._stale), 1)
+        np.testing.assert_array_equal(tab.getColumn(3)[0], np.arange(5.)*8) # Quad
+        np.testing.assert_array_equal(tab.data['Quad'], np.arange(5.)*8)
+        self.assertEqual(len(tab._stale), 0)
+        # Only the formulas that depend on a modified column are recomputed
+        tab.addColumnByFormula('T2', '{Time}**2')
+        quad = tab.getColumn(3)[0]
+        tab.setColumn('Speed_[m/s]', np.ones(5), 2)
+        self.assertEqual(len(tab._stale), 2)
+        np.testing.assert_array_equal(tab.data['Quad'], 4*np.ones(5))
+        np.testing.assert_array_equal(quad, np.arange(5.)*8) # Column replaced, not written in place
+        np.testing.assert_array_equal(tab.data['T2'], np.arange(5.)**2)
+        # Lazy formula used in a mask
+        tab = tablist.get(1)
+        self.assertTrue(tab.addColumnByFormula('Half', '{Time}/2', lazy=True))
+        self.assertFalse(tab.addColumnByFormula('Half2', '{Missing}/2', lazy=True))
+        tab.applyMaskString('{Half}>=1', bAdd=False)
+        np.testing.assert_array_equal(tab.mask, [False, False, True, True, True])
+        # Formulas failing when recomputed are reported as warnings
+        tab.addColumn('Label', np.array(list('abcde'), dtype=object))
+        self.assertTrue(tab.addColumnByFormula('Bad', '{Time}*{Label}', lazy=True))
+        tab.data
+        self.assertEqual(tablist.popWarnings(), ['Formula `Bad` failed for table: tab2'])
+        self.assertEqual(tablist.popWarnings(), [])
+
+    def test_column_cache(self):
+        df = pd.DataFrame(data={'Time_[s]':np.arange(5.), 'Speed_[m/s]':np.arange(5.)*2})
+        tab = Table(data=df)
+        x1 = tab.getColumn(1)[0]
+        x2 = tab.getColumn(1)[0]
+        self.assertTrue(x1 is x2)
+        self.assertFalse(x1.flags.writeable)
+        self.assertTrue(np.shares_memory(x1, tab.data.values) or np.shares_memory(x1, tab.data.iloc[:,0].values))
+        np.testing.assert_array_equal(tab.getColumn(0)[0], np.arange(5))
+        # Masked values are cached as well
+        tab.applyMaskString('{Time}>=2', bAdd=False)
+        x3 = tab.getColumn(2)[0]
+        np.testing.assert_array_equal(x3, [4,6,8])
+        self.assertTrue(tab.getColumn(2)[0] is x3)
+        np.testing.assert_array_equal(tab.getColumn(0)[0], [2,3,4])
+        tab.clearMask()
+        np.testing.assert_array_equal(tab.getColumn(2)[0], np.arange(5.)*2)
+        # Modifications of the data invalidate the cache
+        tab.setColumn('Speed_[m/s]', np.ones(5), 2)
+        np.testing.assert_array_equal(tab.getColumn(2)[0], np.ones(5))
+        tab.addColumn('New', np.zeros(5), 0)
+        np.testing.assert_array_equal(tab.getColumn(1)[0], np.zeros(5))
+        tab.data.iloc[0,1] = -1.
+        tab.dataModified()
+        self.assertEqual(tab.getColumn(2)[0][0], -1)
+
     def test_change_units(self):
         data = np.ones((1,3)) 
         data[:,0] *= 2*np.pi/60    # rad/s
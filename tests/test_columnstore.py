@@ -0,0 +1,140 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from pydatview.columnstore import DataFrameColumnStore, ParquetColumnStore, MemmapColumnStore, GrowableColumnStore, DerivedColumnStore, writeMemmap, memmapAvailable
+from pydatview.filecache import parquetAvailable
+
+class TestColumnStore(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame(data={'Time_[s]':np.arange(10.), 'ColA_[-]':np.arange(10.)*2, 'ColB_[-]':np.arange(10.)*3})
+        self.df.columns.name = 'tab'
+
+    def test_lazy_read(self):
+        store = DataFrameColumnStore(self.df)
+        self.assertEqual(store.shape, (10,3))
+        self.assertEqual(store.name, 'tab')
+        self.assertFalse(any([store.isLoaded(i) for i in range(3)]))
+        np.testing.assert_equal(store['ColA_[-]'].values, self.df['ColA_[-]'].values)
+        self.assertEqual([store.isLoaded(i) for i in range(3)], [False, True, False])
+
+    def test_manipulation(self):
+        store = DataFrameColumnStore(self.df)
+        store.insert(1, 'New', np.ones(10))
+        store.rename(0, 'Time')
+        store.delete([2])
+        store.set(2, 'ColC', np.zeros(10))
+        df = store.toDataFrame()
+        self.assertEqual(list(df.columns), ['Time', 'New', 'ColC'])
+        self.assertEqual(df.columns.name, 'tab')
+        np.testing.assert_equal(df['New'].values, np.ones(10))
+        np.testing.assert_equal(df['Time'].values, np.arange(10.))
+        self.assertRaises(ValueError, store.insert, 0, 'Bad', np.ones(3))
+
+    @unittest.skipIf(not parquetAvailable(), 'pyarrow not installed')
+    def test_parquet(self):
+        filename = os.path.join(tempfile.mkdtemp(), 'data.parquet')
+        self.df.to_parquet(filename)
+        store = ParquetColumnStore(filename, name='tab')
+        self.assertEqual(store.names, list(self.df.columns))
+        self.assertEqual(len(store), 10)
+        self.assertEqual(store.dtype(1), np.float64)
+        self.assertFalse(store.isLoaded(1))
+        np.testing.assert_equal(store.values(2), self.df['ColB_[-]'].values)
+
+    def test_memmap(self):
+        filename = os.path.join(tempfile.mkdtemp(), 'data.npy')
+        self.assertTrue(memmapAvailable(self.df))
+        writeMemmap(filename, self.df)
+        store = MemmapColumnStore(filename, list(self.df.columns), name='tab')
+        x = store.values(1)
+        # Columns are contiguous views of the mapped file
+        self.assertTrue(isinstance(x.base, np.memmap) or isinstance(x, np.memmap))
+        self.assertTrue(x.flags['C_CONTIGUOUS'])
+        np.testing.assert_equal(x, self.df['ColA_[-]'].values)
+        self.assertEqual(store.nbytes, 0)
+        # Copy on write, the file is not modified
+        x[0] = 100
+        np.testing.assert_equal(np.load(filename)[:,1], self.df['ColA_[-]'].values)
+        df = store.toDataFrame()
+        self.assertEqual(df.columns.name, 'tab')
+        self.assertFalse(memmapAvailable(pd.DataFrame(data={'a':['s']})))
+        # Mixed types are not upcasted
+        self.assertFalse(memmapAvailable(pd.DataFrame(data={'a':[2**53+1], 'b':[0.5]})))
+        self.assertRaises(Exception, writeMemmap, filename, pd.DataFrame(data={'a':[2**53+1], 'b':[0.5]}))
+
+    def test_growable(self):
+        M = self.df.values
+        store = GrowableColumnStore(list(self.df.columns), M[:4], capacity=6)
+        self.assertEqual((store.shape, store.capacity), ((4,3), 6))
+        store.insert(3, 'New', np.ones(4))
+        store.append(M[4:7])
+        self.assertEqual((store.shape, store.capacity), ((7,4), 9))
+        store.append(M[7:])
+        self.assertEqual((store.shape, store.capacity), ((10,4), 13))
+        df = store.toDataFrame()
+        np.testing.assert_equal(df.values[:,:3], M)
+        np.testing.assert_equal(df['New'].values[:4], np.ones(4))
+        self.assertTrue(np.all(np.isnan(df['New'].values[4:])))
+        # Columns added in memory grow within a buffer, they are not reallocated for every append
+        store.insert(4, 'Label', np.array(['a']*10, dtype=object))
+        store.append(M[:1])
+        buf = store.values(3).base
+        self.assertEqual(len(buf), store.capacity)
+        store.append(M[:2])
+        self.assertTrue(store.values(3).base is buf)
+        self.assertEqual(store.shape, (13,5))
+        self.assertTrue(np.all(np.isnan(store.values(3)[4:])))
+        self.assertEqual(list(store.values(4)[9:]), ['a', None, None, None])
+        store.trim()
+        self.assertEqual(store.capacity, 13)
+        self.assertEqual(len(store.values(3)), 13)
+
+    def test_derived(self):
+        from pydatview.Tables import Table
+        # Masked rows, the columns are copied when accessed
+        mask  = self.df['Time_[s]'].values>=5
+        store = DerivedColumnStore(self.df, rows=mask)
+        self.assertEqual(store.shape, (5,3))
+        self.assertFalse(store.zeroCopy)
+        self.assertFalse(any([store.isLoaded(i) for i in range(3)]))
+        np.testing.assert_equal(store.values(1), self.df['ColA_[-]'].values[5:])
+        self.assertEqual([store.isLoaded(i) for i in range(3)], [False, True, False])
+        # Sliced rows of a lazy store, the columns are views of the parent columns
+        parent = DataFrameColumnStore(self.df)
+        store  = DerivedColumnStore(parent, rows=slice(0,None,2))
+        self.assertTrue(store.zeroCopy)
+        np.testing.assert_equal(store.values(2), self.df['ColB_[-]'].values[::2])
+        self.assertTrue(np.shares_memory(store.values(2), parent.values(2)))
+        # Tables derived by mask and sampling reference the parent table
+        tab = Table(data=self.df)
+        df_new, name = tab.applyMaskString('{Time}<3', bAdd=True)
+        self.assertTrue(isinstance(df_new, DerivedColumnStore))
+        masked = Table(data=df_new, name=name)
+        self.assertEqual(masked.nRows, 3)
+        np.testing.assert_equal(masked.data['ColA_[-]'].values, [0,2,4])
+        df_new, name = tab.applyResampling(1, {'name':'Every n', 'param':[3]}, bAdd=True)
+        sampled = Table(data=df_new, name=name)
+        np.testing.assert_equal(sampled.data['Time_[s]'].values, [0,3,6,9])
+        self.assertTrue(np.shares_memory(df_new.values(1), self.df['ColA_[-]'].values))
+        # Filtered tables share the columns that are not filtered
+        df_new, name = tab.applyFiltering(1, {'name':'Moving average', 'param':3, 'paramName':'Window'}, bAdd=True)
+        self.assertTrue(np.shares_memory(df_new.values(0), self.df["Time_[s]"].values))
+        self.assertFalse(np.shares_memory(df_new.values(1), self.df['ColA_[-]'].values))
+        # Lazy tables are not converted to dataframes, only the columns needed are read
+        self.df['Label'] = list('abcdefghij')
+        lazy = Table(data=DataFrameColumnStore(self.df))
+        df_new, name = lazy.applyFiltering(1, {'name':'Moving average', 'param':3, 'paramName':'Window'}, bAdd=True)
+        self.assertTrue(lazy.isLazy)
+        self.assertFalse(df_new.isLoaded(3)) # Column not filtered, referenced
+        self.assertEqual(list(df_new.columns), list(self.df.columns))
+        np.testing.assert_equal(df_new.values(3), self.df['Label'].values)
+        lazy = Table(data=DataFrameColumnStore(self.df.iloc[:,:3]))
+        df_new, name = lazy.applyResampling(1, {'name':'Delta x', 'param':[0.5]}, bAdd=True)
+        self.assertTrue(lazy.isLazy)
+        np.testing.assert_almost_equal(df_new['ColA_[-]'].values, np.arange(19.))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import numpy as np
+import pandas as pd
+from pydatview.expressions import Expression, compileExpression
+from pydatview.Tables import Table, TableList
+
+class TestExpressions(unittest.TestCase):
+
+    def test_expression(self):
+        columns = ['Time [s]', 'Speed [m/s]', 'Label']
+        values  = [np.arange(6.), np.arange(6.)*2, np.array(list('aabbcc'), dtype=object)]
+        def evaluate(s):
+            return Expression(s).evaluate(columns, lambda i: values[i], 6)
+        np.testing.assert_array_equal(evaluate('{Time}>2'), [False,False,False,True,True,True])
+        np.testing.assert_array_equal(evaluate('({Time}>2) & ({Speed}<10)'), [False,False,False,True,True,False])
+        np.testing.assert_array_equal(evaluate('{Time}>2 and {Speed}<10 or {Index}==0'), [True,False,False,True,True,False])
+        np.testing.assert_array_equal(evaluate('({Time}>2) && ({Speed}<10)'), [False,False,False,True,True,False])
+        np.testing.assert_array_equal(evaluate('1 < {Time} <= 3'), [False,False,True,True,False,False])
+        np.testing.assert_array_equal(evaluate('not {Time}>2'), [True,True,True,False,False,False])
+        np.testing.assert_array_equal(evaluate("{Label}=='b'"), [False,False,True,True,False,False])
+        np.testing.assert_array_equal(evaluate('np.abs({Time}-3)<1'), [False,False,False,True,False,False])
+        # && and || have the precedence of `and` and `or`, on integer and float columns
+        for vals in [np.array([0,2,3,4]), np.array([0.,2.,3.,4.])]:
+            cols = ['A', 'B']
+            V    = [vals, np.array([5,1,3,0])]
+            ev = lambda s: Expression(s).evaluate(cols, lambda i: V[i], 4)
+            np.testing.assert_array_equal(ev('{A}>1 && {B}<2'), ev('({A}>1) & ({B}<2)'))
+            np.testing.assert_array_equal(ev('{A}>1 && {B}<2'), [False,True,False,True])
+            np.testing.assert_array_equal(ev('{A}>3 || {B}>4'), ev('({A}>3) | ({B}>4)'))
+            np.testing.assert_array_equal(ev('{A}>3 || {B}>4'), [True,False,False,True])
+        # Only the columns used are resolved
+        expr = Expression('{Speed}>{Time}')
+        self.assertEqual(expr.refs, ['Speed','Time'])
+        self.assertEqual(expr.resolve(columns), [1,0])
+        with self.assertRaises(Exception):
+            expr.resolve(['Time [s]'])
+        with self.assertRaises(Exception):
+            Expression('{Time}>')
+        self.assertTrue(compileExpression('{Time}>2') is compileExpression('{Time}>2'))
+
+    def test_dates(self):
+        tab = Table(data=pd.DataFrame(data={'Date':pd.to_datetime(['2018-09-01','2018-10-02']), 'Value':[1.,2.]}))
+        tab.applyMaskString("{Date} > '2018-10-01'", bAdd=False)
+        np.testing.assert_array_equal(tab.mask, [False, True])
+
+    def test_mask_cache(self):
+        df = pd.DataFrame(data={'Time_[s]':np.arange(10.), 'Speed_[m/s]':np.arange(10.)})
+        tablist = TableList()
+        tablist.from_dataframes(dataframes=[df, df.copy()], names=['tab1', 'tab2'])
+        dfs, names, errors = tablist.applyCommonMaskString('{Time}>=5', bAdd=False)
+        self.assertEqual(errors, [])
+        tab = tablist.get(0)
+        mask = tab.mask
+        self.assertEqual(mask.sum(), 5)
+        # Toggling the mask uses the cache
+        tablist.clearCommonMask()
+        tablist.applyCommonMaskString('{Time}>=5', bAdd=False)
+        self.assertTrue(tab.mask is mask)
+        # Changing the values invalidates the cache
+        tab.setColumn('Time_[s]', np.arange(10.)+3, 1)
+        tab.applyMaskString('{Time}>=5', bAdd=False)
+        self.assertEqual(tab.mask.sum(), 8)
+        # Invalid expressions are reported once
+        dfs, names, errors = tablist.applyCommonMaskString('{Time}>', bAdd=False)
+        self.assertEqual(len(errors), 1)
+        dfs, names, errors = tablist.applyCommonMaskString('{Time}<2', bAdd=True)
+        self.assertEqual(names, ['tab1_masked', 'tab2_masked'])
+        self.assertEqual(len(dfs[1]), 2)
+
+if __name__ == '__main__':
+    unittest.main()
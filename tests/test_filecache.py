@@ -0,0 +1,109 @@
+import unittest
+import os
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from pydatview.filecache import FileCache, parquetAvailable
+
+@unittest.skipIf(not parquetAvailable(), 'pyarrow not installed')
+class TestFileCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir  = tempfile.mkdtemp()
+        self.filename= os.path.join(self.tmpdir, 'data.csv')
+        with open(self.filename, 'w') as f:
+            f.write('a,b\n1,2\n')
+        self.df = pd.DataFrame(data={'Time_[s]':np.arange(100.), 'ColA_[-]':np.random.normal(0,1,100)})
+        self.df.columns.name = 'tabname'
+
+    def test_put_get(self):
+        cache = FileCache(os.path.join(self.tmpdir,'cache'))
+        self.assertTrue(cache.get(self.filename) is None)
+        self.assertTrue(cache.put(self.filename, None, self.df, 'CSV file'))
+        # A new cache object reads the persisted index
+        cache = FileCache(os.path.join(self.tmpdir,'cache'))
+        df, formatName = cache.get(self.filename)
+        self.assertEqual(formatName, 'CSV file')
+        self.assertEqual(df.columns.name, 'tabname')
+        np.testing.assert_equal(df.values, self.df.values)
+        # Different requested format, different entry
+        self.assertTrue(cache.get(self.filename, 'CSV file') is None)
+        # Dictionary of dataframes
+        cache.put(self.filename, 'CSV file', {'t1':self.df, 't2':self.df}, 'CSV file')
+        dfs, _ = cache.get(self.filename, 'CSV file')
+        self.assertEqual(list(dfs.keys()), ['t1','t2'])
+        # Modified file invalidates the entry
+        time.sleep(0.01)
+        with open(self.filename, 'a') as f:
+            f.write('3,4\n')
+        self.assertTrue(cache.get(self.filename) is None)
+        cache.purge()
+        self.assertEqual(len(cache.index), 0)
+
+    def test_flush(self):
+        cache = FileCache(os.path.join(self.tmpdir,'cache'))
+        cache.put(self.filename, None, self.df, 'CSV file')
+        atime = cache.index[cache.lookup(self.filename)]['atime']
+        time.sleep(0.01)
+        cache.get(self.filename)
+        # Access times are only written when the cache is flushed
+        key = cache.lookup(self.filename)
+        self.assertEqual(FileCache(cache.directory).index[key]['atime'], atime)
+        cache.flush()
+        self.assertEqual(FileCache(cache.directory).index[key]['atime'], cache.index[key]['atime'])
+        self.assertTrue(cache.index[key]['atime']>atime)
+
+    def test_duplicate_columns(self):
+        cache = FileCache(os.path.join(self.tmpdir,'cache'))
+        df = pd.DataFrame(data=np.zeros((3,2)), columns=['a','a'])
+        self.assertFalse(cache.put(self.filename, None, df))
+        self.assertEqual(len(cache.index), 0)
+
+    def test_lru_eviction(self):
+        cache = FileCache(os.path.join(self.tmpdir,'cache'), maxSizeMB=0)
+        files = []
+        for i in range(3):
+            f = os.path.join(self.tmpdir, 'data{:d}.csv'.format(i))
+            with open(f, 'w') as fid:
+                fid.write('a\n{:d}\n'.format(i))
+            files.append(f)
+        for f in files:
+            cache.put(f, None, self.df)
+        # Only the most recent entry is kept
+        self.assertTrue(cache.lookup(files[0]) is None)
+        self.assertTrue(cache.lookup(files[2]) is not None)
+
+    def test_memmap(self):
+        from pydatview.columnstore import MemmapColumnStore, ParquetColumnStore
+        cache = FileCache(os.path.join(self.tmpdir,'cache'), memmap=True)
+        dfStr = pd.DataFrame(data={'a':['x','y']})
+        self.assertTrue(cache.put(self.filename, None, {'num':self.df, 'str':dfStr}))
+        dfs, _ = cache.load(cache.lookup(self.filename), lazy=True)
+        self.assertTrue(isinstance(dfs['num'], MemmapColumnStore))
+        self.assertTrue(isinstance(dfs['str'], ParquetColumnStore))
+        self.assertEqual(dfs['num'].name, 'tabname')
+        np.testing.assert_equal(dfs['num'].values(1), self.df['ColA_[-]'].values)
+        dfs, _ = cache.get(self.filename)
+        self.assertEqual(list(dfs['num'].columns), list(self.df.columns))
+        np.testing.assert_equal(dfs['num'].values, self.df.values)
+        cache.purge()
+        self.assertEqual(os.listdir(cache.directory), [])
+        # Mixed dtypes are stored in parquet, the dtypes and values are kept
+        dfMixed = pd.DataFrame(data={'i':np.array([2**53+1, 3], dtype=np.int64), 'f':[0.5, 1.5], 'f32':np.array([1,2], dtype=np.float32)})
+        self.assertTrue(cache.put(self.filename, None, dfMixed))
+        df, _ = cache.load(cache.lookup(self.filename), lazy=True)
+        self.assertTrue(isinstance(df, ParquetColumnStore))
+        df, _ = cache.get(self.filename)
+        self.assertEqual(list(df.dtypes), list(dfMixed.dtypes))
+        self.assertEqual(df['i'].values[0], 2**53+1)
+        # Homogeneous dtypes other than float64 are memory-mapped with their dtype
+        dfInt = pd.DataFrame(data={'a':np.array([2**53+1, 3], dtype=np.int64), 'b':np.array([1, 2], dtype=np.int64)})
+        self.assertTrue(cache.put(self.filename, 'CSV file', dfInt))
+        df, _ = cache.load(cache.lookup(self.filename, 'CSV file'), lazy=True)
+        self.assertTrue(isinstance(df, MemmapColumnStore))
+        self.assertEqual(df.values(0).dtype, np.int64)
+        self.assertEqual(df.values(0)[0], 2**53+1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import os
+import tempfile
+from pydatview.filewatch import FileWatcher
+
+class TestFileWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.files  = [os.path.join(self.tmpdir, 'f{}.csv'.format(i)) for i in range(3)]
+        for f in self.files:
+            with open(f, 'w') as fid:
+                fid.write('a,b\n1,2\n')
+
+    def append(self, f):
+        with open(f, 'a') as fid:
+            fid.write('3,4\n')
+
+    def test_debounce(self):
+        fw = FileWatcher(self.files, debounce=1)
+        self.assertEqual(fw.poll(), [])
+        self.append(self.files[1])
+        # First poll detects the change, the next one confirms the file is stable
+        self.assertEqual(fw.poll(), [])
+        self.assertEqual(fw.poll(), [self.files[1]])
+        self.assertEqual(fw.poll(), [])
+        # File still being written
+        self.append(self.files[2])
+        self.assertEqual(fw.poll(), [])
+        self.append(self.files[2])
+        self.assertEqual(fw.poll(), [])
+        self.assertEqual(fw.poll(), [self.files[2]])
+
+    def test_setFiles(self):
+        fw = FileWatcher(self.files[:1], debounce=0)
+        fw.setFiles(self.files[1:])
+        self.assertEqual(sorted(fw.filenames), self.files[1:])
+        self.append(self.files[0])
+        self.append(self.files[1])
+        self.assertEqual(fw.poll(), [])
+        self.assertEqual(fw.poll(), [self.files[1]])
+        # Deleted files are not reported until they reappear
+        os.remove(self.files[2])
+        self.assertEqual(fw.poll(), [])
+        self.assertEqual(fw.poll(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import os
+import tempfile
+from pydatview.formatcache import FormatCache, headerSignature
+
+class TestFormatCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def write(self, name, content):
+        f = os.path.join(self.tmpdir, name)
+        with open(f, 'w') as fid:
+            fid.write(content)
+        return f
+
+    def test_signature(self):
+        f1 = self.write('a.out', 'Generated on 12-Jan-2020 at 10:00:00\nTime Wind\n1 2\n')
+        f2 = self.write('b.out', 'Generated on 01-Jan-2021 at 23:59:59\nTime Wind\n3 4\n')
+        f3 = self.write('c.csv', 'Generated on 01-Jan-2021 at 23:59:59\nTime Wind\n3 4\n')
+        f4 = self.write('d.out', 'Time,Wind\n1,2\n')
+        self.assertEqual(headerSignature(f1), headerSignature(f2))
+        self.assertNotEqual(headerSignature(f2), headerSignature(f3))
+        self.assertNotEqual(headerSignature(f1), headerSignature(f4))
+        self.assertTrue(headerSignature(os.path.join(self.tmpdir, 'missing.out')) is None)
+        self.assertTrue(headerSignature(self.write('empty.out', '')) is None)
+
+    def test_update(self):
+        entries = []
+        fc = FormatCache(entries, maxEntries=2)
+        files = [self.write('f{}.ext{}'.format(i,i), 'data') for i in range(3)]
+        for i,f in enumerate(files):
+            fc.update(f, 'Format{}'.format(i))
+        # The list given is updated in place, oldest entries are removed
+        self.assertEqual(len(entries), 2)
+        self.assertTrue(fc.get(fc.signature(files[0])) is None)
+        self.assertEqual(fc.get(fc.signature(files[2])), 'Format2')
+        fc.update(files[2], 'Other')
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(fc.get(fc.signature(files[2])), 'Other')
+        fc.clear()
+        self.assertEqual(entries, [])
+
+if __name__ == '__main__':
+    unittest.main()
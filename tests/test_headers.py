@@ -0,0 +1,51 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from pydatview.headers import readDelimitedHeader, readDelimitedColumns, countRows, selectColumns, TableHeader
+from pydatview.columnstore import DataFrameColumnStore
+
+class TestHeaders(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def test_csv(self):
+        f = os.path.join(self.tmpdir, 'data.csv')
+        pd.DataFrame(data={'Time_[s]':np.arange(7.), 'ColA_[-]':np.arange(7.)*2, 'ColB_[-]':np.arange(7.)*3}).to_csv(f, index=False)
+        header = readDelimitedHeader(f)
+        self.assertEqual(header['columns'], ['Time_[s]', 'ColA_[-]', 'ColB_[-]'])
+        self.assertEqual(header['formatName'], 'CSV file')
+        self.assertEqual(countRows(f, header['skiprows']), 7)
+        df = readDelimitedColumns(f, header, ['Time [s]', 'colb'])
+        self.assertEqual(list(df.columns), ['Time_[s]', 'ColB_[-]'])
+        np.testing.assert_equal(df['ColB_[-]'].values, np.arange(7.)*3)
+        # Files with more than one header line are not supported
+        with open(f, 'w') as fid:
+            fid.write('Time,ColA\ns,m\n0,1\n')
+        self.assertTrue(readDelimitedHeader(f) is None)
+
+    def test_fast_out(self):
+        f = os.path.join(self.tmpdir, 'sim.out')
+        with open(f, 'w') as fid:
+            fid.write('\n Predictions were generated on 01-Jan-2021\n\nDescription\n')
+            fid.write('Time\tWind1VelX\tRotSpeed\n(sec)\t(m/s)\t(rpm)\n')
+            fid.write('0.0\t8.0\t12.1\n0.1\t8.1\t12.2\n0.2\t8.2\t12.3')
+        header = readDelimitedHeader(f)
+        self.assertEqual(header['columns'], ['Time_[s]', 'Wind1VelX_[m/s]', 'RotSpeed_[rpm]'])
+        self.assertEqual(countRows(f, header['skiprows']), 3)
+        df = readDelimitedColumns(f, header, ['RotSpeed'])
+        np.testing.assert_equal(df.values[:,0], [12.1, 12.2, 12.3])
+        h = TableHeader(f, '', header['columns'], 3)
+        self.assertEqual(h.columns[1], 'Wind1VelX [m/s]')
+
+    def test_select_columns(self):
+        df = pd.DataFrame(data={'Time_[s]':np.arange(3.), 'ColA_[-]':np.arange(3.)})
+        self.assertEqual(list(selectColumns(df, ['ColA [-]']).columns), ['ColA_[-]'])
+        store = selectColumns(DataFrameColumnStore(df), ['Time'])
+        self.assertEqual(store.names, ['Time_[s]'])
+        self.assertFalse(store.isLoaded(0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from pydatview.Tables import TableList
+from pydatview.loader import BackgroundLoader
+
+class TestBackgroundLoader(unittest.TestCase):
+
+    def setUp(self):
+        tmpdir = tempfile.mkdtemp()
+        self.files = [os.path.join(tmpdir, 'f{}.csv'.format(i)) for i in range(5)]
+        for f in self.files:
+            pd.DataFrame(data={'Time_[s]':np.arange(5.), 'ColA_[-]':np.arange(5.)}).to_csv(f, index=False)
+        self.results = []
+        self.done    = []
+
+    def load(self, filenames, cancelAfter=None, nWorkers=1):
+        tablist = TableList()
+        def onResult(f, tabs, warn, progress):
+            self.results.append((f, tabs, warn, progress))
+            if cancelAfter is not None and len(self.results)>=cancelAfter:
+                loader.cancel()
+        loader = BackgroundLoader(tablist, filenames, nWorkers=nWorkers, onResult=onResult, onDone=lambda *args: self.done.append(args))
+        loader.start()
+        loader.join(10)
+        self.assertFalse(loader.is_alive())
+        return tablist
+
+    def test_load(self):
+        tablist = self.load(self.files+[self.files[0]], nWorkers=2)
+        self.assertEqual(self.done, [(False, None)])
+        # The duplicated file is reported first, the tables are not added to the list
+        self.assertEqual(tablist.len(), 0)
+        self.assertEqual(self.results[0][2], 'Warn: Cannot add a file already opened '+self.files[0])
+        self.assertEqual([r[0] for r in self.results[1:]], self.files)
+        progress = self.results[-1][3]
+        self.assertEqual(progress['nDone'], 5)
+        self.assertEqual(progress['nFiles'], 5)
+        self.assertEqual(progress['bytesDone'], progress['bytesTotal'])
+        self.assertEqual(self.results[1][3]['current'], self.files[1])
+        self.assertEqual(len(self.results[1][1]), 1)
+
+    def test_stream(self):
+        f = self.files[0]
+        pd.DataFrame(data={'Time_[s]':np.arange(25.), 'ColA_[-]':np.arange(25.)}).to_csv(f, index=False)
+        tablist = TableList()
+        tablist.setStreaming(minSizeMB=0, chunkRows=10)
+        chunks = []
+        loader = BackgroundLoader(tablist, [f], onResult=lambda *args: self.results.append(args),
+                onChunk=lambda tab, M, progress: chunks.append((tab, M, progress)))
+        loader.start()
+        loader.join(10)
+        tab = self.results[0][1][0]
+        self.assertEqual(tab.nRows, 10)
+        self.assertEqual([None if M is None else M.shape[0] for _, M, _ in chunks], [10, 5, None])
+        # The rows are appended by the consumer
+        for t, M, _ in chunks:
+            if M is None:
+                t.finishStream()
+            else:
+                t.appendRows(M)
+        self.assertEqual(tab.nRows, 25)
+        self.assertEqual(chunks[-1][2]['streamBytes'], os.path.getsize(f))
+
+    def test_cancel(self):
+        self.load(self.files, cancelAfter=2)
+        self.assertEqual(len(self.results), 2)
+        self.assertEqual(self.done, [(True, None)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -60,5 +60,16 @@ class TestPlotData(unittest.TestCase):
         #plt.plot(PD.x,fitter.model['fitted_function'](PD.x),'k--')
         #plt.show()
 
+    def test_sameAxis(self):
+        from pydatview.plotdata import sameAxis, interpOnAxis
+        x = np.linspace(0,1,11)
+        self.assertTrue(sameAxis(x, x[:]))
+        self.assertTrue(sameAxis(x, x.copy()))
+        self.assertFalse(sameAxis(x, x[::-1]))
+        self.assertFalse(sameAxis(x, x[:-1]))
+        y = x**2
+        self.assertTrue(interpOnAxis(x, x.copy(), y) is y)
+        np.testing.assert_almost_equal(interpOnAxis(x[:3], x, y), y[:3])
+
 if __name__ == '__main__':
     unittest.main()
@@ -37,6 +37,70 @@ class TestSignal(unittest.TestCase):
         x, df = applySampler(range(0, 3), None, {'name': name, 'param': [0.5]}, pd.DataFrame({"y": [0, 6, -6]}))
         self.assertTrue(np.all(x==[0, 0.5, 1, 1.5, 2]))
         self.assertTrue(np.all(df["y"]==[0, 3, 6, 0, -6]))
+        # NaN values are ignored, empty bins are interpolated, non numerical columns are dropped
+        df_old = pd.DataFrame({"y": [0, np.nan, 6, 2, 4, 8], "s": list('abcdef')})
+        x, df = applySampler(np.array([0, 0.5, 1, 4, 4.5, 5]), None, {'name': name, 'param': [1]}, df_old)
+        np.testing.assert_almost_equal(x, [0.25, 1, 1+3.25/3, 1+6.5/3, 4.25, 5])
+        np.testing.assert_almost_equal(df["y"], [0, 6, 5, 4, 3, 8])
+        self.assertEqual(list(df.columns), ['y'])
+        x, y = applySampler([0, 1, 2], [np.nan, 1, 2], {'name': name, 'param': [1]})
+        self.assertTrue(np.isnan(y[0]))
+        np.testing.assert_equal(y[1:], [1, 2])
+
+    def test_filters(self):
+        # --- 1st order filters, compared to their recursive definition
+        dt, fc = 0.01, 2
+        y = np.sin(np.arange(200)*0.1)+np.arange(200)*0.01
+        tau = 1/(2*np.pi*fc)
+        alpha = dt/(tau+dt)
+        y_low = np.zeros(y.shape)
+        y_low[0] = y[0]
+        for i in range(1, len(y)):
+            y_low[i] = alpha*y[i] + (1-alpha)*y_low[i-1]
+        np.testing.assert_almost_equal(lowpass1(y, dt, fc), y_low)
+        alpha = tau/(tau+dt)
+        y_high = np.zeros(y.shape)
+        for i in range(1, len(y)):
+            y_high[i] = alpha*y_high[i-1] + alpha*(y[i]-y[i-1])
+        y_high += np.mean(y)-np.mean(y_high)
+        np.testing.assert_almost_equal(highpass1(y, dt, fc), y_high)
+        np.testing.assert_almost_equal(moving_average(y, 1), y)
+        # --- Columns of a 2D array filtered at once
+        Y = np.column_stack((y, 2*y))
+        np.testing.assert_almost_equal(lowpass1(Y, dt, fc)[:,1], 2*y_low)
+        np.testing.assert_almost_equal(moving_average(Y, 5)[:,0], moving_average(y, 5))
+        # --- Dataframe, non numerical columns are unchanged
+        df = pd.DataFrame({'Time': np.arange(200)*dt, 'y': y, 'Label': ['a']*200})
+        for name in ['Moving average', 'Low pass 1st order', 'High pass 1st order']:
+            options = {'name':name, 'param':fc}
+            df_new = applyFilterDF(df, 'Time', options)
+            self.assertEqual(list(df_new.columns), ['Time', 'y', 'Label'])
+            np.testing.assert_equal(df_new['Time'].values, df['Time'].values)
+            np.testing.assert_almost_equal(df_new['y'].values, applyFilter(df['Time'].values, y, options))
+            self.assertEqual(df_new['Label'].iloc[0], 'a')
+        np.testing.assert_almost_equal(applyFilterDF(df, 'Time', {'name':'Low pass 1st order', 'param':fc})['y'].values, y_low)
+
+    def test_resampling(self):
+        # --- Remove, sorted lookup
+        x = np.array([0, 3, 1, 2, 2.0005, 5])
+        np.testing.assert_equal(findValues(x, [2, 5, 10]), [3, 4, 5])
+        x_new, y_new = applySampler(x, x*2, {'name':'Remove', 'param':[2, 0]})
+        np.testing.assert_equal(x_new, [3, 1, 5])
+        np.testing.assert_equal(y_new, [6, 2, 10])
+        # --- Interpolation plans shared between dataframes with the same x values
+        x_old = np.linspace(0, 10, 101)
+        df1 = pd.DataFrame({'Time':x_old, 'A':np.sin(x_old)})
+        df2 = pd.DataFrame({'Time':x_old.copy(), 'B':np.cos(x_old)})
+        sampDict = {'name':'Delta x', 'param':[0.25]}
+        df1_new = applySamplerDF(df1, 'Time', sampDict)
+        plan = cachedInterpPlan(df1_new['Time'].values, x_old)
+        df2_new = applySamplerDF(df2, 'Time', sampDict)
+        self.assertTrue(cachedInterpPlan(df2_new['Time'].values, x_old) is plan)
+        np.testing.assert_almost_equal(df1_new['A'].values, np.interp(df1_new['Time'].values, x_old, df1['A'].values))
+        np.testing.assert_almost_equal(df2_new['B'].values, np.interp(df2_new['Time'].values, x_old, df2['B'].values))
+        M = multiInterp([-1, 0.05, 20], x_old, np.vstack((x_old, 2*x_old)), extrap='nan')
+        np.testing.assert_almost_equal(M[:,1], [0.05, 0.1])
+        self.assertTrue(np.all(np.isnan(M[:,[0,2]])))
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+import pandas as pd
+from pydatview.tools.stats import *
+
+# --------------------------------------------------------------------------------}
+# ---  
+# --------------------------------------------------------------------------------{
+class TestStats(unittest.TestCase):
+
+    def test_bin_stats(self):
+        x = np.array([0, 0.5, 1, 1, 2, 3.5])
+        y = np.array([1, 2, 3, np.nan, 5, 6])
+        out = bin_stats(x, [x, y], [0, 1, 2, 3])
+        # Bins ]0,1], ]1,2], ]2,3], x=0 and x=3.5 are outside
+        np.testing.assert_equal(out['counts'], [3, 1, 0])
+        np.testing.assert_equal(out['count'][:,1], [2, 1, 0])
+        np.testing.assert_almost_equal(out['mean'][:2,:], [[2.5/3, 2.5], [2, 5]])
+        np.testing.assert_almost_equal(out['std'][0,1], np.std([2, 3], ddof=1))
+        np.testing.assert_equal(out['min'][:2,1], [2, 5])
+        np.testing.assert_equal(out['max'][:2,1], [3, 5])
+        self.assertTrue(np.isnan(out['std'][1,1]))
+        self.assertTrue(np.all(np.isnan(out['mean'][2,:])))
+
+    def test_bin_DF(self):
+        df = pd.DataFrame({'x':[0, 0.5, 1, 1, 2, 3.5], 'y':[1, 2, 3, np.nan, 5, 6], 'Label':list('abcdef')})
+        df2 = bin_DF(df, np.array([0, 1, 2, 3]), 'x')
+        # Input not modified, non numerical columns dropped
+        self.assertEqual(list(df.columns), ['x', 'y', 'Label'])
+        self.assertEqual(list(df2.columns), ['x', 'y', 'Counts'])
+        np.testing.assert_almost_equal(df2.index.values, [0.5, 1.5, 2.5])
+        np.testing.assert_almost_equal(df2['y'].values[:2], [2.5, 5])
+        np.testing.assert_equal(df2['Counts'].values, [3, 1, 0])
+        df2 = bin_DF(df, np.array([0, 1, 2, 3]), 'x', stats='max')
+        np.testing.assert_equal(df2['y'].values[:2], [3, 5])
+        # Several statistics in one call
+        dfs = bin_DF_stats(df, np.array([0, 1, 2, 3]), 'x', stats=['mean', 'std', 'max'])
+        self.assertEqual(list(dfs.keys()), ['mean', 'std', 'max'])
+        np.testing.assert_equal(dfs['max'].values, df2.values)
+        np.testing.assert_almost_equal(dfs['mean']['y'].values[:2], [2.5, 5])
+        np.testing.assert_almost_equal(dfs['std']['y'].values[0], np.std([2, 3], ddof=1))
+        self.assertRaises(Exception, bin_DF, df, np.array([0, 1, 2, 3]), 'x', stats='median')
+        x, y = bin_signal(df['x'].values, df['y'].values, xbins=np.array([0, 1, 2, 3]))
+        np.testing.assert_almost_equal(y[:2], [2.5, 5])
+
+    def test_bin2D_stats(self):
+        x1 = np.array([0.5, 0.5, 1.5, 2.5, 0.7, np.nan])
+        x2 = np.array([0.5, 0.6, 0.5, 0.5, 1.5, 0.5])
+        y  = np.array([1  , 3  , np.nan, 5, 4  , 6  ])
+        bins = [0, 1, 2]
+        # x1=2.5 is outside the bins, NaN values are ignored
+        np.testing.assert_equal(bin2D_stats(x1, x2, bins, bins, stats='count'), [[2, 1], [1, 0]])
+        M = bin2D_stats(x1, x2, bins, bins, y=y, stats='mean')
+        np.testing.assert_equal(M[0,:], [2, 4])
+        self.assertTrue(np.all(np.isnan(M[1,:])))
+        np.testing.assert_equal(bin_index([0, 0.5, 2, 3], bins), [-1, 0, 1, -1])
+
+if __name__ == '__main__':
+    unittest.main()